@@ -0,0 +1,78 @@
+"""
+Run the whole season_stats flow offline on synthetic data.
+
+The raw layer of a local storage backend is seeded with synthetic games and player
+statistics, then the flow runs end to end against it and a local DuckDB. Usage:
+
+    NBA_STORAGE=memory DUCKDB_MODE=local PYTHONPATH=src python -m benchmarks.flow
+    NBA_STORAGE=local DUCKDB_MODE=local NBA_INSTRUMENT=1 PYTHONPATH=src \\
+        python -m benchmarks.flow --seasons 10 --task-runner process
+
+With --runs 2, the repeat run reuses the cached task results of the first one.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+
+import polars as pl
+
+from benchmarks.synthetic import write_synthetic_dataset
+from config import bucket_conf
+from config.bucket import nba_bucket
+from config.motherduck import DBMode, nba_db
+
+
+def seed_raw_layer(inputs: dict) -> None:
+    """Write the synthetic inputs to the raw keys of the bucket."""
+    for input_name, raw_key in [
+        ("games_detail", bucket_conf.raw.games_detail),
+        ("player_stats", bucket_conf.raw.player_stats),
+    ]:
+        folder, key = raw_key.split("/", 1)
+        nba_bucket.sink_parquet(pl.scan_parquet(inputs[input_name]), key, folder)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seasons", type=int, default=2)
+    parser.add_argument("--games-per-season", type=int, default=1230)
+    parser.add_argument("--players-per-team", type=int, default=13)
+    parser.add_argument(
+        "--task-runner", choices=["thread", "process"], default="thread"
+    )
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if not nba_bucket.is_local or nba_db.mode is not DBMode.LOCAL:
+        parser.error("Set NBA_STORAGE to local or memory and DUCKDB_MODE to local")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        inputs = write_synthetic_dataset(
+            tmp_dir, args.seasons, args.games_per_season, args.players_per_team
+        )
+        seed_raw_layer(inputs)
+
+    print(
+        f"Seeded {nba_bucket.bucket_name} with {inputs['games_rows']:,} games and "
+        f"{inputs['player_rows']:,} player games"
+    )
+
+    # Imported once the environment is checked, the flow module loads every task
+    from flow import season_stats
+
+    for run in range(1, args.runs + 1):
+        start = time.perf_counter()
+        season_stats(incremental=args.incremental, task_runner=args.task_runner)
+        print(f"season_stats run {run}: {time.perf_counter() - start:.2f}s")
+
+    for table_name in vars(bucket_conf.processed):
+        print(f"{table_name}: {nba_db.get_table_row_count(table_name):,} rows")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Measure the cold-start import time of the flow entrypoint.
+
+Each run imports the module in a fresh interpreter with `python -X importtime`. The
+check fails when the median exceeds the budget, or when a client meant to be
+imported on first use only (S3, DuckDB, Prefect AWS blocks) is loaded. Usage:
+
+    PYTHONPATH=src python -m benchmarks.import_time
+    PYTHONPATH=src python -m benchmarks.import_time --budget-ms 2500 --repeat 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# Packages only needed once data is read or loaded, not to import the flow
+DEFERRED_PACKAGES = ["s3fs", "aiobotocore", "prefect_aws", "duckdb", "pyarrow"]
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """
+    Self and cumulative microseconds of each module of an `-X importtime` report.
+    """
+    timings = {}
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        timings[module.strip()] = (int(self_us), int(cumulative_us))
+
+    return timings
+
+
+def import_timings(module: str) -> dict[str, tuple[int, int]]:
+    """
+    Import timings of a module in a fresh interpreter, with the repo sources.
+    """
+    env = {**os.environ, "PYTHONPATH": str(REPO_DIR / "src")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    return parse_importtime(result.stderr)
+
+
+def deferred_imports(timings: dict[str, tuple[int, int]]) -> list[str]:
+    """
+    Deferred packages loaded by the import.
+    """
+    loaded = {module.split(".")[0] for module in timings}
+
+    return [package for package in DEFERRED_PACKAGES if package in loaded]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="flow")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, help="Fail above this median")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    runs = [import_timings(args.module) for _ in range(args.repeat)]
+    median_ms = statistics.median(run[args.module][1] for run in runs) / 1000
+
+    print(f"import {args.module}: {median_ms:,.0f} ms (median of {args.repeat})")
+
+    # Slowest top-level packages of the last run, by cumulative time
+    packages = {
+        module: cumulative_us
+        for module, (_, cumulative_us) in runs[-1].items()
+        if "." not in module and module != args.module
+    }
+    for package in sorted(packages, key=packages.get, reverse=True)[: args.top]:
+        print(f"  {package}: {packages[package] / 1000:,.0f} ms")
+
+    failures = []
+    if loaded := deferred_imports(runs[-1]):
+        failures.append(f"deferred packages imported: {', '.join(loaded)}")
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        failures.append(f"over the {args.budget_ms:,.0f} ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
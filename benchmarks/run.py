@@ -0,0 +1,278 @@
+"""
+Benchmark the season stats processors on synthetic data.
+
+Each case runs in its own spawned process, so that its peak RSS is not shared with
+the other cases nor with the data generation. Usage:
+
+    PYTHONPATH=src python -m benchmarks.run --seasons 10
+    PYTHONPATH=src python -m benchmarks.run --seasons 10 --compare baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import polars as pl
+
+from benchmarks.synthetic import write_synthetic_dataset
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO_DIR / "target" / "benchmarks"
+RESULTS_DIR = REPO_DIR / "benchmarks" / "results"
+
+
+def player_season_case(inputs: dict) -> tuple[Callable, list]:
+    from games.scope import get_game_id_season, prepare_games_scope
+    from players import PLAYERS_METRICS
+    from players.seasons.processor import PlayerSeasonProcessor
+
+    processor = PlayerSeasonProcessor(PLAYERS_METRICS)
+    games_scope = prepare_games_scope(pl.scan_parquet(inputs["games_detail"]))
+    scope_game_ids = get_game_id_season(games_scope)
+
+    def run():
+        return processor.run(pl.scan_parquet(inputs["player_stats"]), scope_game_ids)
+
+    stages = [
+        ("scan", lambda: pl.scan_parquet(inputs["player_stats"])),
+        ("compute_true_shooting", processor.compute_true_shooting),
+        ("filter_and_rename", processor.filter_and_rename),
+        ("add_season", lambda stats: processor.add_season(stats, scope_game_ids)),
+        ("compute_season_avg", processor.compute_season_avg),
+    ]
+
+    return run, stages
+
+
+def team_season_case(inputs: dict) -> tuple[Callable, list]:
+    from games.scope import prepare_games_scope
+    from teams import season_stats
+
+    def scan():
+        return prepare_games_scope(pl.scan_parquet(inputs["games_detail"]))
+
+    stages = [
+        ("scan", scan),
+        ("get_full_games", season_stats.get_full_games),
+        ("compute_team_season_stats", season_stats.compute_team_season_stats),
+    ]
+
+    return lambda: season_stats.build_team_season_stats(scan()), stages
+
+
+# Case name: (builder, input whose rows measure the throughput)
+CASES = {
+    "player_season_processor": (player_season_case, "player_rows"),
+    "team_season_stats": (team_season_case, "games_rows"),
+}
+
+
+def peak_rss_bytes() -> int:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes on Linux
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def time_stages(stages: list) -> list[dict]:
+    """
+    Time each stage on the materialized output of the previous one.
+
+    Stages run eagerly, so their sum is above the end-to-end time of the lazy plan
+    which fuses them, but it tells which step dominates.
+    """
+    timings = []
+    frames = ()
+
+    for name, stage in stages:
+        start = time.perf_counter()
+        output = stage(*frames)
+        outputs = output if isinstance(output, tuple) else (output,)
+        collected = pl.collect_all(outputs)
+        seconds = time.perf_counter() - start
+
+        frames = tuple(df.lazy() for df in collected)
+        timings.append(
+            {
+                "name": name,
+                "seconds": seconds,
+                "rows": sum(df.height for df in collected),
+            }
+        )
+
+    return timings
+
+
+def run_case(case: str, inputs: dict, repeat: int, with_stages: bool, queue) -> None:
+    """Run one case in the current process and put its measures on the queue."""
+    builder, _ = CASES[case]
+    run, stages = builder(inputs)
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = run().collect(engine="streaming")
+        durations.append(time.perf_counter() - start)
+
+    result = {"seconds": min(durations), "output_rows": output.height}
+    if with_stages:
+        result["stages"] = time_stages(stages)
+
+    result["peak_rss_bytes"] = peak_rss_bytes()
+    queue.put(result)
+
+
+def run_isolated(case: str, inputs: dict, repeat: int, with_stages: bool) -> dict:
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(
+        target=run_case, args=(case, inputs, repeat, with_stages, queue)
+    )
+    process.start()
+    result = queue.get()
+    process.join()
+
+    if process.exitcode != 0:
+        raise RuntimeError(f"Benchmark case {case} exited with {process.exitcode}")
+
+    return result
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compare the case durations with a baseline run.
+
+    Returns:
+        The cases slower than the baseline by more than the tolerance
+    """
+    regressions = []
+
+    for case, result in results["cases"].items():
+        if case not in baseline["cases"]:
+            continue
+
+        ratio = result["seconds"] / baseline["cases"][case]["seconds"]
+        regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(case)
+
+        print(f"{case}: {ratio:.2f}x baseline" + (" REGRESSION" if regressed else ""))
+
+    return regressions
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seasons", type=int, default=1, help="1 to 50 seasons")
+    parser.add_argument("--games-per-season", type=int, default=1230)
+    parser.add_argument("--players-per-team", type=int, default=13)
+    parser.add_argument("--case", choices=CASES, action="append", dest="cases")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--no-stages", action="store_false", dest="stages", help="Skip stage timings"
+    )
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--output", type=Path, help="Results JSON file")
+    parser.add_argument("--compare", type=Path, help="Baseline results JSON file")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1, help="Allowed slowdown ratio"
+    )
+
+    args = parser.parse_args(argv)
+    if not 1 <= args.seasons <= 50:
+        parser.error("--seasons must be between 1 and 50")
+
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    scale = {
+        "seasons": args.seasons,
+        "games_per_season": args.games_per_season,
+        "players_per_team": args.players_per_team,
+    }
+    dataset_dir = args.data_dir / "_".join(str(value) for value in scale.values())
+
+    # Large datasets take a while to generate, they are reused across runs
+    dataset_info = dataset_dir / "dataset.json"
+    if dataset_info.exists():
+        inputs = json.loads(dataset_info.read_text())
+    else:
+        print(f"Generating the synthetic dataset in {dataset_dir}")
+        inputs = write_synthetic_dataset(
+            str(dataset_dir),
+            args.seasons,
+            args.games_per_season,
+            args.players_per_team,
+        )
+        dataset_info.write_text(json.dumps(inputs))
+
+    results = {
+        "metadata": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "polars_version": pl.__version__,
+            "python_version": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "scale": scale,
+            "games_rows": inputs["games_rows"],
+            "player_rows": inputs["player_rows"],
+        },
+        "cases": {},
+    }
+
+    for case in args.cases or CASES:
+        _, rows_key = CASES[case]
+        result = run_isolated(case, inputs, args.repeat, args.stages)
+        result["input_rows"] = inputs[rows_key]
+        result["rows_per_second"] = inputs[rows_key] / result["seconds"]
+        results["cases"][case] = result
+
+        print(
+            f"{case}: {result['seconds']:.3f}s, "
+            f"{result['rows_per_second']:,.0f} rows/s, "
+            f"peak RSS {result['peak_rss_bytes'] / 1024**2:,.0f} MiB"
+        )
+        for stage in result.get("stages", []):
+            print(f"  {stage['name']}: {stage['seconds']:.3f}s, {stage['rows']} rows")
+
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())
+        if compare(results, baseline, args.tolerance):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Benchmark the S3 transfers of NBABucket against an S3-compatible endpoint.
+
+Meant for a local stand-in (MinIO, moto server), so that the part size and
+concurrency settings are compared offline. The NBA_S3_* variables tune the
+clients, the bucket must exist. Usage:
+
+    NBA_S3_ENDPOINT_URL=http://localhost:9000 PYTHONPATH=src \\
+        python -m benchmarks.s3_io --bucket nba --size-mb 256
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+import polars as pl
+
+from config.bucket import NBABucket
+
+
+def local_bucket(args: argparse.Namespace) -> NBABucket:
+    """NBABucket with credentials taken from the arguments, not Prefect blocks."""
+    nba_bucket = NBABucket()
+    nba_bucket._bucket_name = args.bucket
+    nba_bucket._region_name = args.region
+    nba_bucket._storage_options = {"key": args.access_key, "secret": args.secret_key}
+
+    return nba_bucket
+
+
+def throughput(size: int, seconds: float) -> str:
+    return f"{seconds:.2f}s, {size / 1024**2 / seconds:,.0f} MiB/s"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bucket", required=True)
+    parser.add_argument("--region", default="us-east-1")
+    parser.add_argument("--access-key", default=os.getenv("AWS_ACCESS_KEY_ID"))
+    parser.add_argument("--secret-key", default=os.getenv("AWS_SECRET_ACCESS_KEY"))
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--key", default="benchmarks/s3_io.parquet")
+    args = parser.parse_args(argv)
+
+    nba_bucket = local_bucket(args)
+    print(f"S3 I/O settings: {nba_bucket.io_conf}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = Path(tmp_dir) / "source.parquet"
+        # Shuffled integers barely compress, the file size follows the row count
+        rows = args.size_mb * 1024**2 // 8
+        pl.select(pl.int_range(rows).shuffle(seed=0).alias("value")).write_parquet(
+            source
+        )
+        size = source.stat().st_size
+
+        start = time.perf_counter()
+        nba_bucket.upload(str(source), args.key)
+        print(f"upload: {throughput(size, time.perf_counter() - start)}")
+
+        start = time.perf_counter()
+        nba_bucket.download(args.key, str(Path(tmp_dir) / "download.parquet"))
+        print(f"download: {throughput(size, time.perf_counter() - start)}")
+
+    start = time.perf_counter()
+    nba_bucket.scan_parquet(args.key).select(pl.len()).collect()
+    print(f"scan row counts: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    nba_bucket.scan_parquet(args.key).collect()
+    print(f"scan: {throughput(size, time.perf_counter() - start)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Synthetic NBA data shaped like the raw games detail and player statistics."""
+
+import os
+
+from datetime import date
+
+import polars as pl
+
+from polars import DataFrame
+
+from players import PLAYERS_METRICS
+from teams import TEAM_METRICS
+
+N_TEAMS = 30
+SEASON_DAYS = 240
+
+# Raw player columns derived by the processor rather than read from the raw file
+DERIVED_PLAYER_METRICS = {"trueShootingAttempts", "trueShootingPercentage"}
+
+
+def random_int(seed: int, low: int, high: int) -> pl.Expr:
+    """Deterministic pseudo-random integers in [low, high), one per row."""
+    return (pl.int_range(pl.len(), dtype=pl.UInt64).hash(seed) % (high - low)).cast(
+        pl.Int64
+    ) + low
+
+
+def generate_games_detail(season: int, games_per_season: int = 1230) -> DataFrame:
+    """
+    Games of one season in the raw games_detail layout (string dates, home/away).
+    """
+    season_start = date(season - 1, 10, 20)
+    team_names = [f"Team {team:02d}" for team in range(N_TEAMS)]
+
+    games = pl.DataFrame({"game_number": range(games_per_season)}).with_columns(
+        (pl.lit(season * 100_000) + pl.col("game_number")).alias("game_id"),
+        pl.lit(20_000 + season - 1).alias("season_id"),
+        pl.when(pl.col("game_number") < games_per_season * 0.05)
+        .then(pl.lit("Pre Season"))
+        .when(pl.col("game_number") >= games_per_season * 0.93)
+        .then(pl.lit("Playoffs"))
+        .otherwise(pl.lit("Regular Season"))
+        .alias("season_type"),
+        (
+            pl.lit(season_start)
+            + pl.duration(days=pl.col("game_number") * SEASON_DAYS // games_per_season)
+        )
+        .dt.strftime("%Y-%m-%d 00:00:00")
+        .alias("game_date"),
+        random_int(season, 0, N_TEAMS).alias("home"),
+        random_int(season + 1, 1, N_TEAMS).alias("away_offset"),
+    )
+
+    metrics = []
+    for location_seed, location in enumerate(["home", "away"], start=1):
+        seed = season * 100 + location_seed * 10
+        fga, fg3a, fta = (f"fga_{location}", f"fg3a_{location}", f"fta_{location}")
+        fgm, fg3m, ftm = (f"fgm_{location}", f"fg3m_{location}", f"ftm_{location}")
+        metrics.append(
+            games.select(
+                random_int(seed, 75, 100).alias(fga),
+                random_int(seed + 1, 20, 45).alias(fg3a),
+                random_int(seed + 2, 10, 35).alias(fta),
+                random_int(seed + 3, 30, 50).alias(fgm),
+                random_int(seed + 4, 8, 20).alias(fg3m),
+                random_int(seed + 5, 8, 30).alias(ftm),
+                random_int(seed + 6, 5, 15).alias(f"oreb_{location}"),
+                random_int(seed + 7, 28, 40).alias(f"dreb_{location}"),
+                random_int(seed + 8, 18, 32).alias(f"ast_{location}"),
+                random_int(seed + 9, 8, 20).alias(f"tov_{location}"),
+            ).with_columns(
+                pl.min_horizontal(fgm, fga).alias(fgm),
+                pl.min_horizontal(fg3m, fg3a).alias(fg3m),
+                pl.min_horizontal(ftm, fta).alias(ftm),
+            )
+        )
+
+    games = pl.concat([games, *metrics], how="horizontal")
+
+    per_location = {}
+    for location in ["home", "away"]:
+        fgm, fg3m, ftm = (f"fgm_{location}", f"fg3m_{location}", f"ftm_{location}")
+        per_location[location] = [
+            (2 * pl.col(fgm) + pl.col(fg3m) + pl.col(ftm)).alias(f"pts_{location}"),
+            (pl.col(fgm) / pl.col(f"fga_{location}")).alias(f"fg_pct_{location}"),
+            (pl.col(fg3m) / pl.col(f"fg3a_{location}")).alias(f"fg3_pct_{location}"),
+            (pl.col(ftm) / pl.col(f"fta_{location}")).alias(f"ft_pct_{location}"),
+            (pl.col(f"oreb_{location}") + pl.col(f"dreb_{location}")).alias(
+                f"reb_{location}"
+            ),
+        ]
+
+    away = (pl.col("home") + pl.col("away_offset")) % N_TEAMS
+    # Break the ties, a game always has a winner
+    home_wins = pl.col("pts_home") + pl.col("game_number") % 2 > pl.col("pts_away")
+
+    return (
+        games.with_columns(away.alias("away"), *per_location["home"])
+        .with_columns(*per_location["away"])
+        .with_columns(
+            pl.when(home_wins)
+            .then(pl.lit("W"))
+            .otherwise(pl.lit("L"))
+            .alias("wl_home"),
+            pl.when(home_wins)
+            .then(pl.lit("L"))
+            .otherwise(pl.lit("W"))
+            .alias("wl_away"),
+            pl.format("T{}", pl.col("home")).alias("team_abbreviation_home"),
+            pl.format("T{}", pl.col("away")).alias("team_abbreviation_away"),
+            pl.col("home")
+            .replace_strict(range(N_TEAMS), team_names)
+            .alias("team_name_home"),
+            pl.col("away")
+            .replace_strict(range(N_TEAMS), team_names)
+            .alias("team_name_away"),
+        )
+        .select(
+            "game_id",
+            "season_id",
+            "season_type",
+            "game_date",
+            "wl_home",
+            "wl_away",
+            "team_abbreviation_home",
+            "team_name_home",
+            "team_abbreviation_away",
+            "team_name_away",
+            "home",
+            "away",
+            *[
+                f"{metric}_{location}"
+                for location in ["home", "away"]
+                for metric in TEAM_METRICS
+            ],
+        )
+    )
+
+
+def generate_player_stats(
+    games_detail: DataFrame, season: int, players_per_team: int = 13
+) -> DataFrame:
+    """
+    Player box scores of the given games in the raw playerstatistics layout.
+    """
+    slots = pl.DataFrame({"slot": range(2 * players_per_team)})
+    raw_metrics = [
+        metric for metric in PLAYERS_METRICS if metric not in DERIVED_PLAYER_METRICS
+    ]
+
+    player_games = (
+        games_detail.select("game_id", "game_date", "season_type", "home", "away")
+        .join(slots, how="cross")
+        .with_columns(
+            pl.when(pl.col("slot") < players_per_team)
+            .then(pl.col("home"))
+            .otherwise(pl.col("away"))
+            .alias("team"),
+            (pl.col("slot") % players_per_team).alias("roster_spot"),
+        )
+        .with_columns(
+            # Rosters churn a little every season
+            (
+                (pl.col("team") * players_per_team + pl.col("roster_spot")) * 100
+                + (pl.lit(season) + pl.col("roster_spot")) // 3 % 100
+            ).alias("personId")
+        )
+    )
+
+    seed = season * 1_000
+    return player_games.select(
+        pl.col("game_id").alias("gameId"),
+        pl.col("game_date").alias("gameDate"),
+        pl.concat_str(pl.lit("First"), pl.col("personId")).alias("firstName"),
+        pl.concat_str(pl.lit("Last"), pl.col("personId")).alias("lastName"),
+        "personId",
+        pl.when(pl.col("season_type") == "Pre Season")
+        .then(pl.lit("Preseason"))
+        .otherwise(pl.col("season_type"))
+        .alias("gameType"),
+        *[
+            random_int(seed + index, 0, 30).cast(pl.Float64).alias(metric)
+            for index, metric in enumerate(raw_metrics)
+        ],
+    )
+
+
+def write_synthetic_dataset(
+    output_dir: str,
+    n_seasons: int,
+    games_per_season: int = 1230,
+    players_per_team: int = 13,
+    last_season: int = 2025,
+) -> dict:
+    """
+    Write synthetic raw inputs, one parquet file per season and input.
+
+    Seasons are generated one at a time so that datasets of tens of millions of
+    player rows never have to fit in memory at once.
+
+    Returns:
+        The globs of the games detail and player statistics files, and row counts
+    """
+    games_dir = os.path.join(output_dir, "games_detail")
+    players_dir = os.path.join(output_dir, "playerstatistics")
+    os.makedirs(games_dir, exist_ok=True)
+    os.makedirs(players_dir, exist_ok=True)
+
+    games_rows = player_rows = 0
+    for season in range(last_season - n_seasons + 1, last_season + 1):
+        games_detail = generate_games_detail(season, games_per_season)
+        player_stats = generate_player_stats(games_detail, season, players_per_team)
+
+        games_detail.drop("home", "away").write_parquet(
+            os.path.join(games_dir, f"{season}.parquet")
+        )
+        player_stats.write_parquet(os.path.join(players_dir, f"{season}.parquet"))
+
+        games_rows += games_detail.height
+        player_rows += player_stats.height
+
+    return {
+        "games_detail": os.path.join(games_dir, "*.parquet"),
+        "player_stats": os.path.join(players_dir, "*.parquet"),
+        "games_rows": games_rows,
+        "player_rows": player_rows,
+    }
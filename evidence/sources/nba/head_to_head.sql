@@ -0,0 +1,4 @@
+-- Only the columns of the teams page, for the seasons of its season filter
+SELECT season, season_type, team, opponent, games, wins, losses, point_diff
+FROM head_to_head
+WHERE season IN (SELECT season FROM team_standings)
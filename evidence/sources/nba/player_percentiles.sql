@@ -0,0 +1 @@
+SELECT * FROM player_percentiles
@@ -1 +0,0 @@
-SELECT * FROM player_season_stats
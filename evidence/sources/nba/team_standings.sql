@@ -0,0 +1 @@
+SELECT * FROM team_standings
@@ -1 +0,0 @@
-SELECT * FROM team_season_stats
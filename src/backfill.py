@@ -0,0 +1,171 @@
+import polars as pl
+
+from polars import LazyFrame
+from prefect import task
+
+import config
+from config import ProcessedOutput
+from config.bucket import nba_bucket
+from config.instrumentation import instrumentation
+from config.partitions import PARTITION_KEY, compute_fingerprints
+from games.facts import sink_game_facts
+from games.scope import get_game_id_season, scan_games_scope
+from players import PLAYERS_METRICS
+from players.rolling.task import get_rolling_processor as get_player_rolling_processor
+from players.seasons.processor import PlayerSeasonProcessor
+from players.seasons.task import (
+    player_facts_source,
+    player_source_keys,
+    scan_player_stats,
+)
+from teams.ratings import compute_head_to_head, compute_team_ratings
+from teams.rolling_stats import get_rolling_processor as get_team_rolling_processor
+from teams.season_stats import (
+    build_team_game_facts,
+    compute_team_season_stats,
+    team_source_keys,
+)
+
+
+def scan_season_facts(facts_key: str, season: int) -> LazyFrame:
+    """
+    Scan the game facts partition of a season.
+    """
+    return nba_bucket.scan_partitioned(facts_key).filter(
+        pl.col(PARTITION_KEY) == season
+    )
+
+
+def sink_season(lf: LazyFrame, output: ProcessedOutput) -> str:
+    """
+    Write the season partition of a processed output, as an incremental run does.
+    """
+    return nba_bucket.sink_partitioned(
+        lf, output.partitioned_key, PARTITION_KEY, **output.layout.sink_options()
+    )
+
+
+def backfill_player_season(
+    season: int, games_scope: LazyFrame
+) -> dict[str, dict[str, str]]:
+    """
+    Write the player facts, season stats and rolling stats partitions of a season.
+
+    Returns:
+        The season fingerprints of the source of each output, keyed by output key
+    """
+    processor = PlayerSeasonProcessor(
+        metrics=PLAYERS_METRICS, min_season=season, max_season=season
+    )
+    game_stats = scan_player_stats(processor.min_game_date, processor.max_game_date)
+    scope_game_ids = get_game_id_season(games_scope)
+    facts_key = config.bucket_conf.facts.player_games
+
+    source = player_facts_source(game_stats, scope_game_ids)
+    sink_game_facts(
+        lambda _: processor.build_game_facts(game_stats, scope_game_ids),
+        facts_key=facts_key,
+        game_id_column="gameId",
+        source=source,
+        source_keys=player_source_keys(),
+    )
+
+    player_facts = scan_season_facts(facts_key, season)
+    season_output = config.bucket_conf.processed.player_season_stats
+    rolling_output = config.bucket_conf.processed.player_rolling_stats
+
+    sink_season(processor.compute_season_avg(player_facts), season_output)
+    sink_season(
+        get_player_rolling_processor().compute_rolling_stats(player_facts),
+        rolling_output,
+    )
+
+    facts_fingerprints = compute_fingerprints(player_facts)
+
+    return {
+        facts_key: compute_fingerprints(source),
+        season_output.partitioned_key: facts_fingerprints,
+        rolling_output.partitioned_key: facts_fingerprints,
+    }
+
+
+def backfill_team_season(
+    season: int, games_scope: LazyFrame
+) -> dict[str, dict[str, str]]:
+    """
+    Write the team facts, season stats, rolling stats, ratings and head-to-head
+    partitions of a season.
+
+    Returns:
+        The season fingerprints of the source of each output, keyed by output key
+    """
+    facts_key = config.bucket_conf.facts.team_games
+
+    sink_game_facts(
+        lambda _: build_team_game_facts(games_scope, min_season=season),
+        facts_key=facts_key,
+        game_id_column="game_id",
+        source=games_scope,
+        source_keys=team_source_keys(),
+    )
+
+    team_facts = scan_season_facts(facts_key, season)
+    outputs = [
+        (config.bucket_conf.processed.team_season_stats, compute_team_season_stats),
+        (
+            config.bucket_conf.processed.team_rolling_stats,
+            get_team_rolling_processor().compute_rolling_stats,
+        ),
+        (config.bucket_conf.processed.team_ratings, compute_team_ratings),
+        (config.bucket_conf.processed.head_to_head, compute_head_to_head),
+    ]
+
+    for output, compute in outputs:
+        sink_season(compute(team_facts), output)
+
+    facts_fingerprints = compute_fingerprints(team_facts)
+
+    return {
+        facts_key: compute_fingerprints(games_scope),
+        **{output.partitioned_key: facts_fingerprints for output, _ in outputs},
+    }
+
+
+@task(log_prints=True)
+@instrumentation.run("backfill-season")
+def backfill_season(
+    season: int, games_scope_path: str | None = None
+) -> dict[str, dict[str, str]]:
+    """
+    Build every partition of a season, older than the first season of the regular
+    flow or not.
+
+    The raw inputs are scanned filtered on the season, so concurrent seasons each
+    read their own games only.
+
+    Returns:
+        The season fingerprints of the source of each output, keyed by output key
+    """
+    games_scope = scan_games_scope(games_scope_path).filter(
+        pl.col(PARTITION_KEY) == season
+    )
+
+    return {
+        **backfill_player_season(season, games_scope),
+        **backfill_team_season(season, games_scope),
+    }
+
+
+def merge_fingerprints(
+    season_fingerprints: list[dict[str, dict[str, str]]],
+) -> dict[str, dict[str, str]]:
+    """
+    Gather the fingerprints returned by the season tasks, by output key.
+    """
+    merged = {}
+
+    for fingerprints in season_fingerprints:
+        for output_key, partitions in fingerprints.items():
+            merged.setdefault(output_key, {}).update(partitions)
+
+    return merged
@@ -1,38 +1,178 @@
+import functools
 import os
-import yaml
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 PARAMETERS_FILE = os.path.join(CURRENT_DIR, "parameters.yml")
 
 
+@functools.cache
+def load_parameters(path: str) -> dict:
+    """
+    Parse a parameters file once, with the C YAML parser when available.
+    """
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=loader)
+
+
 @dataclass
 class BucketRaw:
     games_detail: str
     player_stats: str
 
 
+@dataclass
+class OutputLayout:
+    """
+    Physical layout of a processed output, letting its readers skip data.
+    """
+
+    # Rows sorted on these columns, so that the row group min/max are selective
+    sort_by: list[str] = field(default_factory=list)
+    row_group_size: int | None = None
+    # Hive-partitioned directory tree on this column, instead of a single file
+    partition_by: str | None = None
+    compression: str = "snappy"
+    # "full" also writes the distinct counts of every column
+    statistics: bool | str = True
+
+    def sink_options(self) -> dict:
+        """
+        Options of NBABucket.sink_parquet and sink_partitioned.
+        """
+        return {
+            "sort_by": self.sort_by,
+            "row_group_size": self.row_group_size,
+            "compression": self.compression,
+            "statistics": self.statistics,
+        }
+
+
+@dataclass
+class ProcessedOutput:
+    key: str
+    layout: OutputLayout = field(default_factory=OutputLayout)
+
+    @classmethod
+    def from_yaml(cls, conf: str | dict) -> "ProcessedOutput":
+        """
+        Output declared by its key alone, or by its key and layout options.
+        """
+        if isinstance(conf, str):
+            return cls(key=conf)
+
+        layout = {option: value for option, value in conf.items() if option != "key"}
+        return cls(key=conf["key"], layout=OutputLayout(**layout))
+
+    @property
+    def partitioned_key(self) -> str:
+        """
+        Directory of the output when it is written hive-partitioned.
+        """
+        return self.key.removesuffix(".parquet")
+
+
 @dataclass
 class BucketProcessed:
-    team_season_stats: str
-    player_season_stats: str
+    team_season_stats: ProcessedOutput
+    player_season_stats: ProcessedOutput
+    team_rolling_stats: ProcessedOutput
+    player_rolling_stats: ProcessedOutput
+    team_ratings: ProcessedOutput
+    head_to_head: ProcessedOutput
+
+    @classmethod
+    def from_yaml(cls, conf: dict) -> "BucketProcessed":
+        return cls(
+            **{name: ProcessedOutput.from_yaml(output) for name, output in conf.items()}
+        )
+
+
+@dataclass
+class BucketFacts:
+    player_games: str
+    team_games: str
 
 
 @dataclass
 class BucketConf:
     raw: BucketRaw
     processed: BucketProcessed
+    facts: BucketFacts
 
     @classmethod
     def from_yaml(cls, path: str):
-        with open(path, "r") as f:
-            config = yaml.safe_load(f)
+        config = load_parameters(path)
 
         return cls(
             raw=BucketRaw(**config["bucket_files"]["raw"]),
-            processed=BucketProcessed(**config["bucket_files"]["processed"]),
+            processed=BucketProcessed.from_yaml(config["bucket_files"]["processed"]),
+            facts=BucketFacts(**config["bucket_files"]["facts"]),
+        )
+
+
+@dataclass
+class RollingConf:
+    windows: list[int]
+
+    @classmethod
+    def from_yaml(cls, path: str):
+        config = load_parameters(path)
+
+        return cls(**config["rolling_stats"])
+
+
+@dataclass
+class TableConf:
+    mode: str = "replace"
+    keys: list[str] = field(default_factory=list)
+
+    @property
+    def merge_keys(self) -> list[str] | None:
+        """Keys to merge the table on, None when it is fully replaced."""
+        if self.mode == "merge":
+            return self.keys
+        return None
+
+
+@dataclass
+class DatabaseConf:
+    name: str
+    tables: dict[str, TableConf]
+
+    @classmethod
+    def from_yaml(cls, path: str):
+        config = load_parameters(path)
+
+        return cls(
+            name=config["database"]["name"],
+            tables={
+                table_name: TableConf(**table_conf)
+                for table_name, table_conf in config["database"]["tables"].items()
+            },
         )
 
+    def table(self, table_name: str) -> TableConf:
+        return self.tables.get(table_name, TableConf())
+
+
+# Configurations read from parameters.yml, built on first access
+LAZY_CONFS = {
+    "bucket_conf": BucketConf,
+    "database_conf": DatabaseConf,
+    "rolling_conf": RollingConf,
+}
+
+
+def __getattr__(name: str):
+    if name not in LAZY_CONFS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-bucket_conf = BucketConf.from_yaml(PARAMETERS_FILE)
+    conf = LAZY_CONFS[name].from_yaml(PARAMETERS_FILE)
+    # Cached as a module attribute, later accesses skip this hook
+    globals()[name] = conf
+    return conf
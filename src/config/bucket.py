@@ -1,49 +1,186 @@
-import s3fs
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import uuid
 import polars as pl
-import pyarrow.fs as fs
+
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from urllib.parse import urlparse
 
 from loguru import logger
 from polars import LazyFrame
-from pyarrow.dataset import dataset
-from prefect_aws import AwsCredentials
-from prefect_aws.s3 import S3Bucket
+
+from config import ProcessedOutput
+from config.cache import LocalCache
+from config.instrumentation import instrumentation
+from config.manifest import (
+    DEFAULT_MAX_WORKERS,
+    MANIFEST_FILE,
+    Bounds,
+    IngestionManifest,
+    bounds_predicate,
+    file_version,
+    update_manifest,
+)
+
+
+class StorageBackend(Enum):
+    S3 = "s3"
+    LOCAL = "local"
+    MEMORY = "memory"
+
+
+# Root of the local backend, unless NBA_STORAGE_DIR is set
+LOCAL_STORAGE_DIR = Path(__file__).parent.parent.parent / "target" / "bucket"
+MEMORY_STORAGE_DIR_ENV = "NBA_MEMORY_STORAGE_DIR"
+
+
+@dataclass
+class S3IOConf:
+    """Connection pool, retries and transfer tuning shared by the S3 clients.
+
+    Read from the NBA_S3_* environment variables. NBA_S3_ENDPOINT_URL points the
+    clients at an S3-compatible stand-in such as MinIO or a moto server.
+    """
+
+    endpoint_url: str | None = None
+    max_pool_connections: int = 32
+    # Attempts of each request, throttled requests back off exponentially
+    max_attempts: int = 10
+    # Part size of the multipart uploads and the concurrent ranged downloads
+    part_size: int = 16 * 1024**2
+    # Parts transferred concurrently for a single object
+    max_concurrency: int = 8
+
+    @classmethod
+    def from_env(cls) -> "S3IOConf":
+        defaults = cls()
+        return cls(
+            endpoint_url=os.getenv("NBA_S3_ENDPOINT_URL") or None,
+            max_pool_connections=int(
+                os.getenv("NBA_S3_MAX_POOL_CONNECTIONS", defaults.max_pool_connections)
+            ),
+            max_attempts=int(os.getenv("NBA_S3_MAX_ATTEMPTS", defaults.max_attempts)),
+            part_size=int(os.getenv("NBA_S3_PART_SIZE", defaults.part_size)),
+            max_concurrency=int(
+                os.getenv("NBA_S3_MAX_CONCURRENCY", defaults.max_concurrency)
+            ),
+        )
+
+
+def memory_storage_dir() -> str:
+    """
+    Throwaway root of the memory backend, shared with the worker processes.
+
+    The path is chosen by the first process of the run and handed down to the task
+    runner processes through the environment. The directory is created on first use.
+    """
+    storage_dir = os.getenv(MEMORY_STORAGE_DIR_ENV)
+    if storage_dir:
+        return storage_dir
+
+    shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    storage_dir = os.path.join(shm_dir, f"nba-bucket-{uuid.uuid4().hex[:8]}")
+    os.environ[MEMORY_STORAGE_DIR_ENV] = storage_dir
+    atexit.register(shutil.rmtree, storage_dir, True)
+
+    return storage_dir
 
 
 class NBABucket(object):
+    """Storage of the raw and processed data.
+
+    The backend is selected by the NBA_STORAGE environment variable:
+    - "s3" (default): The S3 bucket of the Prefect blocks, or NBA_BUCKET_NAME with
+      the AWS_* credentials, on AWS or the NBA_S3_ENDPOINT_URL stand-in
+    - "local": A local directory, NBA_STORAGE_DIR or target/bucket
+    - "memory": A throwaway directory removed when the process exits, on tmpfs
+      when available
+
+    Keys are the same on every backend, so the flow runs offline unchanged. The
+    clients and Prefect blocks are imported and created on first use only.
+    """
+
     def __init__(self):
         self._aws_creds = None
         self._bucket = None
         self._bucket_name = None
         self._region_name = None
         self._storage_options = None
+        self._cloud_storage_options = None
         self._fs = None
+        self._arrow_fs = None
+        self.backend = StorageBackend(os.getenv("NBA_STORAGE", "s3").lower())
+        self.io_conf = S3IOConf.from_env()
+        self.cache = LocalCache.from_env()
+
+    @property
+    def is_local(self) -> bool:
+        return self.backend is not StorageBackend.S3
 
     @property
     def aws_creds(self):
         if self._aws_creds is None:
+            from prefect_aws import AwsCredentials
+
             self._aws_creds = AwsCredentials.load("aws-nba-etl-user-credentials")
         return self._aws_creds
 
     @property
     def bucket(self):
         if self._bucket is None:
+            from prefect_aws.s3 import S3Bucket
+
             self._bucket = S3Bucket.load("nba-bucket")
         return self._bucket
 
+    @property
+    def local_root(self) -> Path:
+        """
+        Root directory of the local backends, without creating it.
+        """
+        if self.backend is StorageBackend.MEMORY:
+            return Path(memory_storage_dir())
+
+        return Path(os.getenv("NBA_STORAGE_DIR") or LOCAL_STORAGE_DIR).resolve()
+
     @property
     def bucket_name(self):
+        """
+        Name of the S3 bucket, or root directory of the local backends.
+        """
         if self._bucket_name is None:
-            self._bucket_name = self.bucket.bucket_name
+            if self.is_local:
+                root = self.local_root
+                root.mkdir(parents=True, exist_ok=True)
+                self._bucket_name = str(root)
+            else:
+                self._bucket_name = (
+                    os.getenv("NBA_BUCKET_NAME") or self.bucket.bucket_name
+                )
         return self._bucket_name
 
     @property
     def region_name(self):
         if self._region_name is None:
-            self._region_name = self.aws_creds.region_name
+            if os.getenv("AWS_ACCESS_KEY_ID"):
+                self._region_name = os.getenv("AWS_REGION")
+            else:
+                self._region_name = self.aws_creds.region_name
         return self._region_name
 
     @property
     def storage_options(self):
+        if self._storage_options is None and os.getenv("AWS_ACCESS_KEY_ID"):
+            # Credentials of a stand-in endpoint, or of a run outside Prefect
+            self._storage_options = {
+                "key": os.getenv("AWS_ACCESS_KEY_ID"),
+                "secret": os.getenv("AWS_SECRET_ACCESS_KEY"),
+            }
         if self._storage_options is None:
             self._storage_options = {
                 "key": self.aws_creds.aws_access_key_id,
@@ -51,50 +188,435 @@ class NBABucket(object):
             }
         return self._storage_options
 
+    @property
+    def cloud_storage_options(self):
+        """
+        Storage options for Polars' native object store (cloud scans and sinks).
+        """
+        if self._cloud_storage_options is None:
+            self._cloud_storage_options = {
+                "aws_access_key_id": self.storage_options["key"],
+                "aws_secret_access_key": self.storage_options["secret"],
+            }
+            if self.region_name:
+                self._cloud_storage_options["aws_region"] = self.region_name
+            if self.io_conf.endpoint_url:
+                self._cloud_storage_options["aws_endpoint_url"] = (
+                    self.io_conf.endpoint_url
+                )
+                if self.io_conf.endpoint_url.startswith("http://"):
+                    self._cloud_storage_options["aws_allow_http"] = "true"
+        return self._cloud_storage_options
+
     @property
     def fs(self):
+        """
+        Pooled s3fs client of the process, reused by every bucket operation.
+
+        Botocore retries throttled requests in adaptive mode, which also rate
+        limits the client once S3 starts throttling.
+        """
+        if self._fs is None and self.is_local:
+            from fsspec.implementations.local import LocalFileSystem
+
+            self._fs = LocalFileSystem(auto_mkdir=True)
         if self._fs is None:
-            self._fs = s3fs.S3FileSystem(**self.storage_options)
+            import s3fs
+
+            self._fs = s3fs.S3FileSystem(
+                **self.storage_options,
+                endpoint_url=self.io_conf.endpoint_url,
+                default_block_size=self.io_conf.part_size,
+                max_concurrency=self.io_conf.max_concurrency,
+                config_kwargs={
+                    "max_pool_connections": self.io_conf.max_pool_connections,
+                    "retries": {
+                        "max_attempts": self.io_conf.max_attempts,
+                        "mode": "adaptive",
+                    },
+                },
+            )
         return self._fs
 
-    def scan_parquet(self, filepath: str) -> LazyFrame:
+    @property
+    def arrow_fs(self):
         """
-        Scan for Parquet files in the specified S3 bucket and prefix using PyArrow.
+        PyArrow S3 client of the process, for the PyArrow dataset reader.
         """
+        import pyarrow.fs as fs
+
+        if self._arrow_fs is None and self.is_local:
+            self._arrow_fs = fs.LocalFileSystem()
+        if self._arrow_fs is None:
+            endpoint = urlparse(self.io_conf.endpoint_url or "")
+            self._arrow_fs = fs.S3FileSystem(
+                access_key=self.storage_options["key"],
+                secret_key=self.storage_options["secret"],
+                region=self.region_name,
+                endpoint_override=endpoint.netloc or None,
+                scheme=endpoint.scheme or "https",
+                retry_strategy=fs.AwsStandardS3RetryStrategy(
+                    max_attempts=self.io_conf.max_attempts
+                ),
+            )
+        return self._arrow_fs
 
-        logger.info(f"Scanning Parquet dataset: s3://{self.bucket_name}/{filepath}")
+    @property
+    def polars_options(self) -> dict:
+        """
+        Options of the Polars scans and sinks for the backend.
+        """
+        if self.is_local:
+            return {}
+
+        return {
+            "storage_options": self.cloud_storage_options,
+            "retries": self.io_conf.max_attempts,
+        }
+
+    @property
+    def sink_options(self) -> dict:
+        # Local sinks do not create the directories of their output by themselves
+        return {"mkdir": True} if self.is_local else self.polars_options
+
+    def uri(self, key: str) -> str:
+        """
+        URI of a key, as read by Polars and DuckDB.
+        """
+        if self.is_local:
+            return f"{self.bucket_name}/{key}"
 
-        s3_fs = fs.S3FileSystem(
-            access_key=self.storage_options["key"],
-            secret_key=self.storage_options["secret"],
-            region=self.region_name,
+        return f"s3://{self.bucket_name}/{key}"
+
+    def scan_parquet(self, filepath: str, native: bool = True) -> LazyFrame:
+        """
+        Scan for Parquet files in the specified S3 bucket and prefix.
+
+        The native Polars reader pushes column projections and predicates down to
+        the row groups, skipping those whose statistics exclude the filter. The
+        PyArrow dataset reader is kept as a fallback with `native=False`.
+
+        When the local cache is enabled, the object is served from (and memory-mapped
+        by) its local copy, downloaded again only when its ETag changes.
+        """
+
+        logger.info(f"Scanning Parquet dataset: {self.uri(filepath)}")
+
+        if self.cache is not None and not self.is_local:
+            lf = pl.scan_parquet(self.cached_path(filepath))
+        elif native:
+            lf = pl.scan_parquet(self.uri(filepath), **self.polars_options)
+        else:
+            from pyarrow.dataset import dataset
+
+            ds = dataset(
+                source=f"{self.bucket_name}/{filepath}",
+                filesystem=self.arrow_fs,
+                format="parquet",
+            )
+
+            lf = pl.scan_pyarrow_dataset(ds)
+
+        return instrumentation.materialize(
+            "NBABucket.scan_parquet", lf, bytes_in=lambda: self.object_size(filepath)
         )
 
-        ds = dataset(
-            source=f"{self.bucket_name}/{filepath}", filesystem=s3_fs, format="parquet"
+    def cached_path(self, filepath: str) -> str:
+        """
+        Local copy of an object of the bucket, refreshed when its ETag changes.
+        """
+        local_path = self.cache.fetch(
+            self.bucket_name,
+            filepath,
+            self.object_etag(filepath),
+            download=lambda path: self.download(filepath, path),
         )
 
-        return pl.scan_pyarrow_dataset(ds)
+        return str(local_path)
+
+    def download(self, key: str, local_path: str) -> str:
+        """
+        Download an object, large objects as concurrent ranged reads of parts.
+        """
+        self.fs.get_file(
+            f"{self.bucket_name}/{key}",
+            local_path,
+            chunksize=self.io_conf.part_size,
+            max_concurrency=self.io_conf.max_concurrency,
+        )
+        return local_path
+
+    def upload(self, local_path: str, key: str) -> str:
+        """
+        Upload a local file, large files as a multipart upload of concurrent parts.
+        """
+        self.fs.put_file(
+            local_path,
+            f"{self.bucket_name}/{key}",
+            chunksize=self.io_conf.part_size,
+            max_concurrency=self.io_conf.max_concurrency,
+        )
+        return self.uri(key)
+
+    def manifest_key(self, prefix: str) -> str:
+        return f"{prefix}/{MANIFEST_FILE}"
+
+    def update_manifest(
+        self,
+        prefix: str,
+        columns: list[str],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> IngestionManifest:
+        """
+        Index the parquet files under a raw prefix into its manifest.
+
+        The prefix is only listed here, when files are ingested: the footers of the
+        new or changed files are read, the other entries are kept as they were.
+        """
+        root = f"{self.bucket_name}/{prefix}"
+
+        listing = {
+            path.removeprefix(f"{root}/"): file_version(info)
+            for path, info in self.fs.find(root, detail=True).items()
+            if path.endswith(".parquet")
+        }
+        previous = IngestionManifest.from_dict(
+            self.read_json(self.manifest_key(prefix))
+        )
+
+        manifest = update_manifest(
+            self.fs, root, listing, columns, previous, max_workers
+        )
+        self.write_json(self.manifest_key(prefix), manifest.to_dict())
+
+        return manifest
+
+    def scan_manifest(
+        self,
+        prefix: str,
+        bounds: Bounds | None = None,
+        columns: list[str] | None = None,
+    ) -> LazyFrame:
+        """
+        Lazily scan the files of a raw prefix indexed by `update_manifest`.
+
+        Only the files with row groups whose statistics overlap the bounds are
+        scanned, without listing the prefix nor opening the other files. The bounds
+        filter and the projections of the query are pushed down to the row groups of
+        these files, which are streamed rather than loaded upfront.
+
+        Args:
+            bounds: Inclusive (min, max) of indexed columns, None for an open end
+            columns: Columns to read, all of them if None
+        """
+        manifest = IngestionManifest.from_dict(
+            self.read_json(self.manifest_key(prefix))
+        )
+        if not manifest.files:
+            raise FileNotFoundError(f"No manifest indexing {self.uri(prefix)}")
+
+        selection = manifest.select(bounds)
+        logger.info(
+            f"Scanning {sum(map(len, selection.values()))} row groups of "
+            f"{len(selection)}/{len(manifest.files)} files in "
+            f"{self.uri(prefix)}"
+        )
+
+        # No rows without a match, but the schema of the input
+        keys = sorted(selection) or [manifest.files[0].key]
+        lf = pl.scan_parquet(
+            [self.uri(f"{prefix}/{key}") for key in keys], **self.polars_options
+        )
+
+        if not selection:
+            lf = lf.clear()
+        elif bounds:
+            lf = lf.filter(bounds_predicate(bounds, lf.collect_schema()))
+        if columns is not None:
+            lf = lf.select(columns)
+
+        return instrumentation.materialize("NBABucket.scan_manifest", lf)
 
     def sink_parquet(
-        self, lf: LazyFrame, output_key: str, folder: str = "processed"
+        self,
+        lf: LazyFrame,
+        output_key: str,
+        folder: str = "processed",
+        compression: str = "snappy",
+        row_group_size: int | None = None,
+        sort_by: list[str] | None = None,
+        statistics: bool | str = True,
     ) -> str:
         """
-        Write a Polars LazyFrame to S3 in Parquet format.
+        Stream a Polars LazyFrame to S3 in Parquet format.
+
+        The query runs on Polars' streaming engine and is uploaded in row-group
+        sized batches, so the result is never fully materialized in memory. Rows
+        sorted on `sort_by` give each row group a narrow min/max range.
         """
 
-        logger.info(f"Writing data to s3://{self.bucket_name}/{folder}/{output_key}")
+        output_path = self.uri(f"{folder}/{output_key}")
+        if sort_by:
+            lf = lf.sort(sort_by)
 
-        output_path = f"s3://{self.bucket_name}/{folder}/{output_key}"
+        logger.info(f"Streaming data to {output_path}")
 
-        with self.fs.open(output_path, "wb") as f:
-            lf.collect().write_parquet(
-                f, compression="snappy", storage_options=self.storage_options
+        with instrumentation.track(
+            "NBABucket.sink_parquet",
+            inputs=[lf],
+            bytes_out=lambda: self.object_size(f"{folder}/{output_key}"),
+        ):
+            lf.sink_parquet(
+                output_path,
+                compression=compression,
+                row_group_size=row_group_size,
+                statistics=statistics,
+                **self.sink_options,
+                engine="streaming",
             )
 
         logger.info(f"Data written to: {output_path}")
 
         return output_path
 
+    def sink_output(self, lf: LazyFrame, output: ProcessedOutput) -> str:
+        """
+        Write a processed output with its layout, a single file or a hive tree.
+
+        Returns:
+            The path of the file, or the glob of every partition
+        """
+        if output.layout.partition_by is not None:
+            return self.sink_partitioned(
+                lf,
+                output.partitioned_key,
+                output.layout.partition_by,
+                **output.layout.sink_options(),
+            )
+
+        return self.sink_parquet(lf, output.key, **output.layout.sink_options())
+
+    def partitioned_path(self, output_key: str, folder: str = "processed") -> str:
+        """
+        Glob matching every file of a hive-partitioned output.
+        """
+        return self.uri(f"{folder}/{output_key}/**/*.parquet")
+
+    def scan_partitioned(self, output_key: str, folder: str = "processed") -> LazyFrame:
+        """
+        Scan every partition of a hive-partitioned output written by `sink_partitioned`.
+        """
+        output_path = self.partitioned_path(output_key, folder)
+
+        logger.info(f"Scanning partitioned dataset: {output_path}")
+
+        lf = pl.scan_parquet(output_path, **self.polars_options)
+
+        return instrumentation.materialize(
+            "NBABucket.scan_partitioned",
+            lf,
+            bytes_in=lambda: self.fs.du(f"{self.bucket_name}/{folder}/{output_key}"),
+        )
+
+    def sink_partitioned(
+        self,
+        lf: LazyFrame,
+        output_key: str,
+        partition_by: str,
+        folder: str = "processed",
+        compression: str = "snappy",
+        row_group_size: int | None = None,
+        sort_by: list[str] | None = None,
+        statistics: bool | str = True,
+    ) -> str:
+        """
+        Stream a Polars LazyFrame to S3 as a hive-partitioned Parquet dataset.
+
+        Only the partitions present in the LazyFrame are (over)written, the other
+        partitions already in the output directory are left untouched. Rows are
+        sorted on `sort_by` within each partition file.
+        """
+
+        base_path = self.uri(f"{folder}/{output_key}")
+        if sort_by:
+            lf = lf.sort(sort_by)
+
+        logger.info(f"Streaming data to {base_path}, partitioned by {partition_by}")
+
+        with instrumentation.track(
+            "NBABucket.sink_partitioned",
+            inputs=[lf],
+            bytes_out=lambda: self.fs.du(f"{self.bucket_name}/{folder}/{output_key}"),
+        ):
+            lf.sink_parquet(
+                pl.PartitionByKey(base_path, by=partition_by, include_key=True),
+                compression=compression,
+                row_group_size=row_group_size,
+                statistics=statistics,
+                **self.sink_options,
+                engine="streaming",
+            )
+
+        return self.partitioned_path(output_key, folder)
+
+    def remove_partitions(
+        self,
+        output_key: str,
+        partition_by: str,
+        partitions: list[str],
+        folder: str = "processed",
+    ) -> None:
+        """
+        Delete partitions of a hive-partitioned output written by `sink_partitioned`.
+        """
+        for partition in partitions:
+            path = (
+                f"{self.bucket_name}/{folder}/{output_key}/{partition_by}={partition}"
+            )
+
+            if self.fs.exists(path):
+                logger.info(f"Removing partition {path}")
+                self.fs.rm(path, recursive=True)
+
+    def object_etag(self, key: str) -> str | None:
+        """
+        ETag of an object in the bucket, None if it does not exist.
+        """
+        path = f"{self.bucket_name}/{key}"
+
+        if not self.fs.exists(path):
+            return None
+
+        return file_version(self.fs.info(path))
+
+    def glob_etags(self, uri: str) -> dict[str, str]:
+        """
+        ETag of every object matching a URI or glob, as returned by `uri`.
+        """
+        listing = self.fs.glob(uri, detail=True)
+
+        return {path: file_version(info) for path, info in sorted(listing.items())}
+
+    def object_size(self, key: str) -> int:
+        return self.fs.info(f"{self.bucket_name}/{key}")["size"]
+
+    def move(self, source_key: str, destination_key: str) -> None:
+        self.fs.mv(
+            f"{self.bucket_name}/{source_key}", f"{self.bucket_name}/{destination_key}"
+        )
+
+    def read_json(self, key: str) -> dict | None:
+        path = f"{self.bucket_name}/{key}"
+
+        if not self.fs.exists(path):
+            return None
+
+        with self.fs.open(path, "rb") as f:
+            return json.load(f)
+
+    def write_json(self, key: str, data: dict) -> None:
+        with self.fs.open(f"{self.bucket_name}/{key}", "wb") as f:
+            f.write(json.dumps(data, indent=2).encode())
+
 
 nba_bucket = NBABucket()
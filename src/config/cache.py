@@ -0,0 +1,105 @@
+import hashlib
+import os
+import tempfile
+
+from pathlib import Path
+from typing import Callable
+
+from loguru import logger
+
+
+PARTIAL_SUFFIX = ".partial"
+
+
+class LocalCache:
+    """Size-bounded LRU cache of S3 objects on local disk.
+
+    Entries are content-addressed by bucket, key and ETag: a changed object gets a
+    new entry and its stale versions age out through the LRU eviction.
+
+    The cache is enabled by the NBA_CACHE_DIR environment variable, its size is
+    bounded by NBA_CACHE_MAX_BYTES (10 GiB by default).
+    """
+
+    DEFAULT_MAX_BYTES = 10 * 1024**3
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls) -> "LocalCache | None":
+        cache_dir = os.getenv("NBA_CACHE_DIR")
+        if not cache_dir:
+            return None
+
+        max_bytes = int(os.getenv("NBA_CACHE_MAX_BYTES", cls.DEFAULT_MAX_BYTES))
+        return cls(cache_dir, max_bytes)
+
+    def entry_path(self, bucket: str, key: str, etag: str) -> Path:
+        digest = hashlib.sha256(f"{bucket}/{key}/{etag}".encode()).hexdigest()
+        return self.cache_dir / f"{digest}{Path(key).suffix}"
+
+    def fetch(
+        self, bucket: str, key: str, etag: str, download: Callable[[str], None]
+    ) -> Path:
+        """
+        Local path of the object, downloaded with `download(path)` on a cache miss.
+        """
+        path = self.entry_path(bucket, key, etag)
+
+        if path.exists():
+            logger.info(f"Cache hit for s3://{bucket}/{key} ({etag})")
+            # Refresh the modification time, which orders the LRU eviction
+            path.touch()
+            return path
+
+        logger.info(f"Cache miss for s3://{bucket}/{key} ({etag}), downloading")
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # A download file per writer: concurrent misses of the same object never
+        # write into the same file, the last complete download is published
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir,
+            prefix=f"{path.name}.",
+            suffix=PARTIAL_SUFFIX,
+            delete=False,
+        ) as partial_file:
+            partial_path = Path(partial_file.name)
+
+        try:
+            download(str(partial_path))
+            os.replace(partial_path, path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+
+        self.evict(keep=path)
+
+        return path
+
+    def evict(self, keep: Path | None = None) -> None:
+        """
+        Remove the least recently used entries until the cache fits its size bound.
+
+        Downloads in progress are not entries yet and are never evicted.
+        """
+        entries = sorted(
+            (
+                entry
+                for entry in self.cache_dir.iterdir()
+                if entry.is_file() and entry.suffix != PARTIAL_SUFFIX
+            ),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        total_bytes = sum(entry.stat().st_size for entry in entries)
+
+        for entry in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+
+            total_bytes -= entry.stat().st_size
+            entry.unlink()
+            logger.info(f"Evicted {entry.name} from the cache")
@@ -1,13 +1,55 @@
+from typing import Any
+
+import polars as pl
+
 from prefect import task
+from prefect.context import TaskRunContext
 from loguru import logger
 
+import config
+from config import ProcessedOutput
+from config.bucket import nba_bucket
+from config.task_cache import cache_options, code_version, fingerprint
 from config.motherduck import nba_db
+from config.rollups import ROLLUP_PARTITION, source_rollups
 
 
-@task(log_prints=True)
+def export_cache_key(context: TaskRunContext, parameters: dict[str, Any]) -> str:
+    """
+    Cache key of a table load, changed by the ETags of the exported files, the
+    table configuration or the target database.
+    """
+    table_name = parameters["table_name"]
+
+    return fingerprint(
+        context.task.name,
+        parameters,
+        nba_bucket.glob_etags(parameters["filepath"]),
+        code_version(["config.export", "config.motherduck", "config.rollups"]),
+        config.database_conf.table(table_name),
+        nba_db.mode.value,
+        nba_db.database,
+    )
+
+
+def refresh_rollups(table_name: str, seasons: list | None) -> None:
+    """
+    Refresh the rollups of a loaded table, for the seasons changed by a merge or
+    entirely when the table was replaced.
+    """
+    for rollup in source_rollups(table_name):
+        nba_db.refresh_table(
+            rollup.name, rollup.query, rollup.order_by, ROLLUP_PARTITION, seasons
+        )
+
+
+@task(log_prints=True, **cache_options(export_cache_key))
 def export_to_duckdb(filepath: str, table_name: str) -> str:
     """Export a parquet file to DuckDB table.
 
+    The table is replaced or merged on its keys, as configured in parameters.yml,
+    then its rollups are refreshed.
+
     Args:
         filepath: Path to the parquet file (local or S3)
         table_name: Name of the table to create in DuckDB
@@ -16,5 +58,46 @@ def export_to_duckdb(filepath: str, table_name: str) -> str:
         The table name that was created
     """
     logger.info(f"Exporting {filepath} to DuckDB table {table_name}")
-    nba_db.create_table_from_file(filepath, table_name)
+    merge_keys = config.database_conf.table(table_name).merge_keys
+    seasons = nba_db.create_table_from_file(
+        filepath, table_name, merge_keys, ROLLUP_PARTITION
+    )
+    refresh_rollups(table_name, seasons)
     return table_name
+
+
+@task(log_prints=True)
+def export_frame_to_duckdb(df: pl.DataFrame, table_name: str) -> str:
+    """Export an already collected DataFrame to DuckDB table, through Arrow.
+
+    The table is replaced or merged on its keys, as configured in parameters.yml,
+    then its rollups are refreshed.
+
+    Args:
+        df: Processed stats to load
+        table_name: Name of the table to create in DuckDB
+
+    Returns:
+        The table name that was created
+    """
+    logger.info(f"Exporting {df.height} rows to DuckDB table {table_name}")
+    merge_keys = config.database_conf.table(table_name).merge_keys
+    seasons = nba_db.create_table_from_arrow(
+        df.to_arrow(), table_name, merge_keys, ROLLUP_PARTITION
+    )
+    refresh_rollups(table_name, seasons)
+    return table_name
+
+
+@task(log_prints=True)
+def export_frame_to_bucket(df: pl.DataFrame, output: ProcessedOutput) -> str:
+    """Write an already collected DataFrame to the processed folder of the bucket.
+
+    Args:
+        df: Processed stats to write
+        output: Processed output, with the layout it is written with
+
+    Returns:
+        The path of the written parquet file, or the glob of its partitions
+    """
+    return nba_bucket.sink_output(df.lazy(), output)
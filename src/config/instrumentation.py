@@ -0,0 +1,208 @@
+import functools
+import os
+import resource
+import sys
+import time
+
+from contextlib import ContextDecorator, contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator
+
+import polars as pl
+
+from loguru import logger
+from polars import DataFrame, LazyFrame
+from prefect.artifacts import create_table_artifact
+
+
+@dataclass
+class StepRecord:
+    """Measures of one pipeline step or bucket I/O."""
+
+    name: str
+    seconds: float | None = None
+    rows_in: int | None = None
+    rows_out: int | None = None
+    # Bytes read or written, or the in-memory size of a materialized output
+    bytes_in: int | None = None
+    bytes_out: int | None = None
+    # High-water mark of the process when the step ended
+    peak_rss_bytes: int | None = None
+
+
+# Records of the instrumented run of the current task
+_run_records: ContextVar[list[StepRecord] | None] = ContextVar(
+    "run_records", default=None
+)
+
+
+def peak_rss_bytes() -> int:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes on Linux
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def count_rows(frames: list[LazyFrame]) -> int:
+    return sum(lf.select(pl.len()).collect().item() for lf in frames)
+
+
+class Instrumentation:
+    """Per-step timing and memory measures of the processor pipelines.
+
+    When enabled, every instrumented step is materialized so that its wall time,
+    rows and memory are its own rather than spread over the fused lazy plan. The
+    measures are logged and published as a Prefect table artifact per run.
+
+    Enabled by the NBA_INSTRUMENT environment variable. NBA_PROFILE_DIR additionally
+    dumps the Polars profile of every step as CSV in that directory. When disabled,
+    steps run untouched: the only cost is a flag check while building the plan.
+    """
+
+    def __init__(self, enabled: bool = False, profile_dir: str | Path | None = None):
+        self.enabled = enabled
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+
+    @classmethod
+    def from_env(cls) -> "Instrumentation":
+        enabled = os.getenv("NBA_INSTRUMENT", "").lower() in ("1", "true", "yes")
+        return cls(enabled, os.getenv("NBA_PROFILE_DIR"))
+
+    @contextmanager
+    def track(
+        self,
+        name: str,
+        inputs: list[LazyFrame] | None = None,
+        bytes_in: Callable[[], int] | None = None,
+        bytes_out: Callable[[], int] | None = None,
+    ) -> Iterator[StepRecord | None]:
+        """
+        Measure the block as a step, yielding its record to complete (None if disabled).
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        record = StepRecord(name=name, rows_in=count_rows(inputs) if inputs else None)
+        if bytes_in is not None:
+            record.bytes_in = bytes_in()
+
+        start = time.perf_counter()
+        yield record
+        record.seconds = time.perf_counter() - start
+
+        if bytes_out is not None:
+            record.bytes_out = bytes_out()
+        record.peak_rss_bytes = peak_rss_bytes()
+
+        logger.info(f"Instrumented {record}")
+        records = _run_records.get()
+        if records is not None:
+            records.append(record)
+
+    def collect(self, name: str, lf: LazyFrame) -> DataFrame:
+        if self.profile_dir is None:
+            return lf.collect()
+
+        df, profile = lf.profile()
+
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        profile.write_csv(
+            self.profile_dir / f"{name}-{datetime.now():%Y%m%dT%H%M%S%f}.csv"
+        )
+
+        return df
+
+    def materialize(
+        self,
+        name: str,
+        lf: LazyFrame,
+        bytes_in: Callable[[], int] | None = None,
+    ) -> LazyFrame:
+        """
+        Materialize a LazyFrame as a measured step, returned untouched if disabled.
+        """
+        if not self.enabled:
+            return lf
+
+        with self.track(name, bytes_in=bytes_in) as record:
+            df = self.collect(name, lf)
+            record.rows_out = df.height
+            record.bytes_out = df.estimated_size()
+
+        return df.lazy()
+
+    def step(self, func: Callable[..., LazyFrame]) -> Callable[..., LazyFrame]:
+        """
+        Decorate a pipeline step building a LazyFrame from LazyFrames.
+        """
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+
+            inputs = [
+                arg for arg in (*args, *kwargs.values()) if isinstance(arg, LazyFrame)
+            ]
+
+            with self.track(name, inputs) as record:
+                df = self.collect(name, func(*args, **kwargs))
+                record.rows_out = df.height
+                record.bytes_out = df.estimated_size()
+
+            return df.lazy()
+
+        return wrapper
+
+    def run(self, key: str) -> "InstrumentedRun":
+        """
+        Gather the records of the steps run within, published under the artifact key.
+
+        Also usable as a decorator of the tasks running a pipeline.
+        """
+        return InstrumentedRun(self, key)
+
+
+class InstrumentedRun(ContextDecorator):
+    """Run gathering the records of its steps.
+
+    Unlike a generator-based context manager, it can be pickled along with the
+    tasks it decorates, to run them in worker processes.
+    """
+
+    def __init__(self, instrumentation: Instrumentation, key: str):
+        self.instrumentation = instrumentation
+        self.key = key
+        self.records = None
+        self.token = None
+
+    def _recreate_cm(self) -> "InstrumentedRun":
+        # A fresh run for every call of a decorated task, which may run concurrently
+        return InstrumentedRun(self.instrumentation, self.key)
+
+    def __enter__(self) -> None:
+        if self.instrumentation.enabled:
+            self.records = []
+            self.token = _run_records.set(self.records)
+
+    def __exit__(self, *exc_info) -> bool:
+        if self.token is None:
+            return False
+
+        _run_records.reset(self.token)
+
+        if self.records and exc_info[0] is None:
+            create_table_artifact(
+                key=self.key,
+                table=[asdict(record) for record in self.records],
+                description=f"Per-step timings and memory of {self.key}",
+            )
+
+        return False
+
+
+instrumentation = Instrumentation.from_env()
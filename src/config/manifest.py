@@ -0,0 +1,221 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any
+
+import polars as pl
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from fsspec import AbstractFileSystem
+
+MANIFEST_FILE = "_manifest.json"
+DEFAULT_MAX_WORKERS = 8
+
+# Bounds of a scan on indexed columns, inclusive, None for an open end
+Bounds = dict[str, tuple[Any, Any]]
+
+
+def stats_value(value: Any) -> Any:
+    """
+    JSON value of a statistic or bound, comparable with the other values of its column.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+@dataclass
+class RowGroupStats:
+    num_rows: int
+    # Min and max of each indexed column, missing when the writer stored none
+    min_max: dict[str, list] = field(default_factory=dict)
+
+    def overlaps(self, bounds: Bounds) -> bool:
+        """
+        Whether the row group may hold rows within the bounds of every column.
+        """
+        for column, (lower, upper) in bounds.items():
+            if column not in self.min_max:
+                continue
+
+            column_min, column_max = self.min_max[column]
+            if lower is not None and column_max < stats_value(lower):
+                return False
+            if upper is not None and column_min > stats_value(upper):
+                return False
+
+        return True
+
+
+@dataclass
+class FileEntry:
+    key: str
+    etag: str
+    num_rows: int
+    row_groups: list[RowGroupStats] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FileEntry":
+        return cls(
+            key=data["key"],
+            etag=data["etag"],
+            num_rows=data["num_rows"],
+            row_groups=[RowGroupStats(**stats) for stats in data["row_groups"]],
+        )
+
+
+@dataclass
+class IngestionManifest:
+    """
+    Index of the parquet files of a raw input, with statistics of their row groups.
+
+    Scans are planned from the manifest alone: the selected files are opened, the
+    others are neither listed nor have their footers read.
+    """
+
+    columns: list[str] = field(default_factory=list)
+    files: list[FileEntry] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "IngestionManifest":
+        if not data:
+            return cls()
+        return cls(
+            columns=data["columns"],
+            files=[FileEntry.from_dict(entry) for entry in data["files"]],
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @property
+    def num_rows(self) -> int:
+        return sum(entry.num_rows for entry in self.files)
+
+    def select(self, bounds: Bounds | None = None) -> dict[str, list[int]]:
+        """
+        Row groups of each file that may hold rows within the bounds.
+
+        Returns:
+            The indices of the selected row groups, keyed by file
+        """
+        selection = {}
+
+        for entry in self.files:
+            row_groups = [
+                index
+                for index, stats in enumerate(entry.row_groups)
+                if not bounds or stats.overlaps(bounds)
+            ]
+            if row_groups:
+                selection[entry.key] = row_groups
+
+        return selection
+
+
+def bounds_predicate(bounds: Bounds, schema: pl.Schema) -> pl.Expr:
+    """
+    Filter of the rows within the bounds, pushed down to the row group statistics
+    of the scan.
+
+    Legacy string columns are left out: they compare as text, not as the typed
+    bounds, so the rows are filtered on their parsed values by the caller.
+    """
+    predicates = []
+
+    for column, (lower, upper) in bounds.items():
+        if column not in schema or schema[column] == pl.String:
+            continue
+        if lower is not None:
+            predicates.append(pl.col(column) >= lower)
+        if upper is not None:
+            predicates.append(pl.col(column) <= upper)
+
+    return pl.all_horizontal(predicates) if predicates else pl.lit(True)
+
+
+def file_version(info: dict) -> str:
+    """
+    ETag of a listed file, or its size and modification time on local filesystems.
+    """
+    if "ETag" in info:
+        return info["ETag"]
+
+    return f"{info['size']}-{info.get('mtime', info.get('LastModified'))}"
+
+
+def index_file(
+    fs: "AbstractFileSystem", path: str, key: str, etag: str, columns: list[str]
+) -> FileEntry:
+    """
+    Index a parquet file from its footer.
+    """
+    import pyarrow.parquet as pq
+
+    with fs.open(path, "rb") as f:
+        metadata = pq.ParquetFile(f).metadata
+
+    row_groups = []
+    for index in range(metadata.num_row_groups):
+        row_group = metadata.row_group(index)
+        min_max = {}
+
+        for column_index in range(row_group.num_columns):
+            column = row_group.column(column_index)
+            statistics = column.statistics
+
+            if column.path_in_schema not in columns or statistics is None:
+                continue
+            if statistics.has_min_max:
+                min_max[column.path_in_schema] = [
+                    stats_value(statistics.min),
+                    stats_value(statistics.max),
+                ]
+
+        row_groups.append(RowGroupStats(num_rows=row_group.num_rows, min_max=min_max))
+
+    return FileEntry(
+        key=key, etag=etag, num_rows=metadata.num_rows, row_groups=row_groups
+    )
+
+
+def update_manifest(
+    fs: "AbstractFileSystem",
+    root: str,
+    listing: dict[str, str],
+    columns: list[str],
+    previous: IngestionManifest | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> IngestionManifest:
+    """
+    Index the listed files, reusing the entries of the files whose ETag is unchanged.
+
+    Args:
+        root: Path of the filesystem the file keys are relative to
+        listing: ETag of every file of the input, keyed by file key
+        columns: Columns whose row group min and max are indexed
+    """
+    previous = previous or IngestionManifest()
+    known = {
+        entry.key: entry
+        for entry in previous.files
+        if previous.columns == columns and entry.etag == listing.get(entry.key)
+    }
+    changed = sorted(key for key in listing if key not in known)
+
+    logger.info(f"Indexing {len(changed)}/{len(listing)} new or changed files")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        indexed = executor.map(
+            lambda key: index_file(fs, f"{root}/{key}", key, listing[key], columns),
+            changed,
+        )
+        entries = {**known, **{entry.key: entry for entry in indexed}}
+
+    return IngestionManifest(
+        columns=columns, files=[entries[key] for key in sorted(entries)]
+    )
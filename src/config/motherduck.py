@@ -1,10 +1,15 @@
 import os
+import threading
 from enum import Enum
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import duckdb
 from loguru import logger
 
+if TYPE_CHECKING:
+    import duckdb
+    import pyarrow as pa
+
 
 class DBMode(Enum):
     LOCAL = "local"
@@ -25,6 +30,8 @@ class DuckDB:
         self.database = database
         self._mode = self._resolve_mode()
         self._conn = None
+        self._conn_lock = threading.RLock()
+        self._s3_configured = False
 
     @staticmethod
     def _resolve_mode() -> DBMode:
@@ -71,11 +78,14 @@ class DuckDB:
         return f"md:{self.database}?motherduck_token={token}"
 
     @property
-    def conn(self) -> duckdb.DuckDBPyConnection:
-        if self._conn is None:
-            logger.info(f"Connecting to DuckDB in {self._mode.value} mode")
-            self._conn = duckdb.connect(self.conn_str)
-            self._configure_s3_access()
+    def conn(self) -> "duckdb.DuckDBPyConnection":
+        with self._conn_lock:
+            if self._conn is None:
+                logger.info(f"Connecting to DuckDB in {self._mode.value} mode")
+                # Imported with the first connection, not with the flow
+                import duckdb
+
+                self._conn = duckdb.connect(self.conn_str)
         return self._conn
 
     def _configure_s3_access(self) -> None:
@@ -83,26 +93,233 @@ class DuckDB:
 
         Uses DuckDB's load_aws_credentials() which follows the AWS SDK credential
         provider chain: environment variables → ~/.aws/credentials → IAM role.
+
+        Done on the first S3 read only, so that local files load offline.
         """
-        self._conn.execute("INSTALL httpfs; LOAD httpfs;")
-        self._conn.execute("CALL load_aws_credentials();")
+        if self._s3_configured:
+            return
+
+        self.conn.execute("INSTALL httpfs; LOAD httpfs;")
+        self.conn.execute("CALL load_aws_credentials();")
+        self._s3_configured = True
         logger.info("AWS credentials loaded for S3 access")
 
     def close(self) -> None:
         if self._conn is not None:
             self._conn.close()
             self._conn = None
+            self._s3_configured = False
+
+    def create_table_from_file(
+        self,
+        filepath: str,
+        table_name: str,
+        merge_keys: list[str] | None = None,
+        partition_column: str | None = None,
+    ) -> list | None:
+        """Create a table from a parquet file, or merge the file into it on keys.
+
+        Returns:
+            The partitions of the merged rows, when a partition column is given
+            and the table was merged, None otherwise
+        """
+        logger.info(
+            f'Loading DuckDB table "{table_name}" from "{filepath}" ({self._mode.value} mode)'
+        )
+
+        # The connection is shared by concurrent export tasks
+        with self._conn_lock:
+            if filepath.startswith("s3://"):
+                self._configure_s3_access()
+            # The hive directories would type the partition column as BIGINT, unlike
+            # the Arrow tables, and every merge would turn into a full replace
+            return self._write_table(
+                f"read_parquet('{filepath}', hive_partitioning = false)",
+                table_name,
+                merge_keys,
+                partition_column,
+            )
+
+    def create_table_from_arrow(
+        self,
+        table: "pa.Table",
+        table_name: str,
+        merge_keys: list[str] | None = None,
+        partition_column: str | None = None,
+    ) -> list | None:
+        """Create a table from an in-memory Arrow table.
+
+        The Arrow buffers are registered as a view without copying, so DuckDB reads
+        the data directly instead of downloading and decoding a parquet file.
+        Returns the merged partitions, as `create_table_from_file`.
+        """
+        logger.info(
+            f'Loading DuckDB table "{table_name}" from Arrow ({self._mode.value} mode)'
+        )
+        view_name = f"{table_name}_arrow"
+
+        # The connection is shared by concurrent export tasks
+        with self._conn_lock:
+            self.conn.register(view_name, table)
+            try:
+                return self._write_table(
+                    view_name, table_name, merge_keys, partition_column
+                )
+            finally:
+                self.conn.unregister(view_name)
+
+    def _write_table(
+        self,
+        source: str,
+        table_name: str,
+        merge_keys: list[str] | None,
+        partition_column: str | None = None,
+    ) -> list | None:
+        """Replace the table with the source, or merge the source into it on keys.
+
+        A full replace is still done when the table does not exist yet or when its
+        columns differ from the source ones. Replaced tables are sorted on their
+        keys, so that the zone maps of the leading key skip most row groups.
+        """
+        partitions = None
+
+        if merge_keys and self._same_columns(source, table_name):
+            partitions = self._merge_table(
+                source, table_name, merge_keys, partition_column
+            )
+        else:
+            order_by = ", ".join(f'"{key}"' for key in merge_keys or [])
+            self.conn.execute(f"""
+                CREATE OR REPLACE TABLE {table_name}
+                AS SELECT * FROM {source}
+                {f"ORDER BY {order_by}" if order_by else ""};
+            """)
+
+        row_count = self.conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[
+            0
+        ]
+        logger.info(f'Table "{table_name}" loaded with {row_count} rows')
+
+        return partitions
 
-    def create_table_from_file(self, filepath: str, table_name: str) -> None:
-        logger.info(f'Creating DuckDB table "{table_name}" from "{filepath}" ({self._mode.value} mode)')
+    def _same_columns(self, source: str, table_name: str) -> bool:
+        if not self.table_exists(table_name):
+            return False
+
+        source_columns = self.conn.execute(
+            f"DESCRIBE SELECT * FROM {source}"
+        ).fetchall()
+        table_columns = self.conn.execute(f"DESCRIBE {table_name}").fetchall()
+
+        return [column[:2] for column in source_columns] == [
+            column[:2] for column in table_columns
+        ]
+
+    def _merge_table(
+        self,
+        source: str,
+        table_name: str,
+        merge_keys: list[str],
+        partition_column: str | None = None,
+    ) -> list | None:
+        """Upsert the new and changed rows of the source into the table.
+
+        Rows are staged first, then the outdated rows are deleted and the changed
+        ones inserted in a single transaction, so readers never see a partial load.
+
+        Returns:
+            The distinct values of the partition column among the changed rows
+        """
+        staging_table = f"{table_name}_staging"
+        changes_table = f"{table_name}_changes"
+        keys_match = " AND ".join(
+            f'{table_name}."{key}" IS NOT DISTINCT FROM {changes_table}."{key}"'
+            for key in merge_keys
+        )
 
         self.conn.execute(f"""
-            CREATE OR REPLACE TABLE {table_name}
-            AS SELECT * FROM '{filepath}';
+            CREATE OR REPLACE TEMP TABLE {staging_table} AS SELECT * FROM {source};
+            CREATE OR REPLACE TEMP TABLE {changes_table} AS
+                SELECT * FROM {staging_table} EXCEPT SELECT * FROM {table_name};
         """)
 
-        row_count = self.conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
-        logger.info(f'Table "{table_name}" created with {row_count} rows')
+        changed_rows = self.conn.execute(
+            f"SELECT COUNT(*) FROM {changes_table}"
+        ).fetchone()[0]
+        logger.info(f'Merging {changed_rows} new or changed rows into "{table_name}"')
+
+        partitions = None
+        if partition_column is not None:
+            partitions = [
+                row[0]
+                for row in self.conn.execute(f"""
+                    SELECT DISTINCT "{partition_column}" FROM {changes_table}
+                    ORDER BY ALL
+                """).fetchall()
+            ]
+
+        try:
+            self.conn.execute("BEGIN TRANSACTION;")
+            self.conn.execute(f"""
+                DELETE FROM {table_name} USING {changes_table} WHERE {keys_match};
+                INSERT INTO {table_name} SELECT * FROM {changes_table};
+            """)
+            self.conn.execute("COMMIT;")
+        except Exception:
+            self.conn.execute("ROLLBACK;")
+            raise
+        finally:
+            self.conn.execute(f"""
+                DROP TABLE IF EXISTS {staging_table};
+                DROP TABLE IF EXISTS {changes_table};
+            """)
+
+        return partitions
+
+    def refresh_table(
+        self,
+        table_name: str,
+        query: str,
+        order_by: list[str],
+        partition_column: str,
+        partitions: list | None = None,
+    ) -> None:
+        """Materialize a query as a table, sorted for the zone maps of its reads.
+
+        Only the given partitions are recomputed, deleted and inserted in a single
+        transaction; the whole table is rebuilt when partitions is None or when it
+        does not exist yet.
+        """
+        ordering = ", ".join(f'"{column}"' for column in order_by)
+
+        with self._conn_lock:
+            if partitions is None or not self.table_exists(table_name):
+                self.conn.execute(f"""
+                    CREATE OR REPLACE TABLE {table_name} AS
+                    SELECT * FROM ({query}) ORDER BY {ordering};
+                """)
+                logger.info(f'Table "{table_name}" rebuilt')
+                return
+
+            if not partitions:
+                return
+
+            values = ", ".join(repr(partition) for partition in partitions)
+            in_partitions = f'"{partition_column}" IN ({values})'
+
+            try:
+                self.conn.execute("BEGIN TRANSACTION;")
+                self.conn.execute(f"""
+                    DELETE FROM {table_name} WHERE {in_partitions};
+                    INSERT INTO {table_name}
+                    SELECT * FROM ({query}) WHERE {in_partitions} ORDER BY {ordering};
+                """)
+                self.conn.execute("COMMIT;")
+            except Exception:
+                self.conn.execute("ROLLBACK;")
+                raise
+
+            logger.info(f'Table "{table_name}" refreshed for {values}')
 
     def table_exists(self, table_name: str) -> bool:
         result = self.conn.execute(f"""
@@ -0,0 +1,196 @@
+from dataclasses import dataclass, field, asdict
+from typing import Callable
+
+import polars as pl
+
+from loguru import logger
+from polars import LazyFrame
+
+from config import OutputLayout
+from config.bucket import nba_bucket
+
+PARTITION_KEY = "season"
+
+
+@dataclass
+class PartitionManifest:
+    """
+    Fingerprints of the source data behind each partition of a processed output.
+    """
+
+    source_etags: dict[str, str] = field(default_factory=dict)
+    fingerprints: dict[str, str] = field(default_factory=dict)
+    backfilled: list[str] = field(default_factory=list)
+    polars_version: str = pl.__version__
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "PartitionManifest":
+        if not data:
+            return cls()
+        return cls(**data)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def changed_partitions(self, fingerprints: dict[str, str]) -> list[str]:
+        """
+        List the partitions that are new or whose fingerprint changed.
+
+        Row hashes are only stable for a given Polars version, so a manifest written
+        by another version invalidates every partition.
+        """
+        if self.polars_version != pl.__version__:
+            return sorted(fingerprints)
+
+        return sorted(
+            partition
+            for partition, fingerprint in fingerprints.items()
+            if self.fingerprints.get(partition) != fingerprint
+        )
+
+    def removed_partitions(self, fingerprints: dict[str, str]) -> list[str]:
+        """
+        List the partitions no longer in the source, backfilled ones aside.
+        """
+        return sorted(
+            partition
+            for partition in self.fingerprints
+            if partition not in fingerprints and partition not in self.backfilled
+        )
+
+    def backfilled_fingerprints(self) -> dict[str, str]:
+        return {
+            partition: self.fingerprints[partition]
+            for partition in self.backfilled
+            if partition in self.fingerprints
+        }
+
+
+def manifest_key(output_key: str) -> str:
+    return f"processed/{output_key}/_manifest.json"
+
+
+def compute_fingerprints(
+    source: LazyFrame, partition_key: str = PARTITION_KEY
+) -> dict[str, str]:
+    """
+    Fingerprint each partition of the source from its row count and content hash.
+
+    Categorical codes are assigned per process in the order the strings are first
+    seen, so dictionary-encoded columns are hashed by their string values.
+    """
+    strings = {
+        column: pl.String
+        for column, dtype in source.collect_schema().items()
+        if isinstance(dtype, (pl.Categorical, pl.Enum))
+    }
+
+    fingerprints = (
+        source.cast(strings)
+        .group_by(partition_key)
+        .agg(
+            pl.len().alias("row_count"),
+            pl.struct(pl.all()).hash().sum().alias("content_hash"),
+        )
+        .collect()
+    )
+
+    return {
+        str(row[partition_key]): f"{row['row_count']}-{row['content_hash']}"
+        for row in fingerprints.iter_rows(named=True)
+    }
+
+
+def sink_incremental(
+    source: LazyFrame,
+    compute: Callable[[list[int]], LazyFrame],
+    output_key: str,
+    source_keys: list[str],
+    partition_key: str = PARTITION_KEY,
+    layout: OutputLayout | None = None,
+) -> str:
+    """
+    Recompute and write only the partitions whose source data changed.
+
+    Unchanged partitions of the processed output are kept as-is, and the partitions
+    no longer in the source are deleted, unless they were written by a backfill.
+    When none of the raw objects changed since the last run, the source data is not
+    even read.
+
+    Args:
+        source: Source rows feeding the output, carrying the partition key
+        compute: Builds the output LazyFrame restricted to the given partitions
+        output_key: Processed output directory, partitioned by `partition_key`
+        source_keys: Raw objects the output is derived from
+        layout: Sorting, row groups and statistics of the partition files
+
+    Returns:
+        The glob matching every partition of the processed output
+    """
+    manifest = PartitionManifest.from_dict(
+        nba_bucket.read_json(manifest_key(output_key))
+    )
+
+    source_etags = {key: nba_bucket.object_etag(key) for key in source_keys}
+    output_path = nba_bucket.partitioned_path(output_key)
+
+    if manifest.fingerprints and manifest.source_etags == source_etags:
+        logger.info(f"Raw sources unchanged, reusing {output_path}")
+        return output_path
+
+    fingerprints = compute_fingerprints(source, partition_key)
+    changed_partitions = manifest.changed_partitions(fingerprints)
+    removed_partitions = manifest.removed_partitions(fingerprints)
+
+    logger.info(
+        f"{len(changed_partitions)}/{len(fingerprints)} {partition_key} partitions "
+        f"changed: {changed_partitions}"
+    )
+
+    if changed_partitions:
+        output = compute([int(partition) for partition in changed_partitions])
+        layout = layout or OutputLayout()
+        nba_bucket.sink_partitioned(
+            output, output_key, partition_key, **layout.sink_options()
+        )
+
+    if removed_partitions:
+        logger.info(
+            f"{partition_key} partitions no longer in the source: {removed_partitions}"
+        )
+        nba_bucket.remove_partitions(output_key, partition_key, removed_partitions)
+
+    nba_bucket.write_json(
+        manifest_key(output_key),
+        PartitionManifest(
+            source_etags=source_etags,
+            fingerprints={**manifest.backfilled_fingerprints(), **fingerprints},
+            backfilled=manifest.backfilled,
+        ).to_dict(),
+    )
+
+    return output_path
+
+
+def record_partitions(output_key: str, fingerprints: dict[str, str]) -> None:
+    """
+    Add partitions written outside of `sink_incremental` to the output manifest.
+
+    The next incremental run sees these partitions unchanged and keeps them as-is,
+    even when they are not part of its source.
+    The raw sources ETags are left untouched, so a run still rebuilds the
+    partitions whose source data changed since the manifest was last written.
+    """
+    manifest = PartitionManifest.from_dict(
+        nba_bucket.read_json(manifest_key(output_key))
+    )
+
+    # Fingerprints of another Polars version are invalid, only the new ones are kept
+    if manifest.polars_version != pl.__version__:
+        manifest = PartitionManifest(
+            source_etags=manifest.source_etags, backfilled=manifest.backfilled
+        )
+
+    manifest.fingerprints.update(fingerprints)
+    manifest.backfilled = sorted({*manifest.backfilled, *fingerprints})
+    nba_bucket.write_json(manifest_key(output_key), manifest.to_dict())
@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+
+# Seasons are the unit of the incremental refresh of every rollup
+ROLLUP_PARTITION = "season"
+
+# Players with fewer games are left out of the leaders and the percentiles
+MIN_GAMES_PLAYED = 10
+
+# Player season metrics of the leaderboards and percentiles
+LEADER_METRICS = ["PTS", "REB", "AST", "STL", "BLK"]
+PERCENTILE_METRICS = [*LEADER_METRICS, "MIN", "TO", "FG%", "3P%", "FT%", "TS%"]
+PERCENTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+# Leaders kept per season, game type and metric
+LEADERS_PER_METRIC = 25
+
+# Leading digit of the regular season IDs, playoffs and play-in have their own
+REGULAR_SEASON_ID_PREFIX = "2"
+
+
+@dataclass
+class Rollup:
+    """
+    Small, pre-shaped table of a base table, read by the Evidence dashboards.
+
+    The query covers every season, a refresh filters it on the seasons changed by
+    the load of the source. Rows are stored sorted on the order_by columns.
+    """
+
+    name: str
+    source: str
+    query: str
+    order_by: list[str]
+
+
+def quoted(columns: list[str]) -> str:
+    return ", ".join(f'"{column}"' for column in columns)
+
+
+def rank_column(metric: str) -> str:
+    return f"{metric.lower()}_rank"
+
+
+LEADER_RANKS = ", ".join(
+    f'rank() OVER (PARTITION BY season, gameType ORDER BY "{metric}" DESC) '
+    f"AS {rank_column(metric)}"
+    for metric in LEADER_METRICS
+)
+
+PLAYER_LEADERS = Rollup(
+    name="player_leaders",
+    source="player_season_stats",
+    query=f"""
+        SELECT
+            season, gameType, personId, firstName, lastName, GP,
+            {quoted(LEADER_METRICS)}, {LEADER_RANKS}
+        FROM player_season_stats
+        WHERE GP >= {MIN_GAMES_PLAYED}
+        QUALIFY least({", ".join(map(rank_column, LEADER_METRICS))})
+            <= {LEADERS_PER_METRIC}
+    """,
+    order_by=["season", "gameType", rank_column("PTS")],
+)
+
+TEAM_STANDINGS = Rollup(
+    name="team_standings",
+    source="team_season_stats",
+    query=f"""
+        SELECT
+            season, team, team_name, wins, losses, total_games,
+            round(wins * 100.0 / total_games, 1) AS win_pct,
+            round(team_pts::DOUBLE, 1) AS ppg,
+            round(opponent_pts::DOUBLE, 1) AS opp_ppg,
+            round(team_pts::DOUBLE - opponent_pts, 1) AS point_diff,
+            rank() OVER (
+                PARTITION BY season ORDER BY wins DESC, team_pts - opponent_pts DESC
+            ) AS standing
+        FROM team_season_stats
+        WHERE starts_with(CAST(season_id AS VARCHAR), '{REGULAR_SEASON_ID_PREFIX}')
+    """,
+    order_by=["season", "standing"],
+)
+
+PERCENTILE_VALUES = ", ".join(
+    f"quantile_cont(value, {percentile}) AS p{round(percentile * 100)}"
+    for percentile in PERCENTILES
+)
+# A single value type for the unpivot of the counts and the rates
+PERCENTILE_COLUMNS = ", ".join(
+    f'CAST("{metric}" AS DOUBLE) AS "{metric}"' for metric in PERCENTILE_METRICS
+)
+
+PLAYER_PERCENTILES = Rollup(
+    name="player_percentiles",
+    source="player_season_stats",
+    query=f"""
+        SELECT season, gameType, metric, count(*) AS players, {PERCENTILE_VALUES}
+        FROM (
+            UNPIVOT (
+                SELECT season, gameType, {PERCENTILE_COLUMNS}
+                FROM player_season_stats
+                WHERE GP >= {MIN_GAMES_PLAYED}
+            )
+            ON {quoted(PERCENTILE_METRICS)}
+            INTO NAME metric VALUE value
+        )
+        GROUP BY season, gameType, metric
+    """,
+    order_by=["season", "gameType", "metric"],
+)
+
+ROLLUPS = [PLAYER_LEADERS, TEAM_STANDINGS, PLAYER_PERCENTILES]
+
+
+def source_rollups(table_name: str) -> list[Rollup]:
+    """
+    Rollups computed from a base table, refreshed after each of its loads.
+    """
+    return [rollup for rollup in ROLLUPS if rollup.source == table_name]
@@ -0,0 +1,89 @@
+import hashlib
+import importlib
+import inspect
+import json
+
+from pathlib import Path
+from typing import Any, Callable
+
+from prefect.context import TaskRunContext
+
+from config.bucket import nba_bucket
+
+# Prefect block of the bucket, holding the persisted task results on S3
+RESULT_STORAGE_BLOCK = "s3-bucket/nba-bucket"
+
+# Modules reading the sources and writing the outputs of every cached task
+STORAGE_MODULES = ["config.bucket", "config.manifest", "config.partitions"]
+
+CacheKeyFn = Callable[[TaskRunContext, dict[str, Any]], str]
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Stable digest of JSON-serializable parts.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def code_version(modules: list[str]) -> str:
+    """
+    Digest of the source code of the modules, changed by any edit of them.
+    """
+    return fingerprint(
+        [inspect.getsource(importlib.import_module(module)) for module in modules]
+    )
+
+
+def source_cache_key(
+    source_keys: Callable[[], list[str]],
+    modules: list[str],
+    config: Callable[[], dict[str, Any]] | None = None,
+) -> CacheKeyFn:
+    """
+    Cache key of a task, changed by its parameters, the ETags of its source
+    objects, the code of its modules and of the storage modules, or its
+    configuration.
+
+    Args:
+        source_keys: Keys of the objects the task reads, resolved at run time
+        modules: Modules of the code computing the task results
+        config: Configuration of the computation, such as the metrics, resolved
+            at run time so that importing the task does not parse parameters.yml
+    """
+
+    def cache_key(context: TaskRunContext, parameters: dict[str, Any]) -> str:
+        return fingerprint(
+            context.task.name,
+            parameters,
+            {key: nba_bucket.object_etag(key) for key in source_keys()},
+            code_version([*STORAGE_MODULES, *modules]),
+            config() if config is not None else None,
+        )
+
+    return cache_key
+
+
+def result_storage() -> str | Path:
+    """
+    Storage of the persisted task results, next to the data of the bucket.
+
+    Tasks are decorated at import time, so the results directory of the local
+    backends is created by Prefect when it first writes a result.
+    """
+    if nba_bucket.is_local:
+        return nba_bucket.local_root / "results"
+
+    return RESULT_STORAGE_BLOCK
+
+
+def cache_options(cache_key_fn: CacheKeyFn) -> dict[str, Any]:
+    """
+    Options of a task whose results are cached and persisted with the bucket.
+    """
+    return {
+        "cache_key_fn": cache_key_fn,
+        "persist_result": True,
+        "result_storage": result_storage(),
+    }
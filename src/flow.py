@@ -1,23 +1,240 @@
-from prefect import flow
+from typing import Literal
 
-from players.seasons.task import get_player_season_stats
-from teams.season_stats import get_team_season_stats
-from config.export import export_to_duckdb
+from prefect import flow, unmapped
+from prefect.task_runners import (
+    ProcessPoolTaskRunner,
+    TaskRunner,
+    ThreadPoolTaskRunner,
+)
+
+from backfill import backfill_season, merge_fingerprints
+import config
+from config.bucket import nba_bucket
+from config.partitions import record_partitions
+from games.raw import is_manifest_input
+from games.task import get_games_scope, index_raw_input, type_raw_input
+from players.rolling.task import get_player_rolling_stats
+from players.seasons.task import (
+    collect_player_season_stats,
+    get_player_game_facts,
+    get_player_season_stats,
+)
+from teams.ratings import (
+    collect_head_to_head,
+    collect_team_ratings,
+    get_head_to_head,
+    get_team_ratings,
+)
+from teams.rolling_stats import get_team_rolling_stats
+from teams.season_stats import (
+    collect_team_season_stats,
+    get_team_game_facts,
+    get_team_season_stats,
+)
+from config.export import (
+    export_frame_to_bucket,
+    export_frame_to_duckdb,
+    export_to_duckdb,
+)
+
+TASK_RUNNERS = {"thread": ThreadPoolTaskRunner, "process": ProcessPoolTaskRunner}
+
+
+@flow(log_prints=True, task_runner=ThreadPoolTaskRunner(max_workers=4))
+def season_stats(
+    incremental: bool = False,
+    task_runner: Literal["thread", "process"] = "thread",
+    memory_limit_mb: int | None = None,
+):
+    """
+    Args:
+        memory_limit_mb: Memory ceiling of the player season aggregation, computed
+            out of core by chunks spilled to local disk when set
+    """
+    memory_limit_bytes = memory_limit_mb * 1024**2 if memory_limit_mb else None
+
+    # Index the player stats dropped since the last run
+    if is_manifest_input(config.bucket_conf.raw.player_stats):
+        index_raw_input(config.bucket_conf.raw.player_stats)
+
+    # Read and parse the games detail once for both pipelines
+    games_scope_path = get_games_scope()
+
+    # Extract and transform player and team stats concurrently
+    with TASK_RUNNERS[task_runner](max_workers=2) as runner:
+        facts_keys = build_game_facts(runner, games_scope_path, incremental)
+
+        if incremental:
+            export_incremental_stats(runner, *facts_keys, memory_limit_bytes)
+        else:
+            export_stats(runner, *facts_keys, memory_limit_bytes)
+
+
+def build_game_facts(
+    runner: TaskRunner, games_scope_path: str, incremental: bool
+) -> tuple[str, str]:
+    """
+    Persist the player and team game facts the season stats are aggregated from.
+    """
+    facts_parameters = {
+        "games_scope_path": games_scope_path,
+        "incremental": incremental,
+    }
+    player_facts_key = runner.submit(get_player_game_facts, facts_parameters)
+    team_facts_key = runner.submit(get_team_game_facts, facts_parameters)
+
+    return player_facts_key.result(), team_facts_key.result()
+
+
+def export_stats(
+    runner: TaskRunner,
+    player_facts_key: str,
+    team_facts_key: str,
+    memory_limit_bytes: int | None = None,
+) -> None:
+    player_parameters = {"game_facts_key": player_facts_key}
+    player_season_parameters = {
+        **player_parameters,
+        "memory_limit_bytes": memory_limit_bytes,
+    }
+    team_parameters = {"game_facts_key": team_facts_key}
+
+    # The per-game outputs are streamed to the bucket, never held in memory
+    sunk_paths = {
+        "player_rolling_stats": runner.submit(
+            get_player_rolling_stats, player_parameters
+        ),
+        "team_rolling_stats": runner.submit(get_team_rolling_stats, team_parameters),
+    }
+    # The season and rollup tables are small enough to be handed over as Arrow
+    stats = {
+        "player_season_stats": runner.submit(
+            collect_player_season_stats, player_season_parameters
+        ),
+        "team_season_stats": runner.submit(collect_team_season_stats, team_parameters),
+        "team_ratings": runner.submit(collect_team_ratings, team_parameters),
+        "head_to_head": runner.submit(collect_head_to_head, team_parameters),
+    }
+
+    # Load each small result in DuckDB as Arrow while its parquet is written to S3,
+    # and each per-game output as soon as its own parquet is written
+    exports = [
+        *[
+            export_to_duckdb.submit(output_path, table_name)
+            for table_name, output_path in sunk_paths.items()
+        ],
+        *[
+            export_frame_to_duckdb.submit(table_stats, table_name)
+            for table_name, table_stats in stats.items()
+        ],
+    ]
+    output_paths = {
+        **sunk_paths,
+        **{
+            table_name: export_frame_to_bucket.submit(
+                table_stats, getattr(config.bucket_conf.processed, table_name)
+            )
+            for table_name, table_stats in stats.items()
+        },
+    }
+
+    for export in exports:
+        export.result()
+
+    for table_name, output_path in output_paths.items():
+        print(f"{table_name}: {output_path.result()}")
+
+
+def export_incremental_stats(
+    runner: TaskRunner,
+    player_facts_key: str,
+    team_facts_key: str,
+    memory_limit_bytes: int | None = None,
+) -> None:
+    # Only the seasons whose source data changed are recomputed
+    player_parameters = {"game_facts_key": player_facts_key, "incremental": True}
+    player_season_parameters = {
+        **player_parameters,
+        "memory_limit_bytes": memory_limit_bytes,
+    }
+    team_parameters = {"game_facts_key": team_facts_key, "incremental": True}
+
+    output_paths = {
+        "player_season_stats": runner.submit(
+            get_player_season_stats, player_season_parameters
+        ),
+        "team_season_stats": runner.submit(get_team_season_stats, team_parameters),
+        "player_rolling_stats": runner.submit(
+            get_player_rolling_stats, player_parameters
+        ),
+        "team_rolling_stats": runner.submit(get_team_rolling_stats, team_parameters),
+        "team_ratings": runner.submit(get_team_ratings, team_parameters),
+        "head_to_head": runner.submit(get_head_to_head, team_parameters),
+    }
+
+    # Export to DuckDB, each table as soon as its own parquet is written
+    exports = [
+        export_to_duckdb.submit(output_path, table_name)
+        for table_name, output_path in output_paths.items()
+    ]
+
+    for export in exports:
+        export.result()
+
+    for table_name, output_path in output_paths.items():
+        print(f"{table_name}: {output_path.result()}")
 
 
 @flow(log_prints=True)
-def season_stats():
-    # Extract and transform stats to parquet
-    player_stats_fpath = get_player_season_stats()
-    team_stats_fpath = get_team_season_stats()
+def backfill(
+    first_season: int,
+    last_season: int,
+    max_concurrency: int = 4,
+    task_runner: Literal["thread", "process"] = "thread",
+):
+    """
+    Load a range of past seasons, older than the first season of `season_stats`.
+
+    A task per season writes its partitions of the game facts and of the processed
+    outputs, the partitions incremental runs of `season_stats` append to.
 
-    print(f"Player stats: {player_stats_fpath}")
-    print(f"Team stats: {team_stats_fpath}")
+    Args:
+        first_season: First season to load, as the year it ends
+        last_season: Last season to load, included
+        max_concurrency: Seasons processed at the same time
+    """
+    if last_season < first_season:
+        raise ValueError(f"No season from {first_season} to {last_season}")
 
-    # Export to DuckDB
-    export_to_duckdb(player_stats_fpath, "player_season_stats")
-    export_to_duckdb(team_stats_fpath, "team_season_stats")
+    seasons = list(range(first_season, last_season + 1))
+
+    games_scope_path = get_games_scope()
+
+    with TASK_RUNNERS[task_runner](max_workers=max_concurrency) as runner:
+        season_runs = runner.map(
+            backfill_season,
+            {"season": seasons, "games_scope_path": unmapped(games_scope_path)},
+        )
+        season_fingerprints = season_runs.result()
+
+    # Recorded once every season is written, the tasks do not share the manifests
+    for output_key, fingerprints in merge_fingerprints(season_fingerprints).items():
+        record_partitions(output_key, fingerprints)
+
+    for table_name, output in vars(config.bucket_conf.processed).items():
+        output_path = nba_bucket.partitioned_path(output.partitioned_key)
+        export_to_duckdb(output_path, table_name)
+        print(f"{table_name}: {output_path}")
+
+
+@flow(log_prints=True)
+def type_raw_layer():
+    # Typed, sorted dates let season filters prune raw row groups by statistics
+    type_raw_input(config.bucket_conf.raw.games_detail, "game_date")
+    # Drop files are expected to be written with a typed date column
+    if not is_manifest_input(config.bucket_conf.raw.player_stats):
+        type_raw_input(config.bucket_conf.raw.player_stats, "gameDate")
 
 
 if __name__ == "__main__":
-    season_stats()
\ No newline at end of file
+    season_stats()
@@ -0,0 +1,45 @@
+from typing import Callable
+
+from polars import LazyFrame
+
+from config.bucket import nba_bucket
+from config.partitions import PARTITION_KEY, sink_incremental
+
+
+def sink_game_facts(
+    build: Callable[[list[int] | None], LazyFrame],
+    facts_key: str,
+    game_id_column: str,
+    source: LazyFrame,
+    source_keys: list[str],
+    incremental: bool = False,
+) -> str:
+    """
+    Persist game facts partitioned by season, each partition sorted by game.
+
+    Args:
+        build: Builds the facts, restricted to the given seasons unless None
+        facts_key: Facts directory in the processed folder
+        game_id_column: Game ID column the facts are sorted by within a season
+        source: Source rows of the facts with their season, fingerprinted to
+            rebuild only the changed seasons when incremental
+        source_keys: Raw objects the facts are derived from
+
+    Returns:
+        The facts key, to be scanned with `nba_bucket.scan_partitioned`
+    """
+
+    def sorted_facts(seasons: list[int] | None) -> LazyFrame:
+        return build(seasons).sort(PARTITION_KEY, game_id_column)
+
+    if incremental:
+        sink_incremental(
+            source,
+            compute=sorted_facts,
+            output_key=facts_key,
+            source_keys=source_keys,
+        )
+    else:
+        nba_bucket.sink_partitioned(sorted_facts(None), facts_key, PARTITION_KEY)
+
+    return facts_key
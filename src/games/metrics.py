@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+
+import polars as pl
+
+# Weight of the free throws in the shooting possessions and attempts
+FREE_THROW_WEIGHT = 0.44
+
+
+def safe_divide(numerator: pl.Expr, denominator: pl.Expr) -> pl.Expr:
+    """
+    Null instead of NaN or infinity when the denominator is zero or null.
+    """
+    return pl.when(denominator != 0).then(numerator / denominator)
+
+
+def true_shooting_attempts(fga: pl.Expr, fta: pl.Expr) -> pl.Expr:
+    return fga + FREE_THROW_WEIGHT * fta
+
+
+@dataclass(frozen=True)
+class SeasonMetric:
+    """
+    Season metric aggregated from the game facts, declared by its expressions.
+
+    A ratio metric divides the season sums of its numerator and denominator, so a
+    season percentage weighs each game by its attempts instead of averaging the
+    ratios of each game. Without a denominator, the numerator is averaged per game.
+    """
+
+    name: str
+    numerator: pl.Expr
+    denominator: pl.Expr | None = None
+    scale: float = 1.0
+    decimals: int | None = None
+
+    @property
+    def inputs(self) -> set[str]:
+        """
+        Game facts columns the metric is computed from.
+        """
+        inputs = set(self.numerator.meta.root_names())
+        if self.denominator is not None:
+            inputs.update(self.denominator.meta.root_names())
+
+        return inputs
+
+    def agg(self) -> pl.Expr:
+        """
+        Aggregation of the metric in a group by of the game facts.
+        """
+        if self.denominator is None:
+            metric = self.numerator.mean()
+        else:
+            metric = safe_divide(self.numerator.sum(), self.denominator.sum())
+
+        if self.scale != 1:
+            metric = metric * self.scale
+        if self.decimals is not None:
+            metric = metric.round(self.decimals)
+
+        return metric.alias(self.name)
+
+
+def available_metrics(
+    metrics: list[SeasonMetric], columns: set[str]
+) -> dict[str, SeasonMetric]:
+    """
+    Metrics computable from the given columns, keyed by name.
+    """
+    return {metric.name: metric for metric in metrics if metric.inputs <= columns}
+
+
+def season_aggregations(
+    averaged: list[str],
+    metrics: dict[str, SeasonMetric],
+    decimals: int | None = None,
+) -> list[pl.Expr]:
+    """
+    Aggregations of the season metrics, in a single pass over the game facts.
+
+    Each averaged column declared as a season metric is computed as one instead of
+    a mean, in place. The other season metrics are appended.
+    """
+
+    def mean(column: str) -> pl.Expr:
+        average = pl.mean(column)
+        if decimals is not None:
+            average = average.round(decimals)
+        return average.alias(column)
+
+    return [
+        *[
+            metrics[column].agg() if column in metrics else mean(column)
+            for column in averaged
+        ],
+        *[metric.agg() for name, metric in metrics.items() if name not in averaged],
+    ]
@@ -0,0 +1,34 @@
+import polars as pl
+
+from polars import LazyFrame
+
+
+def parse_datetime(lf: LazyFrame, column: str) -> pl.Expr:
+    """
+    Datetime expression for a raw date column.
+
+    Raw files rewritten by `type_raw_dates` already store the column as a datetime,
+    only the legacy string columns need to be parsed row by row.
+    """
+    if lf.collect_schema()[column] == pl.String:
+        return pl.col(column).str.to_datetime()
+
+    return pl.col(column).cast(pl.Datetime("us"))
+
+
+def is_manifest_input(raw_key: str) -> bool:
+    """
+    Whether a raw input is a prefix of drop files indexed by a manifest, rather than
+    a single parquet object.
+    """
+    return not raw_key.endswith(".parquet")
+
+
+def type_raw_dates(lf: LazyFrame, date_column: str) -> LazyFrame:
+    """
+    Store the date column of a raw input as a datetime, sorted chronologically.
+
+    Sorting makes the min/max statistics of each row group cover a narrow date
+    range, so season filters skip whole row groups when scanning.
+    """
+    return lf.with_columns(parse_datetime(lf, date_column)).sort(date_column)
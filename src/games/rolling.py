@@ -0,0 +1,99 @@
+import polars as pl
+
+from polars import LazyFrame
+
+from config.instrumentation import instrumentation
+from config.partitions import PARTITION_KEY
+from games.schema import COUNT_DTYPE, RATE_DTYPE
+
+
+class RollingStatsProcessor:
+    """Per-game rolling, season-to-date and streak stats over game facts.
+
+    Windows are computed within each entity season (a player or team season), in
+    the order the games were played.
+    """
+
+    def __init__(
+        self,
+        keys: list[str],
+        metrics: list[str],
+        windows: list[int],
+        date_column: str,
+        game_id_column: str,
+        win_loss_column: str | None = None,
+    ):
+        self.keys = keys
+        self.metrics = metrics
+        self.windows = windows
+        self.date_column = date_column
+        self.game_id_column = game_id_column
+        self.win_loss_column = win_loss_column
+
+    @property
+    def partition(self) -> list[str]:
+        return [*self.keys, PARTITION_KEY]
+
+    def rolling_metrics(self) -> list[pl.Expr]:
+        """
+        Average of each metric over the last N games, for every window N.
+        """
+        return [
+            pl.col(metric)
+            .rolling_mean(window_size=window, min_samples=1)
+            .over(self.partition)
+            .cast(RATE_DTYPE)
+            .alias(f"{metric}_last{window}")
+            for window in self.windows
+            for metric in self.metrics
+        ]
+
+    def season_to_date_metrics(self) -> list[pl.Expr]:
+        return [
+            (pl.col(metric).cum_sum() / pl.col(metric).cum_count())
+            .over(self.partition)
+            .cast(RATE_DTYPE)
+            .alias(f"{metric}_season_to_date")
+            for metric in self.metrics
+        ]
+
+    def streak(self) -> pl.Expr:
+        """
+        Length of the current win (positive) or loss (negative) streak.
+        """
+        is_win = pl.col(self.win_loss_column) == "W"
+        streak_id = (is_win != is_win.shift()).fill_null(True).cum_sum()
+
+        streak_length = pl.int_range(1, pl.len() + 1).over(
+            *self.partition, streak_id.over(self.partition)
+        )
+
+        return (
+            pl.when(is_win)
+            .then(streak_length)
+            .otherwise(-streak_length)
+            .cast(COUNT_DTYPE)
+            .alias("streak")
+        )
+
+    @instrumentation.step
+    def compute_rolling_stats(self, game_facts: LazyFrame) -> LazyFrame:
+        """
+        Add the rolling stats of every game to its facts, in a single sorted pass.
+
+        Sorting by entity season and date first makes every window a contiguous run
+        of rows, so all the windows share the same partitioning.
+        """
+        game_number = pl.int_range(1, pl.len() + 1).over(self.partition)
+
+        rolling_stats = [
+            game_number.cast(COUNT_DTYPE).alias("game_number"),
+            *self.rolling_metrics(),
+            *self.season_to_date_metrics(),
+        ]
+        if self.win_loss_column is not None:
+            rolling_stats.append(self.streak())
+
+        return game_facts.sort(
+            *self.partition, self.date_column, self.game_id_column
+        ).with_columns(rolling_stats)
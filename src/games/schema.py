@@ -0,0 +1,67 @@
+from typing import Collection, Iterable
+
+import polars as pl
+
+from polars import LazyFrame
+
+# Low-cardinality strings, dictionary-encoded in memory and in the parquet files
+DIMENSION_DTYPES: dict[str, pl.DataType] = {
+    "firstName": pl.Categorical(),
+    "lastName": pl.Categorical(),
+    "gameType": pl.Categorical(),
+    "season_type": pl.Categorical(),
+    "team": pl.Categorical(),
+    "team_name": pl.Categorical(),
+    "opponent": pl.Categorical(),
+    "opponent_name": pl.Categorical(),
+    "game_location": pl.Enum(["home", "away"]),
+    "win_loss": pl.Enum(["W", "L"]),
+}
+
+# Per-game and per-season counts fit 16 bits, rates and averages need no more
+# precision than 32 bits floats
+COUNT_DTYPE = pl.Int16()
+RATE_DTYPE = pl.Float32()
+
+
+def game_dtypes(
+    metrics: Iterable[str], count_metrics: Collection[str]
+) -> dict[str, pl.DataType]:
+    """
+    Canonical dtypes of game facts, where the metrics are counts or rates.
+    """
+    return {
+        **DIMENSION_DTYPES,
+        **{
+            metric: COUNT_DTYPE if metric in count_metrics else RATE_DTYPE
+            for metric in metrics
+        },
+    }
+
+
+def season_dtypes(
+    metrics: Iterable[str], counts: Iterable[str]
+) -> dict[str, pl.DataType]:
+    """
+    Canonical dtypes of season aggregates: counts of games and averaged metrics.
+    """
+    return {
+        **DIMENSION_DTYPES,
+        **{count: COUNT_DTYPE for count in counts},
+        **{metric: RATE_DTYPE for metric in metrics},
+    }
+
+
+def apply_schema(lf: LazyFrame, dtypes: dict[str, pl.DataType]) -> LazyFrame:
+    """
+    Cast the columns of a LazyFrame to their canonical dtype, leaving the others.
+    """
+    schema = lf.collect_schema()
+
+    return lf.cast(
+        {
+            column: dtype
+            for column, dtype in dtypes.items()
+            if column in schema and schema[column] != dtype
+        }
+    )
@@ -1,17 +1,77 @@
 import polars as pl
 
+from datetime import datetime
+from polars import LazyFrame
+
+import config
 from config.bucket import nba_bucket
+from config.instrumentation import instrumentation
+from games.raw import parse_datetime
+
+# First season of the regular flow, older seasons are loaded by a backfill
+MIN_SEASON = 2015
+
+
+def first_game_date(season: int) -> datetime:
+    """
+    Lower bound of the game dates of a season, which ends the year it is named after.
+    """
+    return datetime(season - 1, 1, 1)
+
 
+def last_game_date(season: int) -> datetime:
+    """
+    Upper bound of the game dates of a season, the end of the year it is named after.
+    """
+    return datetime(season + 1, 1, 1)
 
-def get_game_id_season() -> pl.LazyFrame:
+
+@instrumentation.step
+def prepare_games_scope(games_detail: LazyFrame) -> LazyFrame:
     """
-    Get the game IDs for seasons starting from 2015.
+    Parse the game dates once and derive the calendar year and season of each game.
+
+    The season of a game is the calendar year in which its season ends, so a game
+    played in October 2023 belongs to the 2024 season.
     """
-    games_detail = nba_bucket.scan_parquet("raw/games_detail.parquet")
-    game_year = pl.col("game_date").str.to_datetime().dt.year()
+    game_year = pl.col("game_date").dt.year()
 
     return (
-        games_detail.with_columns(game_year.alias("year"))
-        .group_by("season_id", "game_id")
-        .agg(pl.max("year").alias("season"))
+        games_detail.with_columns(parse_datetime(games_detail, "game_date"))
+        .with_columns(game_year.alias("year"))
+        .with_columns(pl.max("year").over("season_id").alias("season"))
     )
+
+
+def scan_games_scope(scope_path: str | None = None) -> LazyFrame:
+    """
+    Scan the prepared games scope.
+
+    When a local Arrow IPC artifact built by `build_games_scope` is given, it is
+    memory-mapped instead of reading and parsing the raw games detail again.
+    """
+    if scope_path is not None:
+        return pl.scan_ipc(scope_path)
+
+    games_detail = nba_bucket.scan_parquet(config.bucket_conf.raw.games_detail)
+
+    return prepare_games_scope(games_detail)
+
+
+def build_games_scope(scope_path: str) -> str:
+    """
+    Read the raw games detail once and persist the prepared scope as Arrow IPC.
+    """
+    scan_games_scope().sink_ipc(scope_path)
+
+    return scope_path
+
+
+def get_game_id_season(games_scope: LazyFrame | None = None) -> LazyFrame:
+    """
+    Get the game IDs with their season.
+    """
+    if games_scope is None:
+        games_scope = scan_games_scope()
+
+    return games_scope.select("game_id", "season_id", "season").unique()
@@ -0,0 +1,67 @@
+import os
+
+import polars as pl
+
+from loguru import logger
+from prefect import task
+
+from config.bucket import nba_bucket
+from games.raw import type_raw_dates
+from games.scope import build_games_scope
+
+# Columns whose row group statistics are indexed in the manifests of raw inputs
+RAW_INDEX_COLUMNS = ["gameDate", "game_date", "season_id"]
+
+SCOPE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "target",
+)
+
+
+@task(log_prints=True)
+def get_games_scope() -> str:
+    """
+    Build the shared games scope consumed by the player and team pipelines.
+    """
+    os.makedirs(SCOPE_DIR, exist_ok=True)
+
+    return build_games_scope(os.path.join(SCOPE_DIR, "games_scope.arrow"))
+
+
+@task(log_prints=True)
+def type_raw_input(raw_key: str, date_column: str) -> str:
+    """
+    Rewrite a raw input with its date column typed and sorted, if not done yet.
+    """
+    raw_input = nba_bucket.scan_parquet(raw_key)
+
+    if raw_input.collect_schema()[date_column] != pl.String:
+        logger.info(f"{raw_key} already has a typed {date_column} column")
+        return raw_key
+
+    folder, output_key = raw_key.split("/", 1)
+    typed_key = f"{output_key}.typed"
+
+    nba_bucket.sink_parquet(
+        type_raw_dates(raw_input, date_column), typed_key, folder=folder
+    )
+    nba_bucket.move(f"{folder}/{typed_key}", raw_key)
+
+    return raw_key
+
+
+@task(log_prints=True)
+def index_raw_input(raw_prefix: str) -> int:
+    """
+    Index the new drop files of a raw input in its manifest.
+
+    Returns:
+        The number of indexed rows
+    """
+    manifest = nba_bucket.update_manifest(raw_prefix, RAW_INDEX_COLUMNS)
+
+    logger.info(
+        f"{raw_prefix}: {len(manifest.files)} files, {manifest.num_rows} rows indexed"
+    )
+
+    return manifest.num_rows
@@ -1,3 +1,7 @@
+import polars as pl
+
+from games.metrics import SeasonMetric, true_shooting_attempts
+
 PLAYERS_METRICS = {
     "numMinutes": "MIN",
     "points": "PTS",
@@ -22,3 +26,50 @@ PLAYERS_METRICS = {
     "turnovers": "TO",
     "plusMinusPoints": "+/-",
 }
+
+# Metrics counted per game, the others are rates or playing time
+PLAYERS_COUNT_METRICS = {
+    "PTS",
+    "AST",
+    "BLK",
+    "STL",
+    "FGA",
+    "FGM",
+    "3PA",
+    "3PM",
+    "FTA",
+    "FTM",
+    "DREB",
+    "OREB",
+    "REB",
+    "PF",
+    "TO",
+    "+/-",
+}
+
+# Season metrics computed from the season totals of each player, in place of the
+# average of the per-game ratios for the percentages
+PLAYER_SEASON_METRICS = [
+    SeasonMetric("FG%", pl.col("FGM"), pl.col("FGA"), decimals=3),
+    SeasonMetric("3P%", pl.col("3PM"), pl.col("3PA"), decimals=3),
+    SeasonMetric("FT%", pl.col("FTM"), pl.col("FTA"), decimals=3),
+    SeasonMetric(
+        "TS%",
+        pl.col("PTS"),
+        2 * true_shooting_attempts(pl.col("FGA"), pl.col("FTA")),
+        decimals=3,
+    ),
+    SeasonMetric(
+        "eFG%", pl.col("FGM") + 0.5 * pl.col("3PM"), pl.col("FGA"), decimals=3
+    ),
+    SeasonMetric("3PAr", pl.col("3PA"), pl.col("FGA"), decimals=3),
+    SeasonMetric("FTr", pl.col("FTA"), pl.col("FGA"), decimals=3),
+    SeasonMetric("AST/TO", pl.col("AST"), pl.col("TO"), decimals=2),
+    # Production per 36 minutes, the box score inputs of the efficiency ratings
+    *[
+        SeasonMetric(
+            f"{metric}/36", pl.col(metric), pl.col("MIN"), scale=36, decimals=1
+        )
+        for metric in ["PTS", "REB", "AST", "STL", "BLK", "TO"]
+    ],
+]
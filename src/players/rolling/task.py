@@ -0,0 +1,66 @@
+import polars as pl
+
+from prefect import task
+
+import config
+from config.bucket import nba_bucket
+from config.task_cache import cache_options, source_cache_key
+from config.instrumentation import instrumentation
+from config.partitions import sink_incremental
+from games.rolling import RollingStatsProcessor
+from players import PLAYERS_METRICS
+from players.seasons.processor import PLAYER_DIMENSIONS, PlayerSeasonProcessor
+from players.seasons.task import (
+    PLAYER_MODULES,
+    player_source_keys,
+    scan_player_game_facts,
+)
+
+
+def get_rolling_processor() -> RollingStatsProcessor:
+    return RollingStatsProcessor(
+        keys=PLAYER_DIMENSIONS,
+        metrics=list(PLAYERS_METRICS.values()),
+        windows=config.rolling_conf.windows,
+        date_column="gameDate",
+        game_id_column="gameId",
+    )
+
+
+player_rolling_cache_key = source_cache_key(
+    player_source_keys,
+    [*PLAYER_MODULES, "games.rolling", "players.rolling.task"],
+    lambda: {
+        "metrics": PLAYERS_METRICS,
+        "windows": config.rolling_conf.windows,
+        "outputs": config.bucket_conf.processed,
+    },
+)
+
+
+@task(log_prints=True, **cache_options(player_rolling_cache_key))
+@instrumentation.run("player-rolling-stats")
+def get_player_rolling_stats(
+    game_facts_key: str | None = None, incremental: bool = False
+) -> str:
+    output = config.bucket_conf.processed.player_rolling_stats
+
+    player_facts = scan_player_game_facts(
+        PlayerSeasonProcessor(metrics=PLAYERS_METRICS), game_facts_key
+    )
+    processor = get_rolling_processor()
+
+    if incremental:
+        return sink_incremental(
+            player_facts,
+            compute=lambda seasons: processor.compute_rolling_stats(
+                player_facts.filter(pl.col("season").is_in(seasons))
+            ),
+            output_key=output.partitioned_key,
+            layout=output.layout,
+            source_keys=player_source_keys(),
+        )
+
+    rolling_stats = processor.compute_rolling_stats(player_facts)
+
+    return nba_bucket.sink_output(rolling_stats, output)
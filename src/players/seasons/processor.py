@@ -1,63 +1,222 @@
+import math
+
 import polars as pl
 
+from pathlib import Path
 from polars import LazyFrame
 
+from config.instrumentation import instrumentation
+from games.metrics import (
+    SeasonMetric,
+    available_metrics,
+    safe_divide,
+    season_aggregations,
+    true_shooting_attempts,
+)
+from games.raw import parse_datetime
+from games.schema import apply_schema, game_dtypes, season_dtypes
+from games.scope import MIN_SEASON, first_game_date, last_game_date
+from players import PLAYER_SEASON_METRICS, PLAYERS_COUNT_METRICS
+
+PLAYER_DIMENSIONS = ["firstName", "lastName", "personId", "gameType"]
+# First game date of the regular flow, older games are loaded by a backfill
+MIN_GAME_DATE = first_game_date(MIN_SEASON)
+
+# Rough in-memory footprint of a value while grouping, hash tables included
+STRING_VALUE_BYTES = 64
+VALUE_BYTES = 16
+
 
 class PlayerSeasonProcessor:
-    def __init__(self, metrics: dict):
+    def __init__(
+        self,
+        metrics: dict,
+        min_season: int = MIN_SEASON,
+        max_season: int | None = None,
+        season_metrics: list[SeasonMetric] = PLAYER_SEASON_METRICS,
+    ):
         self.metrics = metrics
-
+        self.min_season = min_season
+        # Games of the previous season share the first calendar year of a season
+        self.min_game_date = first_game_date(min_season)
+        self.max_game_date = None if max_season is None else last_game_date(max_season)
+        # Only the season metrics whose inputs are among the metrics are computed
+        self.season_metrics = available_metrics(season_metrics, set(metrics.values()))
+
+    @instrumentation.step
     def filter_and_rename(self, game_stats: LazyFrame) -> LazyFrame:
         """
-        Scan the player game statistics CSV file from S3.
+        Keep the games played between the minimum and maximum game dates, their
+        typed date and the columns of the metrics, cast to their canonical dtypes.
+
+        The explicit projection and the comparisons on a typed date let the parquet
+        scan read only these columns and skip the row groups of the other games.
         """
 
-        is_after_2014 = pl.col("gameDate").str.to_datetime().dt.year() >= 2014
+        game_date = parse_datetime(game_stats, "gameDate")
+        in_dates = game_date >= self.min_game_date
+        if self.max_game_date is not None:
+            in_dates &= game_date <= self.max_game_date
+
+        player_games = (
+            game_stats.filter(in_dates)
+            .select("gameId", game_date, *PLAYER_DIMENSIONS, *self.metrics)
+            .rename(self.metrics)
+        )
 
-        return game_stats.filter(is_after_2014).rename(self.metrics)
+        return apply_schema(
+            player_games, game_dtypes(self.metrics.values(), PLAYERS_COUNT_METRICS)
+        )
 
     @staticmethod
+    @instrumentation.step
     def compute_true_shooting(player_stats: LazyFrame) -> LazyFrame:
-        ts_attempts = pl.col("fieldGoalsAttempted") + 0.44 * pl.col(
-            "freeThrowsAttempted"
+        ts_attempts = true_shooting_attempts(
+            pl.col("fieldGoalsAttempted"), pl.col("freeThrowsAttempted")
         )
-        ts_percentage = pl.col("points") / (2 * ts_attempts)
+        ts_percentage = safe_divide(pl.col("points"), 2 * ts_attempts)
 
         return player_stats.with_columns(
             ts_attempts.alias("trueShootingAttempts"),
             ts_percentage.alias("trueShootingPercentage"),
         )
 
-    def compute_season_avg(
+    def scope_seasons(self, scope_game_ids: LazyFrame) -> LazyFrame:
+        """
+        Games of the scope from the minimum season on.
+
+        The games dated after the minimum game date include the end of the previous
+        season, which would otherwise be aggregated as a truncated season.
+        """
+        return scope_game_ids.filter(pl.col("season") >= self.min_season)
+
+    @instrumentation.step
+    def add_season(
         self, players_stats: LazyFrame, scope_game_ids: LazyFrame
     ) -> LazyFrame:
         """
-        Compute season stats of NBA players.
+        Keep the games of the scope seasons and tag each player game with its season.
+        """
+        return players_stats.join(
+            self.scope_seasons(scope_game_ids).select("game_id", "season"),
+            how="inner",
+            left_on="gameId",
+            right_on="game_id",
+        )
+
+    def build_game_facts(
+        self, game_stats: LazyFrame, scope_game_ids: LazyFrame
+    ) -> LazyFrame:
+        """
+        Player game facts: the typed, filtered and renamed stats of each player game,
+        with its season, ready to be aggregated without the raw data.
+        """
+        consolidated_stats = self.compute_true_shooting(game_stats)
+        prepared_stats = self.filter_and_rename(consolidated_stats)
+
+        return self.add_season(prepared_stats, scope_game_ids)
+
+    @instrumentation.step
+    def compute_season_avg(self, player_facts: LazyFrame) -> LazyFrame:
+        """
+        Compute season stats of NBA players from their game facts.
+
+        The counts are averaged per game, the season metrics are computed from the
+        season totals, all in the same aggregation.
         """
 
-        dimensions = ["season", "firstName", "lastName", "personId", "gameType"]
         number_of_games_played = pl.col("gameId").n_unique().alias("GP")
 
-        average_metrics = [
-            pl.mean(metric).round(1).alias(metric) for metric in self.metrics.values()
-        ]
+        season_metrics = season_aggregations(
+            list(self.metrics.values()), self.season_metrics, decimals=1
+        )
 
-        return (
-            players_stats.join(
-                scope_game_ids, how="inner", left_on="gameId", right_on="game_id"
-            )
-            .group_by(*dimensions)
-            .agg(number_of_games_played, *average_metrics)
+        season_stats = player_facts.group_by("season", *PLAYER_DIMENSIONS).agg(
+            number_of_games_played, *season_metrics
         )
 
-    def run(self, game_stats: LazyFrame, scope_game_ids: LazyFrame) -> LazyFrame:
+        return apply_schema(
+            season_stats,
+            season_dtypes([*self.metrics.values(), *self.season_metrics], ["GP"]),
+        )
+
+    def plan_chunks(
+        self, player_facts: LazyFrame, memory_limit_bytes: int
+    ) -> dict[int, int]:
         """
-        Get the players' season statistics by aggregating game stats.
+        Number of personId buckets each season is split into to fit the memory limit.
+
+        Only the season column is read to count the rows of each season.
         """
+        row_bytes = sum(
+            STRING_VALUE_BYTES if dtype == pl.String else VALUE_BYTES
+            for dtype in player_facts.collect_schema().dtypes()
+        )
 
-        consolidated_stats = self.compute_true_shooting(game_stats)
-        prepared_stats = self.filter_and_rename(consolidated_stats)
+        season_rows = player_facts.group_by("season").agg(pl.len()).collect()
+
+        return {
+            season: max(1, math.ceil(rows * row_bytes / memory_limit_bytes))
+            for season, rows in season_rows.sort("season").iter_rows()
+        }
+
+    def compute_season_avg_out_of_core(
+        self, player_facts: LazyFrame, spill_dir: str | Path, memory_limit_bytes: int
+    ) -> LazyFrame:
+        """
+        Compute the season stats chunk by chunk, spilling each chunk to local disk.
+
+        The facts are split by season, then by hashed personId buckets when a season
+        does not fit the memory limit, in a single partitioned pass over the facts.
+        Each player season falls in a single chunk, so the aggregates of the chunks
+        are final and merging them is a concatenation.
+
+        Returns:
+            A scan of the spilled aggregates, valid as long as the spill directory
+        """
+        chunks = self.plan_chunks(player_facts, memory_limit_bytes)
+
+        if not chunks:
+            return self.compute_season_avg(player_facts.clear())
+
+        spill_dir = Path(spill_dir)
+        n_buckets = pl.col("season").replace_strict(chunks, return_dtype=pl.UInt64)
+        bucket = (pl.col("personId").hash() % n_buckets).alias("bucket")
+
+        player_facts.sink_parquet(
+            pl.PartitionByKey(
+                spill_dir / "facts", by=[pl.col("season"), bucket], include_key=True
+            ),
+            mkdir=True,
+        )
+
+        stats_dir = spill_dir / "stats"
+        stats_dir.mkdir(parents=True, exist_ok=True)
+
+        for chunk_dir in sorted((spill_dir / "facts").glob("season=*/bucket=*")):
+            chunk = pl.scan_parquet(
+                chunk_dir / "*.parquet", hive_partitioning=False
+            ).drop("bucket")
+            self.compute_season_avg(chunk).sink_parquet(
+                stats_dir / f"{chunk_dir.parent.name}-{chunk_dir.name}.parquet"
+            )
+
+        return pl.scan_parquet(stats_dir / "*.parquet")
+
+    def run(
+        self,
+        game_stats: LazyFrame,
+        scope_game_ids: LazyFrame,
+        seasons: list[int] | None = None,
+    ) -> LazyFrame:
+        """
+        Get the players' season statistics by aggregating game stats.
+
+        When seasons are given, only the games of those seasons are aggregated.
+        """
+        if seasons is not None:
+            scope_game_ids = scope_game_ids.filter(pl.col("season").is_in(seasons))
 
-        season_stats = self.compute_season_avg(prepared_stats, scope_game_ids)
+        player_facts = self.build_game_facts(game_stats, scope_game_ids)
 
-        return season_stats
+        return self.compute_season_avg(player_facts)
@@ -1,24 +1,202 @@
+import tempfile
+
+import polars as pl
+
+from datetime import datetime
+from polars import LazyFrame
 from prefect import task
 
 from config.bucket import nba_bucket
-from config import bucket_conf
-from games.scope import get_game_id_season
+import config
+from config.task_cache import cache_options, source_cache_key
+from config.instrumentation import instrumentation
+from config.partitions import sink_incremental
+from games.facts import sink_game_facts
+from games.raw import is_manifest_input
+from games.scope import get_game_id_season, scan_games_scope
 from players import PLAYERS_METRICS
-from players.seasons.processor import PlayerSeasonProcessor
+from players.seasons.processor import MIN_GAME_DATE, PlayerSeasonProcessor
 
 
-@task(log_prints=True)
-def get_player_season_stats():
-    # Relevant paths
-    game_stats_path = bucket_conf.raw.player_stats
-    destination_path = bucket_conf.processed.player_season_stats
+def scan_player_stats(
+    min_game_date: datetime = MIN_GAME_DATE, max_game_date: datetime | None = None
+) -> LazyFrame:
+    """
+    Scan the raw player stats, a single object or the drop files of a prefix.
+
+    Drop files are selected from their manifest, down to the row groups of the
+    games played between the first and last processed dates.
+    """
+    game_stats_path = config.bucket_conf.raw.player_stats
+
+    if is_manifest_input(game_stats_path):
+        return nba_bucket.scan_manifest(
+            game_stats_path, bounds={"gameDate": (min_game_date, max_game_date)}
+        )
+
+    return nba_bucket.scan_parquet(filepath=game_stats_path)
+
+
+def player_stats_source_key() -> str:
+    """
+    Object whose ETag changes with the raw player stats.
+    """
+    game_stats_path = config.bucket_conf.raw.player_stats
+
+    if is_manifest_input(game_stats_path):
+        return nba_bucket.manifest_key(game_stats_path)
+
+    return game_stats_path
 
+
+def player_source_keys() -> list[str]:
+    return [player_stats_source_key(), config.bucket_conf.raw.games_detail]
+
+
+PLAYER_MODULES = [
+    "games.facts",
+    "games.metrics",
+    "games.raw",
+    "games.schema",
+    "games.scope",
+    "players",
+    "players.seasons.processor",
+    "players.seasons.task",
+]
+
+# Results are reused while the raw inputs, the code and the metrics are unchanged
+player_cache_key = source_cache_key(
+    player_source_keys,
+    PLAYER_MODULES,
+    lambda: {"metrics": PLAYERS_METRICS, "outputs": config.bucket_conf.processed},
+)
+
+
+def player_facts_source(game_stats: LazyFrame, scope_game_ids: LazyFrame) -> LazyFrame:
+    """
+    Player games of the scope with their season, the source of the game facts.
+    """
+    return scope_game_ids.select("game_id", "season").join(
+        game_stats, how="inner", left_on="game_id", right_on="gameId"
+    )
+
+
+@task(log_prints=True, **cache_options(player_cache_key))
+@instrumentation.run("player-game-facts")
+def get_player_game_facts(
+    games_scope_path: str | None = None, incremental: bool = False
+) -> str:
+    """
+    Persist the player game facts, partitioned by season and sorted by game.
+    """
     # Input stats and relevant scope for NBA games
-    game_stats = nba_bucket.scan_parquet(filepath=game_stats_path)
-    scope_game_ids = get_game_id_season()
+    game_stats = scan_player_stats()
+    scope_game_ids = get_game_id_season(scan_games_scope(games_scope_path))
 
     processor = PlayerSeasonProcessor(metrics=PLAYERS_METRICS)
+    scope_game_ids = processor.scope_seasons(scope_game_ids)
+
+    def build(seasons: list[int] | None) -> LazyFrame:
+        scope = scope_game_ids
+        if seasons is not None:
+            scope = scope.filter(pl.col("season").is_in(seasons))
+        return processor.build_game_facts(game_stats, scope)
 
-    season_stats = processor.run(game_stats, scope_game_ids)
+    # Fingerprint the player games of each season, keyed by the scope season
+    return sink_game_facts(
+        build,
+        facts_key=config.bucket_conf.facts.player_games,
+        game_id_column="gameId",
+        source=player_facts_source(game_stats, scope_game_ids),
+        source_keys=player_source_keys(),
+        incremental=incremental,
+    )
+
+
+def scan_player_game_facts(
+    processor: PlayerSeasonProcessor, game_facts_key: str | None = None
+) -> LazyFrame:
+    """
+    Scan the persisted player game facts, or derive them from the raw data.
+    """
+    if game_facts_key is not None:
+        return nba_bucket.scan_partitioned(game_facts_key)
+
+    game_stats = scan_player_stats()
+    scope_game_ids = get_game_id_season(scan_games_scope())
+
+    return processor.build_game_facts(game_stats, scope_game_ids)
+
+
+def compute_season_avg(
+    processor: PlayerSeasonProcessor,
+    player_facts: LazyFrame,
+    spill_dir: str,
+    memory_limit_bytes: int | None = None,
+) -> LazyFrame:
+    """
+    Compute the season stats, out of core when a memory limit is given.
+    """
+    if memory_limit_bytes is None:
+        return processor.compute_season_avg(player_facts)
+
+    return processor.compute_season_avg_out_of_core(
+        player_facts, spill_dir, memory_limit_bytes
+    )
+
+
+@task(log_prints=True, **cache_options(player_cache_key))
+@instrumentation.run("player-season-stats")
+def get_player_season_stats(
+    game_facts_key: str | None = None,
+    incremental: bool = False,
+    memory_limit_bytes: int | None = None,
+):
+    """
+    Args:
+        memory_limit_bytes: Memory ceiling of the aggregation, spilling chunks of
+            the player seasons to local disk when set
+    """
+    output = config.bucket_conf.processed.player_season_stats
+
+    processor = PlayerSeasonProcessor(metrics=PLAYERS_METRICS)
+    player_facts = scan_player_game_facts(processor, game_facts_key)
+
+    with tempfile.TemporaryDirectory(prefix="player-season-stats-") as spill_dir:
+        if incremental:
+            return sink_incremental(
+                player_facts,
+                compute=lambda seasons: compute_season_avg(
+                    processor,
+                    player_facts.filter(pl.col("season").is_in(seasons)),
+                    spill_dir,
+                    memory_limit_bytes,
+                ),
+                output_key=output.partitioned_key,
+                layout=output.layout,
+                source_keys=player_source_keys(),
+            )
+
+        season_stats = compute_season_avg(
+            processor, player_facts, spill_dir, memory_limit_bytes
+        )
+
+        return nba_bucket.sink_output(season_stats, output)
+
+
+@task(log_prints=True)
+@instrumentation.run("player-season-stats")
+def collect_player_season_stats(
+    game_facts_key: str | None = None, memory_limit_bytes: int | None = None
+) -> pl.DataFrame:
+    """
+    Compute the players' season stats in memory, to be exported without a re-read.
+    """
+    processor = PlayerSeasonProcessor(metrics=PLAYERS_METRICS)
+    player_facts = scan_player_game_facts(processor, game_facts_key)
 
-    return nba_bucket.sink_parquet(season_stats, destination_path)
+    with tempfile.TemporaryDirectory(prefix="player-season-stats-") as spill_dir:
+        season_stats = compute_season_avg(
+            processor, player_facts, spill_dir, memory_limit_bytes
+        )
+        return season_stats.collect(engine="streaming")
@@ -1,3 +1,7 @@
+import polars as pl
+
+from games.metrics import FREE_THROW_WEIGHT, SeasonMetric, true_shooting_attempts
+
 TEAM_METRICS = [
     "pts",
     "fgm",
@@ -13,8 +17,12 @@ TEAM_METRICS = [
     "dreb",
     "reb",
     "ast",
+    "tov",
 ]
 
+# Metrics counted per game, the others are percentages
+TEAM_COUNT_METRICS = [metric for metric in TEAM_METRICS if not metric.endswith("_pct")]
+
 TEAM_CONFIG_MAP = {
     "home": {
         "team_metrics": {f"{metric}_home": f"team_{metric}" for metric in TEAM_METRICS},
@@ -43,3 +51,54 @@ TEAM_CONFIG_MAP = {
         },
     },
 }
+
+
+def possessions(side: str) -> pl.Expr:
+    """
+    Estimated possessions of a side in a game, from its box score.
+    """
+    return (
+        pl.col(f"{side}_fga")
+        - pl.col(f"{side}_oreb")
+        + pl.col(f"{side}_tov")
+        + FREE_THROW_WEIGHT * pl.col(f"{side}_fta")
+    )
+
+
+# Possessions of a game, averaged over both estimates as they differ slightly
+GAME_POSSESSIONS = 0.5 * (possessions("team") + possessions("opponent"))
+
+
+def shooting_metrics(side: str) -> list[SeasonMetric]:
+    def col(metric: str) -> pl.Expr:
+        return pl.col(f"{side}_{metric}")
+
+    return [
+        SeasonMetric(f"{side}_fg_pct", col("fgm"), col("fga")),
+        SeasonMetric(f"{side}_fg3_pct", col("fg3m"), col("fg3a")),
+        SeasonMetric(f"{side}_ft_pct", col("ftm"), col("fta")),
+        SeasonMetric(f"{side}_efg_pct", col("fgm") + 0.5 * col("fg3m"), col("fga")),
+        SeasonMetric(
+            f"{side}_ts_pct",
+            col("pts"),
+            2 * true_shooting_attempts(col("fga"), col("fta")),
+        ),
+    ]
+
+
+# Season metrics computed from the season totals of each team, in place of the
+# average of the per-game percentages
+TEAM_SEASON_METRICS = [
+    *shooting_metrics("team"),
+    *shooting_metrics("opponent"),
+    SeasonMetric("possessions", GAME_POSSESSIONS),
+    # Points scored and allowed per 100 possessions
+    SeasonMetric("off_rating", pl.col("team_pts"), GAME_POSSESSIONS, scale=100),
+    SeasonMetric("def_rating", pl.col("opponent_pts"), GAME_POSSESSIONS, scale=100),
+    SeasonMetric(
+        "net_rating",
+        pl.col("team_pts") - pl.col("opponent_pts"),
+        GAME_POSSESSIONS,
+        scale=100,
+    ),
+]
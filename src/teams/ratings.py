@@ -0,0 +1,226 @@
+from typing import TYPE_CHECKING, Callable
+
+import polars as pl
+
+from polars import DataFrame, LazyFrame
+from prefect import task
+
+import config
+from config.bucket import nba_bucket
+from config.instrumentation import instrumentation
+from config.partitions import PARTITION_KEY, sink_incremental
+from config.task_cache import cache_options, source_cache_key
+from games.schema import apply_schema, season_dtypes
+from teams import TEAM_CONFIG_MAP, TEAM_METRICS
+from teams.season_stats import TEAM_MODULES, scan_team_game_facts, team_source_keys
+
+# Ratings are fitted on the regular season, where every team plays a full schedule
+RATING_SEASON_TYPE = "Regular Season"
+
+# Ratings of each season, as returned by the NumPy fit
+SEASON_RATINGS_SCHEMA = {
+    PARTITION_KEY: pl.Int32(),
+    "team": pl.String(),
+    "games": pl.Float64(),
+    "mov": pl.Float64(),
+    "sos": pl.Float64(),
+    "srs": pl.Float64(),
+}
+TEAM_RATINGS_DTYPES = season_dtypes(["mov", "sos", "srs"], ["games"])
+HEAD_TO_HEAD_DTYPES = season_dtypes(
+    ["team_pts", "opponent_pts", "point_diff"], ["games", "wins", "losses"]
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def solve_ratings(
+    team: "np.ndarray", opponent: "np.ndarray", margin: "np.ndarray"
+) -> tuple["np.ndarray", ...]:
+    """
+    Simple rating system of the teams of a season, from the margin of each game.
+
+    The rating of a team is its average margin (MOV) plus the average rating of
+    its opponents (SOS). Over all the teams, these equations are a linear system on
+    the team x team matrix of the games played, solved by least squares with the
+    ratings summing to zero.
+
+    Args:
+        team, opponent: Team codes of each game row, from 0 to the number of teams
+        margin: Points scored minus points allowed by the team of each row
+
+    Returns:
+        The games played, MOV, SOS and rating of each team, indexed by team code
+    """
+    import numpy as np
+
+    n_teams = max(team.max(), opponent.max()) + 1
+
+    matchups = np.zeros((n_teams, n_teams))
+    np.add.at(matchups, (team, opponent), 1)
+    games = matchups.sum(axis=1)
+    margins = np.bincount(team, weights=margin, minlength=n_teams)
+
+    # games * rating - sum of the opponents ratings = sum of the margins
+    system = np.vstack([np.diag(games) - matchups, np.ones(n_teams)])
+    ratings, *_ = np.linalg.lstsq(system, np.append(margins, 0.0), rcond=None)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mov = margins / games
+
+    return games, mov, ratings - mov, ratings
+
+
+def season_ratings(season_games: DataFrame) -> DataFrame:
+    """
+    Ratings of the teams of a season, from a row per game and team perspective.
+    """
+    import numpy as np
+
+    teams, codes = np.unique(
+        np.concatenate(
+            [
+                season_games["team"].cast(pl.String).to_numpy(),
+                season_games["opponent"].cast(pl.String).to_numpy(),
+            ]
+        ),
+        return_inverse=True,
+    )
+    team, opponent = np.split(codes, 2)
+    margin = (season_games["team_pts"] - season_games["opponent_pts"]).to_numpy()
+
+    games, mov, sos, srs = solve_ratings(team, opponent, margin)
+
+    return DataFrame(
+        {
+            PARTITION_KEY: season_games[PARTITION_KEY][0],
+            "team": teams,
+            "games": games,
+            "mov": mov,
+            "sos": sos,
+            "srs": srs,
+        },
+        schema=SEASON_RATINGS_SCHEMA,
+    )
+
+
+@instrumentation.step
+def compute_team_ratings(full_games: LazyFrame) -> LazyFrame:
+    """
+    Simple rating system of each team season, a least squares fit per season.
+    """
+    team_names = full_games.group_by(PARTITION_KEY, pl.col("team").cast(pl.String)).agg(
+        pl.first("team_name")
+    )
+
+    ratings = (
+        full_games.filter(pl.col("season_type") == RATING_SEASON_TYPE)
+        .select(PARTITION_KEY, "team", "opponent", "team_pts", "opponent_pts")
+        .group_by(PARTITION_KEY)
+        .map_groups(season_ratings, schema=SEASON_RATINGS_SCHEMA)
+        .join(team_names, on=[PARTITION_KEY, "team"], how="left")
+        .select(PARTITION_KEY, "team", "team_name", "games", "mov", "sos", "srs")
+    )
+
+    return apply_schema(ratings, TEAM_RATINGS_DTYPES)
+
+
+@instrumentation.step
+def compute_head_to_head(full_games: LazyFrame) -> LazyFrame:
+    """
+    Record and average score of every team against each opponent, per season.
+    """
+    head_to_head = full_games.group_by(
+        PARTITION_KEY, "season_type", "team", "opponent"
+    ).agg(
+        pl.len().alias("games"),
+        (pl.col("win_loss") == "W").sum().alias("wins"),
+        (pl.col("win_loss") == "L").sum().alias("losses"),
+        pl.mean("team_pts"),
+        pl.mean("opponent_pts"),
+        (pl.col("team_pts") - pl.col("opponent_pts")).mean().alias("point_diff"),
+    )
+
+    return apply_schema(head_to_head, HEAD_TO_HEAD_DTYPES)
+
+
+# Results are reused while the raw games, the code and the metrics are unchanged
+team_ratings_cache_key = source_cache_key(
+    team_source_keys,
+    [*TEAM_MODULES, "teams.ratings"],
+    lambda: {
+        "metrics": TEAM_METRICS,
+        "config": TEAM_CONFIG_MAP,
+        "outputs": config.bucket_conf.processed,
+    },
+)
+
+
+def sink_team_facts_output(
+    compute: Callable[[LazyFrame], LazyFrame],
+    output_name: str,
+    game_facts_key: str | None,
+    incremental: bool,
+) -> str:
+    """
+    Write an output computed from the team game facts, only its changed seasons
+    when incremental.
+    """
+    output = getattr(config.bucket_conf.processed, output_name)
+    team_facts = scan_team_game_facts(game_facts_key)
+
+    if incremental:
+        return sink_incremental(
+            team_facts,
+            compute=lambda seasons: compute(
+                team_facts.filter(pl.col(PARTITION_KEY).is_in(seasons))
+            ),
+            output_key=output.partitioned_key,
+            layout=output.layout,
+            source_keys=team_source_keys(),
+        )
+
+    return nba_bucket.sink_output(compute(team_facts), output)
+
+
+@task(log_prints=True, **cache_options(team_ratings_cache_key))
+@instrumentation.run("team-ratings")
+def get_team_ratings(
+    game_facts_key: str | None = None, incremental: bool = False
+) -> str:
+    return sink_team_facts_output(
+        compute_team_ratings, "team_ratings", game_facts_key, incremental
+    )
+
+
+@task(log_prints=True)
+@instrumentation.run("team-ratings")
+def collect_team_ratings(game_facts_key: str | None = None) -> pl.DataFrame:
+    """
+    Compute the team ratings in memory, to be exported without a re-read.
+    """
+    team_facts = scan_team_game_facts(game_facts_key)
+
+    return compute_team_ratings(team_facts).collect()
+
+
+@task(log_prints=True, **cache_options(team_ratings_cache_key))
+@instrumentation.run("head-to-head")
+def get_head_to_head(
+    game_facts_key: str | None = None, incremental: bool = False
+) -> str:
+    return sink_team_facts_output(
+        compute_head_to_head, "head_to_head", game_facts_key, incremental
+    )
+
+
+@task(log_prints=True)
+@instrumentation.run("head-to-head")
+def collect_head_to_head(game_facts_key: str | None = None) -> pl.DataFrame:
+    """
+    Compute the head-to-head records in memory, to be exported without a re-read.
+    """
+    team_facts = scan_team_game_facts(game_facts_key)
+
+    return compute_head_to_head(team_facts).collect(engine="streaming")
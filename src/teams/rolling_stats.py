@@ -0,0 +1,64 @@
+import polars as pl
+
+from prefect import task
+
+import config
+from config.bucket import nba_bucket
+from config.task_cache import cache_options, source_cache_key
+from config.instrumentation import instrumentation
+from config.partitions import sink_incremental
+from games.rolling import RollingStatsProcessor
+from teams import TEAM_CONFIG_MAP, TEAM_METRICS
+from teams.season_stats import TEAM_MODULES, scan_team_game_facts, team_source_keys
+
+
+def get_rolling_processor() -> RollingStatsProcessor:
+    return RollingStatsProcessor(
+        keys=["season_id", "team", "team_name"],
+        metrics=[
+            *[f"team_{metric}" for metric in TEAM_METRICS],
+            *[f"opponent_{metric}" for metric in TEAM_METRICS],
+        ],
+        windows=config.rolling_conf.windows,
+        date_column="game_date",
+        game_id_column="game_id",
+        win_loss_column="win_loss",
+    )
+
+
+team_rolling_cache_key = source_cache_key(
+    team_source_keys,
+    [*TEAM_MODULES, "games.rolling", "teams.rolling_stats"],
+    lambda: {
+        "metrics": TEAM_METRICS,
+        "config": TEAM_CONFIG_MAP,
+        "windows": config.rolling_conf.windows,
+        "outputs": config.bucket_conf.processed,
+    },
+)
+
+
+@task(log_prints=True, **cache_options(team_rolling_cache_key))
+@instrumentation.run("team-rolling-stats")
+def get_team_rolling_stats(
+    game_facts_key: str | None = None, incremental: bool = False
+) -> str:
+    output = config.bucket_conf.processed.team_rolling_stats
+
+    team_facts = scan_team_game_facts(game_facts_key)
+    processor = get_rolling_processor()
+
+    if incremental:
+        return sink_incremental(
+            team_facts,
+            compute=lambda seasons: processor.compute_rolling_stats(
+                team_facts.filter(pl.col("season").is_in(seasons))
+            ),
+            output_key=output.partitioned_key,
+            layout=output.layout,
+            source_keys=team_source_keys(),
+        )
+
+    rolling_stats = processor.compute_rolling_stats(team_facts)
+
+    return nba_bucket.sink_output(rolling_stats, output)
@@ -4,75 +4,119 @@ import polars as pl
 from polars import LazyFrame
 from prefect import task
 from config.bucket import nba_bucket
-from config import bucket_conf
-from teams import TEAM_CONFIG_MAP, TEAM_METRICS
+import config
+from config.task_cache import cache_options, source_cache_key
+from config.instrumentation import instrumentation
+from config.partitions import sink_incremental
+from games.facts import sink_game_facts
+from games.metrics import available_metrics, season_aggregations
+from games.schema import apply_schema, game_dtypes, season_dtypes
+from games.scope import MIN_SEASON, scan_games_scope
+from teams import (
+    TEAM_CONFIG_MAP,
+    TEAM_COUNT_METRICS,
+    TEAM_METRICS,
+    TEAM_SEASON_METRICS,
+)
 
+GAME_COLUMNS = ["game_id", "season_id", "season_type", "game_date", "season"]
 
-def get_transformed_games(games_detail: LazyFrame, conf_type: str) -> LazyFrame:
+TEAM_GAME_METRICS = [
+    f"{side}_{metric}" for side in ["team", "opponent"] for metric in TEAM_METRICS
+]
+TEAM_GAME_DTYPES = game_dtypes(
+    TEAM_GAME_METRICS,
+    [
+        f"{side}_{metric}"
+        for side in ["team", "opponent"]
+        for metric in TEAM_COUNT_METRICS
+    ],
+)
+TEAM_SEASON_DTYPES = season_dtypes(
+    [*TEAM_GAME_METRICS, *[metric.name for metric in TEAM_SEASON_METRICS]],
+    ["wins", "losses", "total_games"],
+)
+
+
+def get_team_perspective(conf_type: str) -> dict[str, pl.Expr]:
     """
-    Transform the games detail LazyFrame based on the configuration type.
+    Columns of a game seen by its home or away team, keyed by their name.
     """
     try:
         applied_config = TEAM_CONFIG_MAP[conf_type]
     except KeyError:
         raise Exception("Choose a configuration between 'home' and 'away'")
 
-    renaming_common = [
-        pl.col(col_name).alias(col_alias)
+    renaming_common = {
+        col_alias: pl.col(col_name)
         for col_name, col_alias in applied_config["renaming"].items()
-    ]
+    }
 
-    team_metrics = [
-        pl.col(metric_name).cast(pl.Float32).alias(metric_alias)
+    team_metrics = {
+        metric_alias: pl.col(metric_name)
         for metric_name, metric_alias in applied_config["team_metrics"].items()
-    ]
+    }
 
-    opponent_metrics = [
-        pl.col(metric_name).cast(pl.Float32).alias(metric_alias)
+    opponent_metrics = {
+        metric_alias: pl.col(metric_name)
         for metric_name, metric_alias in applied_config["opponent_metrics"].items()
-    ]
+    }
 
-    return games_detail.filter(pl.col("season_type") != "Pre Season").select(
-        "game_id",
-        "season_id",
-        "season_type",
-        pl.col("game_date").str.to_datetime(),
-        pl.lit(f"{conf_type}").alias("game_location"),
-        *renaming_common,
-        *team_metrics,
-        *opponent_metrics,
-    )
+    return {
+        "game_location": pl.lit(f"{conf_type}"),
+        **renaming_common,
+        **team_metrics,
+        **opponent_metrics,
+    }
 
 
-def create_full_games(
-    home_games: LazyFrame, away_games: LazyFrame, games_detail: LazyFrame
-) -> LazyFrame:
+@instrumentation.step
+def get_full_games(games_scope: LazyFrame, min_season: int = MIN_SEASON) -> LazyFrame:
     """
-    Combine home and away games into a full games LazyFrame with season information.
+    Reshape each game into the rows of its home and away teams in a single pass.
+
+    The games are filtered once and both perspectives are projected from that same
+    frame then stacked, instead of transforming the games once per location and
+    aligning the results with a join.
     """
+    home_perspective = get_team_perspective("home")
+    away_perspective = get_team_perspective("away")
 
-    game_season = (
-        games_detail.with_columns(
-            pl.col("game_date").str.to_datetime().dt.year().alias("year")
-        )
-        .group_by("season_id")
-        .agg(pl.max("year").alias("season"))
+    games = games_scope.filter(
+        (pl.col("season_type") != "Pre Season") & (pl.col("season") >= min_season)
     )
 
-    return (
-        pl.concat(items=[home_games, away_games], how="align")
-        .join(game_season, how="left", on="season_id")
-        .filter(pl.col("season") >= 2015)
+    return pl.concat(
+        apply_schema(
+            games.select(
+                *GAME_COLUMNS,
+                # Same column order for both perspectives
+                *[
+                    perspective[col_alias].alias(col_alias)
+                    for col_alias in home_perspective
+                ],
+            ),
+            TEAM_GAME_DTYPES,
+        )
+        for perspective in [home_perspective, away_perspective]
     )
 
 
+@instrumentation.step
 def compute_team_season_stats(full_games: LazyFrame) -> LazyFrame:
     """
     Compute the season statistics for teams based on game data.
+
+    The counts are averaged per game, the season metrics are computed from the
+    season totals, all in the same aggregation.
     """
     team_stats_dimensions = ["season_id", "team", "team_name", "season"]
+    game_metrics = [
+        f"{side}_{metric}" for side in ["team", "opponent"] for metric in TEAM_METRICS
+    ]
+    season_metrics = available_metrics(TEAM_SEASON_METRICS, set(game_metrics))
 
-    return (
+    team_season_stats = (
         full_games.with_columns(
             pl.when(pl.col("win_loss") == "W").then(1).otherwise(0).alias("wins"),
             pl.when(pl.col("win_loss") == "L").then(1).otherwise(0).alias("losses"),
@@ -82,24 +126,131 @@ def compute_team_season_stats(full_games: LazyFrame) -> LazyFrame:
             pl.sum("wins"),
             pl.sum("losses"),
             pl.count("game_id").alias("total_games"),
-            *[pl.mean(f"team_{metric}") for metric in TEAM_METRICS],
-            *[pl.mean(f"opponent_{metric}") for metric in TEAM_METRICS],
+            *season_aggregations(game_metrics, season_metrics),
         )
     )
 
+    return apply_schema(team_season_stats, TEAM_SEASON_DTYPES)
+
+
+def build_team_game_facts(
+    games_scope: LazyFrame,
+    seasons: list[int] | None = None,
+    min_season: int = MIN_SEASON,
+) -> LazyFrame:
+    """
+    Team game facts: a row per game and team perspective, optionally restricted to
+    some seasons.
+    """
+    if seasons is not None:
+        games_scope = games_scope.filter(pl.col("season").is_in(seasons))
+
+    return get_full_games(games_scope, min_season)
+
+
+def build_team_season_stats(
+    games_scope: LazyFrame, seasons: list[int] | None = None
+) -> LazyFrame:
+    """
+    Build the team season stats, optionally restricted to some seasons.
+    """
+    full_games = build_team_game_facts(games_scope, seasons)
+
+    return compute_team_season_stats(full_games)
 
-@task(log_prints=True)
-def get_team_season_stats() -> str:
-    team_stats = nba_bucket.scan_parquet(bucket_conf.raw.games_detail)
 
-    home_games = get_transformed_games(team_stats, "home")
-    away_games = get_transformed_games(team_stats, "away")
-    full_games = create_full_games(home_games, away_games, team_stats)
+def team_source_keys() -> list[str]:
+    return [config.bucket_conf.raw.games_detail]
 
-    team_season_stats = compute_team_season_stats(full_games)
 
-    output_path = nba_bucket.sink_parquet(
-        team_season_stats, "team_season_stats.parquet"
+TEAM_MODULES = [
+    "games.facts",
+    "games.metrics",
+    "games.raw",
+    "games.schema",
+    "games.scope",
+    "teams",
+    "teams.season_stats",
+]
+
+# Results are reused while the raw games, the code and the metrics are unchanged
+team_cache_key = source_cache_key(
+    team_source_keys,
+    TEAM_MODULES,
+    lambda: {
+        "metrics": TEAM_METRICS,
+        "config": TEAM_CONFIG_MAP,
+        "outputs": config.bucket_conf.processed,
+    },
+)
+
+
+@task(log_prints=True, **cache_options(team_cache_key))
+@instrumentation.run("team-game-facts")
+def get_team_game_facts(
+    games_scope_path: str | None = None, incremental: bool = False
+) -> str:
+    """
+    Persist the team game facts, partitioned by season and sorted by game.
+    """
+    # Older seasons are written by a backfill, never by the regular flow
+    games_scope = scan_games_scope(games_scope_path).filter(
+        pl.col("season") >= MIN_SEASON
+    )
+
+    return sink_game_facts(
+        lambda seasons: build_team_game_facts(games_scope, seasons),
+        facts_key=config.bucket_conf.facts.team_games,
+        game_id_column="game_id",
+        source=games_scope,
+        source_keys=team_source_keys(),
+        incremental=incremental,
     )
 
+
+def scan_team_game_facts(game_facts_key: str | None = None) -> LazyFrame:
+    """
+    Scan the persisted team game facts, or derive them from the raw data.
+    """
+    if game_facts_key is not None:
+        return nba_bucket.scan_partitioned(game_facts_key)
+
+    return build_team_game_facts(scan_games_scope())
+
+
+@task(log_prints=True, **cache_options(team_cache_key))
+@instrumentation.run("team-season-stats")
+def get_team_season_stats(
+    game_facts_key: str | None = None, incremental: bool = False
+) -> str:
+    output = config.bucket_conf.processed.team_season_stats
+
+    team_facts = scan_team_game_facts(game_facts_key)
+
+    if incremental:
+        return sink_incremental(
+            team_facts,
+            compute=lambda seasons: compute_team_season_stats(
+                team_facts.filter(pl.col("season").is_in(seasons))
+            ),
+            output_key=output.partitioned_key,
+            layout=output.layout,
+            source_keys=team_source_keys(),
+        )
+
+    team_season_stats = compute_team_season_stats(team_facts)
+
+    output_path = nba_bucket.sink_output(team_season_stats, output)
+
     return output_path
+
+
+@task(log_prints=True)
+@instrumentation.run("team-season-stats")
+def collect_team_season_stats(game_facts_key: str | None = None) -> pl.DataFrame:
+    """
+    Compute the teams' season stats in memory, to be exported without a re-read.
+    """
+    team_facts = scan_team_game_facts(game_facts_key)
+
+    return compute_team_season_stats(team_facts).collect(engine="streaming")
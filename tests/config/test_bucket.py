@@ -0,0 +1,227 @@
+from unittest.mock import MagicMock
+
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+
+from config import ProcessedOutput, bucket_conf
+from config.bucket import NBABucket, S3IOConf
+
+
+@pytest.fixture
+def s3_bucket():
+    """Create an NBABucket with credentials resolved without Prefect blocks."""
+    nba_bucket = NBABucket()
+    nba_bucket._bucket_name = "test-bucket"
+    nba_bucket._region_name = "eu-west-3"
+    nba_bucket._storage_options = {"key": "access", "secret": "secret"}
+
+    return nba_bucket
+
+
+class TestNBABucket:
+    def test_cloud_storage_options(self, s3_bucket):
+        assert s3_bucket.cloud_storage_options == {
+            "aws_access_key_id": "access",
+            "aws_secret_access_key": "secret",
+            "aws_region": "eu-west-3",
+        }
+
+    def test_sink_parquet_streams_to_s3(self, s3_bucket):
+        lf = MagicMock(spec=pl.LazyFrame)
+
+        output_path = s3_bucket.sink_parquet(
+            lf, "stats.parquet", compression="zstd", row_group_size=50_000
+        )
+
+        assert output_path == "s3://test-bucket/processed/stats.parquet"
+        lf.collect.assert_not_called()
+        lf.sink_parquet.assert_called_once_with(
+            "s3://test-bucket/processed/stats.parquet",
+            compression="zstd",
+            row_group_size=50_000,
+            statistics=True,
+            storage_options=s3_bucket.cloud_storage_options,
+            retries=s3_bucket.io_conf.max_attempts,
+            engine="streaming",
+        )
+
+    def test_sink_parquet_sorts_rows(self, s3_bucket):
+        lf = MagicMock(spec=pl.LazyFrame)
+
+        s3_bucket.sink_parquet(lf, "stats.parquet", sort_by=["season", "team"])
+
+        lf.sort.assert_called_once_with(["season", "team"])
+        lf.sort.return_value.sink_parquet.assert_called_once()
+
+    def test_scan_parquet_native(self, s3_bucket, monkeypatch):
+        scanned = {}
+
+        def mock_scan_parquet(source, storage_options, retries):
+            scanned.update(
+                source=source, storage_options=storage_options, retries=retries
+            )
+            return pl.LazyFrame()
+
+        monkeypatch.setattr(pl, "scan_parquet", mock_scan_parquet)
+
+        s3_bucket.scan_parquet("raw/playerstatistics.parquet")
+
+        assert scanned == {
+            "source": "s3://test-bucket/raw/playerstatistics.parquet",
+            "storage_options": s3_bucket.cloud_storage_options,
+            "retries": s3_bucket.io_conf.max_attempts,
+        }
+
+    def test_cloud_storage_options_with_endpoint(self, s3_bucket):
+        s3_bucket.io_conf = S3IOConf(endpoint_url="http://localhost:9000")
+
+        assert s3_bucket.cloud_storage_options["aws_endpoint_url"] == (
+            "http://localhost:9000"
+        )
+        assert s3_bucket.cloud_storage_options["aws_allow_http"] == "true"
+
+    def test_clients_are_pooled_and_reused(self, s3_bucket):
+        s3_bucket.io_conf = S3IOConf(
+            endpoint_url="http://localhost:9000",
+            max_pool_connections=16,
+            max_attempts=5,
+            part_size=8 * 1024**2,
+            max_concurrency=4,
+        )
+
+        s3_fs = s3_bucket.fs
+
+        assert s3_bucket.fs is s3_fs
+        assert s3_bucket.arrow_fs is s3_bucket.arrow_fs
+        assert s3_fs.default_block_size == 8 * 1024**2
+        assert s3_fs.max_concurrency == 4
+        assert s3_fs.config_kwargs == {
+            "max_pool_connections": 16,
+            "retries": {"max_attempts": 5, "mode": "adaptive"},
+        }
+
+    def test_client_uses_endpoint(self, s3_bucket):
+        s3_bucket.io_conf = S3IOConf(endpoint_url="http://localhost:9000")
+
+        # Creating the botocore client does not send any request
+        s3_bucket.fs.connect()
+
+        assert s3_bucket.fs.s3.meta.endpoint_url == "http://localhost:9000"
+        assert s3_bucket.fs.s3.meta.config.max_pool_connections == 32
+
+    def test_transfers_use_parts(self, s3_bucket):
+        s3_bucket._fs = MagicMock()
+
+        s3_bucket.download("raw/games.parquet", "/tmp/games.parquet")
+        output_path = s3_bucket.upload("/tmp/games.parquet", "raw/games.parquet")
+
+        parts = {
+            "chunksize": s3_bucket.io_conf.part_size,
+            "max_concurrency": s3_bucket.io_conf.max_concurrency,
+        }
+        s3_bucket.fs.get_file.assert_called_once_with(
+            "test-bucket/raw/games.parquet", "/tmp/games.parquet", **parts
+        )
+        s3_bucket.fs.put_file.assert_called_once_with(
+            "/tmp/games.parquet", "test-bucket/raw/games.parquet", **parts
+        )
+        assert output_path == "s3://test-bucket/raw/games.parquet"
+
+
+def test_io_conf_from_env(monkeypatch):
+    monkeypatch.setenv("NBA_S3_ENDPOINT_URL", "http://localhost:9000")
+    monkeypatch.setenv("NBA_S3_PART_SIZE", "1048576")
+    monkeypatch.setenv("NBA_S3_MAX_CONCURRENCY", "2")
+
+    io_conf = S3IOConf.from_env()
+
+    assert io_conf.endpoint_url == "http://localhost:9000"
+    assert io_conf.part_size == 1024**2
+    assert io_conf.max_concurrency == 2
+    assert io_conf.max_attempts == S3IOConf().max_attempts
+
+
+@pytest.fixture
+def local_bucket(monkeypatch, tmp_path):
+    monkeypatch.setenv("NBA_STORAGE", "local")
+    monkeypatch.setenv("NBA_STORAGE_DIR", str(tmp_path))
+
+    return NBABucket()
+
+
+class TestLocalBackend:
+    def test_round_trip(self, local_bucket, tmp_path):
+        lf = pl.LazyFrame({"season": [2024, 2025], "points": [10, 20]})
+
+        output_path = local_bucket.sink_parquet(lf, "stats.parquet")
+        result = local_bucket.scan_parquet("processed/stats.parquet").collect()
+
+        assert output_path == f"{tmp_path.resolve()}/processed/stats.parquet"
+        assert result.equals(lf.collect())
+        assert local_bucket.object_etag("processed/stats.parquet") is not None
+        assert local_bucket.object_etag("processed/missing.parquet") is None
+
+    def test_partitioned_round_trip(self, local_bucket):
+        lf = pl.LazyFrame({"season": [2024, 2025], "points": [10, 20]})
+
+        local_bucket.sink_partitioned(lf, "facts/games", "season")
+        result = local_bucket.scan_partitioned("facts/games").collect()
+
+        assert result.sort("season").equals(lf.collect())
+
+    def test_sink_output_layout(self, local_bucket):
+        lf = pl.LazyFrame({"season": [2025, 2024, 2025, 2024], "team": list("DCBA")})
+        output = ProcessedOutput.from_yaml(
+            {"key": "stats.parquet", "sort_by": ["season", "team"], "row_group_size": 2}
+        )
+
+        output_path = local_bucket.sink_output(lf, output)
+        metadata = pq.ParquetFile(output_path).metadata
+
+        # Each row group holds a single season
+        assert metadata.num_row_groups == 2
+        assert [
+            metadata.row_group(index).column(0).statistics.max for index in range(2)
+        ] == [2024, 2025]
+
+    def test_sink_output_partitioned(self, local_bucket):
+        lf = pl.LazyFrame({"season": [2025, 2024], "team": ["B", "A"]})
+        output = ProcessedOutput.from_yaml(
+            {"key": "stats.parquet", "partition_by": "season"}
+        )
+
+        output_path = local_bucket.sink_output(lf, output)
+
+        assert output_path.endswith("processed/stats/**/*.parquet")
+        assert pl.read_parquet(output_path).sort("season")["team"].to_list() == [
+            "A",
+            "B",
+        ]
+
+    def test_json(self, local_bucket):
+        local_bucket.write_json("processed/manifest.json", {"season": 2025})
+
+        assert local_bucket.read_json("processed/manifest.json") == {"season": 2025}
+        assert local_bucket.read_json("processed/missing.json") is None
+
+
+def test_memory_backend_is_shared_with_workers(monkeypatch):
+    monkeypatch.setenv("NBA_STORAGE", "memory")
+    # Unset, restored after the test
+    monkeypatch.setenv("NBA_MEMORY_STORAGE_DIR", "")
+
+    storage_dir = NBABucket().bucket_name
+    # A worker process inherits the environment of the flow process
+    worker_storage_dir = NBABucket().bucket_name
+
+    assert worker_storage_dir == storage_dir
+
+
+def test_per_game_outputs_are_not_sorted():
+    # Sorting blocks the streaming sink, only the season outputs are small enough
+    processed = bucket_conf.processed
+
+    assert processed.player_rolling_stats.layout.sort_by == []
+    assert processed.team_rolling_stats.layout.sort_by == []
+    assert processed.player_season_stats.layout.sort_by == ["season", "personId"]
@@ -0,0 +1,140 @@
+import os
+import threading
+
+import polars as pl
+import pytest
+
+from config.bucket import NBABucket
+from config.cache import LocalCache
+
+
+def write_bytes(size: int):
+    """Download stand-in writing `size` bytes and recording each call."""
+    calls = []
+
+    def download(path):
+        calls.append(path)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+
+    return download, calls
+
+
+class TestLocalCache:
+    def test_from_env_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("NBA_CACHE_DIR", raising=False)
+
+        assert LocalCache.from_env() is None
+
+    def test_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("NBA_CACHE_DIR", str(tmp_path))
+        monkeypatch.setenv("NBA_CACHE_MAX_BYTES", "1024")
+
+        cache = LocalCache.from_env()
+
+        assert cache.cache_dir == tmp_path
+        assert cache.max_bytes == 1024
+
+    def test_fetch_downloads_once_per_etag(self, tmp_path):
+        cache = LocalCache(tmp_path)
+        download, calls = write_bytes(10)
+
+        first = cache.fetch("bucket", "raw/games.parquet", "etag-1", download)
+        second = cache.fetch("bucket", "raw/games.parquet", "etag-1", download)
+        refreshed = cache.fetch("bucket", "raw/games.parquet", "etag-2", download)
+
+        assert first == second
+        assert refreshed != first
+        assert len(calls) == 2
+        assert first.suffix == ".parquet"
+
+    def test_concurrent_misses_download_to_their_own_file(self, tmp_path):
+        cache = LocalCache(tmp_path)
+        both_downloading = threading.Barrier(2)
+        downloads = []
+
+        def download(path):
+            downloads.append(path)
+            with open(path, "wb") as f:
+                f.write(b"x" * 5)
+                both_downloading.wait(timeout=5)
+                f.write(b"x" * 5)
+
+        threads = [
+            threading.Thread(
+                target=cache.fetch, args=("bucket", "a.parquet", "etag", download)
+            )
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        entry = cache.entry_path("bucket", "a.parquet", "etag")
+        assert len(set(downloads)) == 2
+        assert entry.read_bytes() == b"x" * 10
+        assert list(tmp_path.iterdir()) == [entry]
+
+    def test_failed_download_leaves_no_file(self, tmp_path):
+        cache = LocalCache(tmp_path)
+
+        def download(path):
+            with open(path, "wb") as f:
+                f.write(b"x")
+            raise OSError("connection reset")
+
+        with pytest.raises(OSError):
+            cache.fetch("bucket", "a.parquet", "etag", download)
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = LocalCache(tmp_path, max_bytes=25)
+        download, _ = write_bytes(10)
+
+        oldest = cache.fetch("bucket", "a.parquet", "etag", download)
+        recent = cache.fetch("bucket", "b.parquet", "etag", download)
+        os.utime(oldest, (0, 0))
+        os.utime(recent, (1, 1))
+
+        newest = cache.fetch("bucket", "c.parquet", "etag", download)
+
+        assert not oldest.exists()
+        assert recent.exists()
+        assert newest.exists()
+
+
+@pytest.fixture
+def cached_bucket(tmp_path):
+    """NBABucket with a local cache and a stub S3 filesystem."""
+
+    class StubS3FileSystem:
+        def __init__(self):
+            self.downloads = 0
+
+        def exists(self, path):
+            return True
+
+        def info(self, path):
+            return {"ETag": "etag-1"}
+
+        def get_file(self, remote_path, local_path, **kwargs):
+            self.downloads += 1
+            pl.DataFrame({"game_id": [1, 2]}).write_parquet(local_path)
+
+    nba_bucket = NBABucket()
+    nba_bucket._bucket_name = "test-bucket"
+    nba_bucket._fs = StubS3FileSystem()
+    nba_bucket.cache = LocalCache(tmp_path / "cache")
+
+    return nba_bucket
+
+
+def test_scan_parquet_served_from_cache(cached_bucket):
+    first = cached_bucket.scan_parquet("raw/games_detail.parquet").collect()
+    second = cached_bucket.scan_parquet("raw/games_detail.parquet").collect()
+
+    assert first["game_id"].to_list() == [1, 2]
+    assert first.equals(second)
+    assert cached_bucket.fs.downloads == 1
@@ -1,9 +1,18 @@
 import polars as pl
 import pytest
 
+from types import SimpleNamespace
+
 from config import export as export_module
-from config.export import export_to_duckdb
-from config import motherduck
+from config.bucket import NBABucket
+from config.export import (
+    export_cache_key,
+    export_frame_to_bucket,
+    export_frame_to_duckdb,
+    export_to_duckdb,
+)
+from config import OutputLayout, ProcessedOutput, motherduck
+from players import PLAYERS_METRICS
 
 
 @pytest.fixture
@@ -23,16 +32,27 @@ def local_db_mode(monkeypatch, tmp_path):
     db.close()
 
 
+@pytest.fixture
+def local_bucket(monkeypatch, tmp_path):
+    """Write the exported files to a local storage backend."""
+    monkeypatch.setenv("NBA_STORAGE", "local")
+    monkeypatch.setenv("NBA_STORAGE_DIR", str(tmp_path / "bucket"))
+    monkeypatch.setattr(export_module, "nba_bucket", NBABucket())
+
+
 @pytest.fixture
 def team_stats_parquet(tmp_path):
     """Create sample team stats parquet file."""
     df = pl.DataFrame({
+        "season_id": ["22024", "22024", "22024"],
         "team": ["LAL", "BOS", "GSW"],
         "team_name": ["Lakers", "Celtics", "Warriors"],
         "season": [2024, 2024, 2024],
         "wins": [45, 50, 42],
         "losses": [37, 32, 40],
+        "total_games": [82, 82, 82],
         "team_pts": [115.2, 118.5, 120.1],
+        "opponent_pts": [114.0, 109.2, 118.7],
     })
     filepath = tmp_path / "team_season_stats.parquet"
     df.write_parquet(filepath)
@@ -43,12 +63,14 @@ def team_stats_parquet(tmp_path):
 def player_stats_parquet(tmp_path):
     """Create sample player stats parquet file."""
     df = pl.DataFrame({
-        "player_name": ["LeBron James", "Jayson Tatum", "Stephen Curry"],
-        "team": ["LAL", "BOS", "GSW"],
         "season": [2024, 2024, 2024],
-        "pts": [25.7, 26.9, 26.4],
-        "reb": [7.3, 8.1, 4.5],
-        "ast": [8.3, 4.9, 5.1],
+        "firstName": ["LeBron", "Jayson", "Stephen"],
+        "lastName": ["James", "Tatum", "Curry"],
+        "personId": [2544, 1628369, 201939],
+        "gameType": ["Regular Season"] * 3,
+        "GP": [71, 74, 74],
+        **{metric: [5.0, 5.0, 5.0] for metric in PLAYERS_METRICS.values()},
+        "PTS": [25.7, 26.9, 26.4],
     })
     filepath = tmp_path / "player_season_stats.parquet"
     df.write_parquet(filepath)
@@ -82,9 +104,114 @@ class TestExportToDuckDB:
         assert result[1] == ("LAL", 45)
         assert result[2] == ("GSW", 42)
 
+    def test_export_builds_rollups(self, local_db_mode, team_stats_parquet):
+        export_to_duckdb.fn(team_stats_parquet, "team_season_stats")
+
+        standings = local_db_mode.conn.execute(
+            "SELECT standing, team, point_diff FROM team_standings"
+        ).fetchall()
+
+        assert standings == [(1, "BOS", 9.3), (2, "LAL", 1.2), (3, "GSW", 1.4)]
+
+    def test_standings_rank_regular_season_only(self, local_db_mode, tmp_path):
+        filepath = tmp_path / "team_season_stats.parquet"
+        pl.DataFrame({
+            "season_id": ["22024", "22024", "42024"],
+            "team": ["LAL", "BOS", "LAL"],
+            "team_name": ["Lakers", "Celtics", "Lakers"],
+            "season": [2024, 2024, 2024],
+            "wins": [45, 50, 60],
+            "losses": [37, 32, 2],
+            "total_games": [82, 82, 62],
+            "team_pts": [115.2, 118.5, 120.0],
+            "opponent_pts": [114.0, 109.2, 100.0],
+        }).write_parquet(filepath)
+
+        export_to_duckdb.fn(str(filepath), "team_season_stats")
+
+        standings = local_db_mode.conn.execute(
+            "SELECT standing, team, wins FROM team_standings"
+        ).fetchall()
+
+        # The playoff record is not ranked against the regular season records
+        assert standings == [(1, "BOS", 50), (2, "LAL", 45)]
+
+    def test_export_refreshes_changed_seasons(self, local_db_mode, player_stats_parquet):
+        export_to_duckdb.fn(player_stats_parquet, "player_season_stats")
+
+        # LeBron James takes the scoring lead
+        james_pts = pl.when(pl.col("lastName") == "James").then(30.0)
+        pl.read_parquet(player_stats_parquet).with_columns(
+            james_pts.otherwise("PTS").alias("PTS")
+        ).write_parquet(player_stats_parquet)
+
+        export_to_duckdb.fn(player_stats_parquet, "player_season_stats")
+
+        leaders = local_db_mode.conn.execute(
+            "SELECT lastName, pts_rank FROM player_leaders"
+        ).fetchall()
+        percentiles = local_db_mode.conn.execute(
+            "SELECT players, p90 FROM player_percentiles WHERE metric = 'PTS'"
+        ).fetchall()
+
+        assert leaders == [("James", 1), ("Tatum", 2), ("Curry", 3)]
+        assert percentiles[0][0] == 3
+        assert percentiles[0][1] > 27
+
     def test_export_multiple_tables(self, local_db_mode, team_stats_parquet, player_stats_parquet):
         export_to_duckdb.fn(team_stats_parquet, "team_season_stats")
         export_to_duckdb.fn(player_stats_parquet, "player_season_stats")
 
         assert local_db_mode.table_exists("team_season_stats")
         assert local_db_mode.table_exists("player_season_stats")
+
+
+def test_export_cache_key(monkeypatch, local_db_mode, team_stats_parquet, tmp_path):
+    monkeypatch.setenv("NBA_STORAGE", "local")
+    monkeypatch.setenv("NBA_STORAGE_DIR", str(tmp_path))
+    monkeypatch.setattr(export_module, "nba_bucket", NBABucket())
+
+    context = SimpleNamespace(task=SimpleNamespace(name="export_to_duckdb"))
+    parameters = {"filepath": team_stats_parquet, "table_name": "team_season_stats"}
+
+    key = export_cache_key(context, parameters)
+    export_to_duckdb.fn(**parameters)
+
+    # Loading the table leaves the key unchanged, a new file changes it
+    assert export_cache_key(context, parameters) == key
+
+    pl.DataFrame({"team": ["LAL"], "wins": [60]}).write_parquet(team_stats_parquet)
+
+    assert export_cache_key(context, parameters) != key
+
+
+class TestExportFrames:
+    def test_export_frame_to_duckdb(self, local_db_mode, team_stats_parquet):
+        df = pl.read_parquet(team_stats_parquet)
+
+        result = export_frame_to_duckdb.fn(df, "team_season_stats")
+
+        assert result == "team_season_stats"
+        assert local_db_mode.conn.execute(
+            "SELECT team, wins FROM team_season_stats ORDER BY wins DESC"
+        ).fetchall() == [("BOS", 50), ("LAL", 45), ("GSW", 42)]
+
+    def test_export_frame_to_bucket(self, team_stats_parquet):
+        df = pl.read_parquet(team_stats_parquet)
+
+        output = ProcessedOutput("team_season_stats.parquet")
+        output_path = export_frame_to_bucket.fn(df, output)
+
+        assert pl.read_parquet(output_path).equals(df)
+
+    def test_export_frame_to_bucket_with_layout(self, local_bucket, team_stats_parquet):
+        df = pl.read_parquet(team_stats_parquet)
+        output = ProcessedOutput(
+            "team_season_stats.parquet",
+            OutputLayout(sort_by=["season", "team"], partition_by="season"),
+        )
+
+        output_path = export_frame_to_bucket.fn(df, output)
+
+        assert output_path.endswith("processed/team_season_stats/**/*.parquet")
+        assert pl.read_parquet(output_path)["team"].to_list() == ["BOS", "GSW", "LAL"]
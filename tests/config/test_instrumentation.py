@@ -0,0 +1,109 @@
+import cloudpickle
+import polars as pl
+import pytest
+
+from benchmarks.synthetic import generate_games_detail
+from config import instrumentation as instrumentation_module
+from config.instrumentation import Instrumentation, instrumentation
+from games.scope import prepare_games_scope
+from teams.season_stats import build_team_season_stats
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """Record the artifacts published instead of sending them to Prefect."""
+    artifacts = []
+
+    def mock_create_table_artifact(key, table, description):
+        artifacts.append((key, table))
+
+    monkeypatch.setattr(
+        instrumentation_module, "create_table_artifact", mock_create_table_artifact
+    )
+
+    return artifacts
+
+
+def add_points(lf: pl.LazyFrame) -> pl.LazyFrame:
+    return lf.with_columns((pl.col("points") + 1).alias("points"))
+
+
+class TestInstrumentation:
+    def test_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("NBA_INSTRUMENT", "1")
+        monkeypatch.setenv("NBA_PROFILE_DIR", str(tmp_path))
+
+        enabled = Instrumentation.from_env()
+
+        assert enabled.enabled
+        assert enabled.profile_dir == tmp_path
+
+    def test_disabled_step_returns_the_lazy_plan(self, published):
+        lf = pl.LazyFrame({"points": [1, 2]})
+        step = Instrumentation(enabled=False).step(add_points)
+
+        with Instrumentation(enabled=False).run("disabled"):
+            result = step(lf)
+
+        assert isinstance(result, pl.LazyFrame)
+        assert result.explain() == add_points(lf).explain()
+        assert published == []
+
+    def test_enabled_step_is_measured(self, published):
+        instrumented = Instrumentation(enabled=True)
+        step = instrumented.step(add_points)
+
+        with instrumented.run("points"):
+            result = step(
+                pl.LazyFrame({"points": [1, 2, 3]}).filter(pl.col("points") > 1)
+            )
+
+        assert result.collect()["points"].to_list() == [3, 4]
+
+        [(key, [record])] = published
+        assert key == "points"
+        assert record["name"] == "add_points"
+        assert record["rows_in"] == 2
+        assert record["rows_out"] == 2
+        assert record["bytes_out"] > 0
+        assert record["seconds"] >= 0
+        assert record["peak_rss_bytes"] > 0
+
+    def test_profile_dumped(self, tmp_path, published):
+        step = Instrumentation(enabled=True, profile_dir=tmp_path).step(add_points)
+
+        step(pl.LazyFrame({"points": [1]}))
+
+        [profile] = tmp_path.glob("add_points-*.csv")
+        assert {"node", "start", "end"} <= set(pl.read_csv(profile).columns)
+
+
+def test_instrumented_pipeline_matches(monkeypatch, published):
+    games_scope = prepare_games_scope(generate_games_detail(2024, 100).lazy())
+    expected = build_team_season_stats(games_scope).collect()
+
+    monkeypatch.setattr(instrumentation, "enabled", True)
+    with instrumentation.run("team-season-stats"):
+        result = build_team_season_stats(games_scope).collect()
+
+    sort_by = ["team", "season"]
+    assert result.sort(sort_by).equals(expected.sort(sort_by))
+
+    [(_, records)] = published
+    assert [record["name"] for record in records] == [
+        "get_full_games",
+        "compute_team_season_stats",
+    ]
+
+
+def test_run_decorated_function_is_picklable():
+    instrumented = Instrumentation(enabled=True)
+
+    @instrumented.run("points")
+    def task_function(value):
+        return value
+
+    # Worker processes receive the tasks pickled by value
+    unpickled = cloudpickle.loads(cloudpickle.dumps(task_function))
+
+    assert unpickled(1) == 1
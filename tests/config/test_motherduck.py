@@ -109,3 +109,110 @@ class TestDuckDBLocal:
 
         # Should be able to reconnect and see the table
         assert local_db.table_exists("test_table")
+
+    def test_create_table_from_arrow(self, local_db):
+        table = pl.DataFrame({"id": [1, 2], "name": ["Alice", "Bob"]}).to_arrow()
+
+        local_db.create_table_from_arrow(table, "arrow_table")
+
+        assert local_db.get_table_row_count("arrow_table") == 2
+        # The temporary Arrow view is not left behind
+        assert not local_db.table_exists("arrow_table_arrow")
+
+
+class TestDuckDBMerge:
+    @pytest.fixture
+    def seasons_table(self, local_db):
+        table = pl.DataFrame(
+            {"season": [2023, 2024], "team": ["BOS", "BOS"], "wins": [64, 50]}
+        ).to_arrow()
+        local_db.create_table_from_arrow(
+            table, "seasons", merge_keys=["season", "team"]
+        )
+        return local_db
+
+    def test_merge_updates_and_inserts(self, seasons_table):
+        table = pl.DataFrame(
+            {
+                "season": [2023, 2024, 2024],
+                "team": ["BOS", "BOS", "LAL"],
+                "wins": [64, 52, 40],
+            }
+        ).to_arrow()
+
+        seasons_table.create_table_from_arrow(
+            table, "seasons", merge_keys=["season", "team"]
+        )
+
+        result = seasons_table.conn.execute(
+            "SELECT season, team, wins FROM seasons ORDER BY season, team"
+        ).fetchall()
+        assert result == [(2023, "BOS", 64), (2024, "BOS", 52), (2024, "LAL", 40)]
+        assert not seasons_table.table_exists("seasons_staging")
+        assert not seasons_table.table_exists("seasons_changes")
+
+    def test_merge_from_file(self, seasons_table, tmp_path):
+        filepath = tmp_path / "seasons.parquet"
+        pl.DataFrame({"season": [2024], "team": ["BOS"], "wins": [55]}).write_parquet(
+            filepath
+        )
+
+        seasons_table.create_table_from_file(
+            str(filepath), "seasons", merge_keys=["season", "team"]
+        )
+
+        result = seasons_table.conn.execute(
+            "SELECT season, wins FROM seasons ORDER BY season"
+        ).fetchall()
+        assert result == [(2023, 64), (2024, 55)]
+
+    def test_merge_from_partitioned_files(self, seasons_table, tmp_path):
+        pl.LazyFrame({"season": [2024], "team": ["BOS"], "wins": [55]}).sink_parquet(
+            pl.PartitionByKey(tmp_path / "seasons", by="season", include_key=True),
+            mkdir=True,
+        )
+
+        partitions = seasons_table.create_table_from_file(
+            str(tmp_path / "seasons" / "**" / "*.parquet"),
+            "seasons",
+            merge_keys=["season", "team"],
+            partition_column="season",
+        )
+
+        # Same season type as the Arrow load, so the rows are merged, not replaced
+        assert partitions == [2024]
+        assert seasons_table.get_table_row_count("seasons") == 2
+
+    def test_merge_returns_changed_partitions(self, seasons_table):
+        table = pl.DataFrame(
+            {"season": [2023, 2024], "team": ["BOS", "BOS"], "wins": [64, 55]}
+        ).to_arrow()
+
+        partitions = seasons_table.create_table_from_arrow(
+            table, "seasons", merge_keys=["season", "team"], partition_column="season"
+        )
+
+        assert partitions == [2024]
+
+    def test_refresh_table_recomputes_partitions(self, seasons_table):
+        query = "SELECT season, sum(wins) AS wins FROM seasons GROUP BY season"
+        seasons_table.refresh_table("season_wins", query, ["season"], "season")
+
+        seasons_table.conn.execute("UPDATE seasons SET wins = wins + 1")
+        seasons_table.refresh_table(
+            "season_wins", query, ["season"], "season", partitions=[2024]
+        )
+
+        result = seasons_table.conn.execute("SELECT * FROM season_wins").fetchall()
+        assert result == [(2023, 64), (2024, 51)]
+
+    def test_schema_change_replaces_table(self, seasons_table):
+        table = pl.DataFrame(
+            {"season": [2024], "team": ["BOS"], "wins": [52], "losses": [30]}
+        ).to_arrow()
+
+        seasons_table.create_table_from_arrow(
+            table, "seasons", merge_keys=["season", "team"]
+        )
+
+        assert seasons_table.get_table_row_count("seasons") == 1
@@ -0,0 +1,202 @@
+import json
+import subprocess
+import sys
+
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from config import partitions
+from config.partitions import (
+    PartitionManifest,
+    compute_fingerprints,
+    record_partitions,
+    sink_incremental,
+)
+
+
+SOURCE = pl.LazyFrame(
+    {
+        "season": [2023, 2023, 2024],
+        "game_id": [1, 2, 3],
+        "pts": [100, 110, 120],
+    }
+)
+
+
+@pytest.fixture
+def memory_bucket(monkeypatch):
+    """Back the manifest and partitioned sinks of the NBA bucket with a dict."""
+    store = {"etags": {"raw/games_detail.parquet": "etag-1"}, "sunk": [], "removed": []}
+
+    monkeypatch.setattr(partitions.nba_bucket, "read_json", lambda key: store.get(key))
+    monkeypatch.setattr(
+        partitions.nba_bucket,
+        "write_json",
+        lambda key, data: store.__setitem__(key, data),
+    )
+    monkeypatch.setattr(
+        partitions.nba_bucket, "object_etag", lambda key: store["etags"].get(key)
+    )
+    monkeypatch.setattr(
+        partitions.nba_bucket,
+        "partitioned_path",
+        lambda output_key: f"memory://{output_key}/**/*.parquet",
+    )
+    monkeypatch.setattr(
+        partitions.nba_bucket,
+        "sink_partitioned",
+        lambda lf, output_key, partition_by, **layout: store["sunk"].append(
+            lf.collect()
+        ),
+    )
+    monkeypatch.setattr(
+        partitions.nba_bucket,
+        "remove_partitions",
+        lambda output_key, partition_by, removed: store["removed"].extend(removed),
+    )
+
+    return store
+
+
+def run_incremental(source: pl.LazyFrame, computed: list) -> str:
+    def compute(seasons):
+        computed.append(seasons)
+        return source.filter(pl.col("season").is_in(seasons))
+
+    return sink_incremental(
+        source,
+        compute=compute,
+        output_key="team_season_stats",
+        source_keys=["raw/games_detail.parquet"],
+    )
+
+
+class TestPartitionManifest:
+    def test_changed_partitions(self):
+        manifest = PartitionManifest(fingerprints={"2023": "a", "2024": "b"})
+
+        changed = manifest.changed_partitions({"2023": "a", "2024": "c", "2025": "d"})
+
+        assert changed == ["2024", "2025"]
+
+    def test_other_polars_version_invalidates_everything(self):
+        manifest = PartitionManifest(fingerprints={"2023": "a"}, polars_version="0.0.0")
+
+        assert manifest.changed_partitions({"2023": "a"}) == ["2023"]
+
+    def test_removed_partitions_keep_backfilled_ones(self):
+        manifest = PartitionManifest(
+            fingerprints={"2010": "a", "2023": "b", "2024": "c"}, backfilled=["2010"]
+        )
+
+        assert manifest.removed_partitions({"2024": "c"}) == ["2023"]
+
+    def test_round_trip(self):
+        manifest = PartitionManifest(source_etags={"raw": "etag"}, fingerprints={})
+
+        assert PartitionManifest.from_dict(manifest.to_dict()) == manifest
+        assert PartitionManifest.from_dict(None) == PartitionManifest()
+
+
+def test_compute_fingerprints_only_changes_for_modified_season():
+    modified = SOURCE.with_columns(
+        pl.when(pl.col("season") == 2024).then(121).otherwise("pts").alias("pts")
+    )
+
+    before = compute_fingerprints(SOURCE)
+    after = compute_fingerprints(modified)
+
+    assert before.keys() == {"2023", "2024"}
+    assert before["2023"] == after["2023"]
+    assert before["2024"] != after["2024"]
+
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+
+FINGERPRINT_SCRIPT = """
+import json, sys
+import polars as pl
+from config.partitions import compute_fingerprints
+
+# Categories seen first get the first physical codes of the process
+interned = pl.Series(sys.argv[1].split(","), dtype=pl.Categorical)
+source = pl.LazyFrame(
+    {"season": [2023, 2024], "team": ["A", "B"]},
+    schema_overrides={"team": pl.Categorical},
+)
+print(json.dumps(compute_fingerprints(source)))
+"""
+
+
+def test_compute_fingerprints_stable_across_processes():
+    fingerprints = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", FINGERPRINT_SCRIPT, interned],
+                capture_output=True,
+                check=True,
+                text=True,
+                env={"PYTHONPATH": str(SRC_DIR)},
+            ).stdout
+        )
+        for interned in ["A,B", "B,A"]
+    ]
+
+    assert fingerprints[0] == fingerprints[1]
+
+
+def test_sink_incremental_recomputes_changed_seasons(memory_bucket):
+    computed = []
+
+    output_path = run_incremental(SOURCE, computed)
+
+    # Unchanged raw objects: nothing is read nor recomputed
+    memory_bucket["etags"]["raw/games_detail.parquet"] = "etag-1"
+    run_incremental(SOURCE, computed)
+
+    # A new game in the 2024 season only recomputes that season
+    memory_bucket["etags"]["raw/games_detail.parquet"] = "etag-2"
+    new_game = pl.LazyFrame({"season": [2024], "game_id": [4], "pts": [99]})
+    run_incremental(pl.concat([SOURCE, new_game]), computed)
+
+    assert output_path == "memory://team_season_stats/**/*.parquet"
+    assert computed == [[2023, 2024], [2024]]
+    assert memory_bucket["sunk"][-1]["game_id"].to_list() == [3, 4]
+
+
+def test_record_partitions_kept_by_incremental_runs(memory_bucket):
+    computed = []
+    run_incremental(SOURCE, computed)
+
+    # A backfilled season, recorded with the fingerprint of its source rows
+    backfilled = pl.LazyFrame({"season": [2010], "game_id": [0], "pts": [90]})
+    record_partitions("team_season_stats", compute_fingerprints(backfilled))
+
+    manifest = memory_bucket["processed/team_season_stats/_manifest.json"]
+    assert sorted(manifest["fingerprints"]) == ["2010", "2023", "2024"]
+    assert manifest["source_etags"] == {"raw/games_detail.parquet": "etag-1"}
+
+    # Once the raw games change, the backfilled season is not recomputed
+    memory_bucket["etags"]["raw/games_detail.parquet"] = "etag-2"
+    new_game = pl.LazyFrame({"season": [2024], "game_id": [4], "pts": [99]})
+    run_incremental(pl.concat([backfilled, SOURCE, new_game]), computed)
+
+    assert computed == [[2023, 2024], [2024]]
+
+
+def test_sink_incremental_removes_seasons_gone_from_source(memory_bucket):
+    computed = []
+    run_incremental(SOURCE, computed)
+    backfilled = pl.LazyFrame({"season": [2010], "game_id": [0], "pts": [90]})
+    record_partitions("team_season_stats", compute_fingerprints(backfilled))
+
+    # The 2023 games are gone from the raw data
+    memory_bucket["etags"]["raw/games_detail.parquet"] = "etag-2"
+    run_incremental(SOURCE.filter(pl.col("season") == 2024), computed)
+
+    manifest = memory_bucket["processed/team_season_stats/_manifest.json"]
+    assert memory_bucket["removed"] == ["2023"]
+    assert sorted(manifest["fingerprints"]) == ["2010", "2024"]
+    assert manifest["backfilled"] == ["2010"]
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import pytest
+
+from config import task_cache
+from config.bucket import NBABucket
+from config.task_cache import (
+    RESULT_STORAGE_BLOCK,
+    STORAGE_MODULES,
+    code_version,
+    fingerprint,
+    result_storage,
+    source_cache_key,
+)
+
+CONTEXT = SimpleNamespace(task=SimpleNamespace(name="get_player_season_stats"))
+
+
+@pytest.fixture
+def etags(monkeypatch):
+    """ETag of each source object, editable by the tests."""
+    etags = {"raw/games.parquet": "etag-1"}
+    monkeypatch.setattr(task_cache.nba_bucket, "object_etag", etags.get)
+
+    return etags
+
+
+def cache_key(config: dict | None = None, **parameters) -> str:
+    key_fn = source_cache_key(
+        lambda: ["raw/games.parquet"],
+        ["games.schema"],
+        lambda: config or {"metrics": ["pts"]},
+    )
+    return key_fn(CONTEXT, parameters)
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_code_version():
+    assert code_version(["games.schema"]) == code_version(["games.schema"])
+    assert code_version(["games.schema"]) != code_version(["games.rolling"])
+
+
+class TestSourceCacheKey:
+    def test_stable_for_unchanged_inputs(self, etags):
+        assert cache_key(incremental=True) == cache_key(incremental=True)
+
+    def test_changed_by_source_etag(self, etags):
+        key = cache_key(incremental=True)
+        etags["raw/games.parquet"] = "etag-2"
+
+        assert cache_key(incremental=True) != key
+
+    def test_changed_by_parameters(self, etags):
+        assert cache_key(incremental=True) != cache_key(incremental=False)
+
+    def test_changed_by_config(self, etags):
+        assert cache_key({"metrics": ["pts"]}) != cache_key({"metrics": ["reb"]})
+
+    def test_changed_by_storage_code(self, etags, monkeypatch):
+        key = cache_key(incremental=True)
+        monkeypatch.setattr(
+            task_cache, "STORAGE_MODULES", [*STORAGE_MODULES, "games.rolling"]
+        )
+
+        assert cache_key(incremental=True) != key
+
+
+def test_result_storage_follows_backend(monkeypatch, tmp_path):
+    monkeypatch.setenv("NBA_STORAGE", "local")
+    monkeypatch.setenv("NBA_STORAGE_DIR", str(tmp_path))
+    monkeypatch.setattr(task_cache, "nba_bucket", NBABucket())
+
+    storage = result_storage()
+    # The bucket root is not created when the tasks are decorated
+    assert task_cache.nba_bucket._bucket_name is None
+    assert storage == tmp_path.resolve() / "results"
+
+    monkeypatch.setenv("NBA_STORAGE", "memory")
+    monkeypatch.setenv("NBA_MEMORY_STORAGE_DIR", str(tmp_path / "memory"))
+    monkeypatch.setattr(task_cache, "nba_bucket", NBABucket())
+
+    assert result_storage() == tmp_path / "memory" / "results"
+    assert not (tmp_path / "memory").exists()
+
+    monkeypatch.setenv("NBA_STORAGE", "s3")
+    monkeypatch.setattr(task_cache, "nba_bucket", NBABucket())
+
+    assert result_storage() == RESULT_STORAGE_BLOCK
@@ -0,0 +1,76 @@
+import polars as pl
+import pytest
+
+from games import facts
+from games.facts import sink_game_facts
+
+
+SOURCE = pl.LazyFrame(
+    {
+        "season": [2024, 2023, 2024, 2023],
+        "game_id": [4, 2, 3, 1],
+        "pts": [120, 110, 115, 100],
+    }
+)
+
+
+def build(seasons):
+    if seasons is None:
+        return SOURCE
+    return SOURCE.filter(pl.col("season").is_in(seasons))
+
+
+@pytest.fixture
+def local_sink(monkeypatch, tmp_path):
+    """Write the partitioned facts under a local directory."""
+
+    def mock_sink_partitioned(lf, output_key, partition_by):
+        lf.sink_parquet(
+            pl.PartitionByKey(tmp_path / output_key, by=partition_by, include_key=True),
+            mkdir=True,
+        )
+
+    monkeypatch.setattr(facts.nba_bucket, "sink_partitioned", mock_sink_partitioned)
+
+    return tmp_path
+
+
+def test_sink_game_facts_partitioned_and_sorted(local_sink):
+    facts_key = sink_game_facts(
+        build,
+        facts_key="facts/team_games",
+        game_id_column="game_id",
+        source=SOURCE,
+        source_keys=["raw/games_detail.parquet"],
+    )
+
+    assert facts_key == "facts/team_games"
+
+    season_2023 = pl.read_parquet(local_sink / facts_key / "season=2023" / "*.parquet")
+    season_2024 = pl.read_parquet(local_sink / facts_key / "season=2024" / "*.parquet")
+
+    assert season_2023["game_id"].to_list() == [1, 2]
+    assert season_2024["game_id"].to_list() == [3, 4]
+
+
+def test_sink_game_facts_incremental(monkeypatch):
+    calls = {}
+
+    def mock_sink_incremental(source, compute, output_key, source_keys):
+        calls.update(output_key=output_key, facts=compute([2024]).collect())
+        return f"memory://{output_key}/**/*.parquet"
+
+    monkeypatch.setattr(facts, "sink_incremental", mock_sink_incremental)
+
+    facts_key = sink_game_facts(
+        build,
+        facts_key="facts/team_games",
+        game_id_column="game_id",
+        source=SOURCE,
+        source_keys=["raw/games_detail.parquet"],
+        incremental=True,
+    )
+
+    assert facts_key == "facts/team_games"
+    assert calls["output_key"] == "facts/team_games"
+    assert calls["facts"]["game_id"].to_list() == [3, 4]
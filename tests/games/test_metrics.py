@@ -0,0 +1,62 @@
+import polars as pl
+import pytest
+
+from games.metrics import (
+    SeasonMetric,
+    available_metrics,
+    safe_divide,
+    season_aggregations,
+)
+
+FG_PCT = SeasonMetric("FG%", pl.col("FGM"), pl.col("FGA"), decimals=3)
+
+GAMES = pl.LazyFrame(
+    {
+        "personId": [1, 1, 2],
+        "FGM": [1, 9, 0],
+        "FGA": [2, 10, 0],
+        "PTS": [2, 20, 0],
+    }
+)
+
+
+def test_safe_divide_returns_null_on_zero():
+    result = pl.select(
+        safe_divide(pl.Series([1.0, 1.0, 1.0]), pl.Series([2.0, 0.0, None]))
+    )
+
+    assert result.to_series().to_list() == [0.5, None, None]
+
+
+def test_ratio_of_season_sums():
+    result = GAMES.group_by("personId").agg(FG_PCT.agg()).sort("personId").collect()
+
+    # 10/12 over the season, where the mean of the game ratios is 0.7
+    assert result["FG%"].to_list() == [pytest.approx(0.833), None]
+
+
+def test_average_and_scale():
+    per_game = SeasonMetric("PTS100", pl.col("PTS"), scale=100)
+
+    result = GAMES.group_by("personId").agg(per_game.agg()).sort("personId").collect()
+
+    assert result["PTS100"].to_list() == [1100.0, 0.0]
+
+
+def test_available_metrics():
+    assert FG_PCT.inputs == {"FGM", "FGA"}
+    assert available_metrics([FG_PCT], {"FGM", "FGA", "PTS"}) == {"FG%": FG_PCT}
+    assert available_metrics([FG_PCT], {"FGM", "PTS"}) == {}
+
+
+def test_season_aggregations_in_a_single_pass():
+    efg = SeasonMetric("eFG%", pl.col("FGM"), pl.col("FGA"))
+    aggregations = season_aggregations(
+        ["PTS", "FG%"], {"FG%": FG_PCT, "eFG%": efg}, decimals=1
+    )
+
+    result = GAMES.filter(pl.col("personId") == 1).select(aggregations).collect()
+
+    # Averaged columns keep their place, declared as a season metric or not
+    assert result.columns == ["PTS", "FG%", "eFG%"]
+    assert result.row(0) == (11.0, pytest.approx(0.833), pytest.approx(10 / 12))
@@ -0,0 +1,34 @@
+import datetime as datetime
+import polars as pl
+
+from src.games.raw import parse_datetime, type_raw_dates
+
+
+def test_parse_datetime_from_string() -> None:
+    lf = pl.LazyFrame({"gameDate": ["2023-10-01", "2013-01-01"]})
+
+    result = lf.select(parse_datetime(lf, "gameDate")).collect()
+
+    assert result["gameDate"].to_list() == [
+        datetime.datetime(2023, 10, 1),
+        datetime.datetime(2013, 1, 1),
+    ]
+
+
+def test_parse_datetime_keeps_typed_column() -> None:
+    lf = pl.LazyFrame({"gameDate": [datetime.datetime(2023, 10, 1)]})
+
+    assert str(parse_datetime(lf, "gameDate")) == str(
+        pl.col("gameDate").cast(pl.Datetime("us"))
+    )
+
+
+def test_type_raw_dates_sorts_chronologically() -> None:
+    lf = pl.LazyFrame(
+        {"gameId": [1, 2, 3], "gameDate": ["2023-10-01", "2013-01-01", "2018-05-02"]}
+    )
+
+    result = type_raw_dates(lf, "gameDate").collect()
+
+    assert result.schema["gameDate"] == pl.Datetime("us")
+    assert result["gameId"].to_list() == [2, 3, 1]
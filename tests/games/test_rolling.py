@@ -0,0 +1,68 @@
+import datetime as datetime
+import polars as pl
+
+from polars.testing import assert_frame_equal
+from src.games.rolling import RollingStatsProcessor
+
+
+TEAM_FACTS = pl.LazyFrame(
+    {
+        "team": ["A", "A", "A", "A", "B", "B"],
+        "season": [2024, 2024, 2024, 2024, 2024, 2025],
+        # Unsorted games, ordered by their date
+        "game_id": [4, 1, 3, 2, 5, 6],
+        "game_date": [
+            datetime.datetime(2024, 1, 4),
+            datetime.datetime(2024, 1, 1),
+            datetime.datetime(2024, 1, 3),
+            datetime.datetime(2024, 1, 2),
+            datetime.datetime(2024, 1, 5),
+            datetime.datetime(2025, 1, 6),
+        ],
+        "win_loss": ["W", "W", "L", "W", "L", "L"],
+        "pts": [40.0, 10.0, 30.0, 20.0, 50.0, 60.0],
+    }
+)
+
+
+def test_compute_rolling_stats() -> None:
+    processor = RollingStatsProcessor(
+        keys=["team"],
+        metrics=["pts"],
+        windows=[2],
+        date_column="game_date",
+        game_id_column="game_id",
+        win_loss_column="win_loss",
+    )
+
+    result = processor.compute_rolling_stats(TEAM_FACTS).collect()
+
+    expected = pl.DataFrame(
+        {
+            "team": ["A", "A", "A", "A", "B", "B"],
+            "season": [2024, 2024, 2024, 2024, 2024, 2025],
+            "game_id": [1, 2, 3, 4, 5, 6],
+            "game_number": [1, 2, 3, 4, 1, 1],
+            "pts_last2": [10.0, 15.0, 25.0, 35.0, 50.0, 60.0],
+            "pts_season_to_date": [10.0, 15.0, 20.0, 25.0, 50.0, 60.0],
+            "streak": [1, 2, -1, 1, -1, -1],
+        }
+    )
+
+    assert_frame_equal(result.select(expected.columns), expected, check_dtypes=False)
+
+
+def test_compute_rolling_stats_without_streak() -> None:
+    processor = RollingStatsProcessor(
+        keys=["team"],
+        metrics=["pts"],
+        windows=[1, 3],
+        date_column="game_date",
+        game_id_column="game_id",
+    )
+
+    result = processor.compute_rolling_stats(TEAM_FACTS).collect()
+
+    assert "streak" not in result.columns
+    assert result["pts_last1"].to_list() == result["pts"].to_list()
+    assert result.filter(pl.col("game_id") == 4)["pts_last3"].item() == 30.0
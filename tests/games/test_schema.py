@@ -0,0 +1,42 @@
+import polars as pl
+
+from src.games.schema import apply_schema, game_dtypes, season_dtypes
+
+
+def test_game_dtypes():
+    dtypes = game_dtypes(["PTS", "FG%"], count_metrics={"PTS"})
+
+    assert dtypes["PTS"] == pl.Int16
+    assert dtypes["FG%"] == pl.Float32
+    assert dtypes["team"] == pl.Categorical
+    assert dtypes["win_loss"] == pl.Enum(["W", "L"])
+
+
+def test_season_dtypes():
+    dtypes = season_dtypes(["PTS"], counts=["GP"])
+
+    assert dtypes["GP"] == pl.Int16
+    assert dtypes["PTS"] == pl.Float32
+
+
+def test_apply_schema():
+    lf = pl.LazyFrame(
+        {
+            "team": ["BOS", "LAL"],
+            "win_loss": ["W", "L"],
+            "PTS": [110, 98],
+            "other": [1.5, 2.5],
+        }
+    )
+
+    result = apply_schema(lf, game_dtypes(["PTS", "REB"], {"PTS", "REB"})).collect()
+
+    assert result.schema == pl.Schema(
+        {
+            "team": pl.Categorical(),
+            "win_loss": pl.Enum(["W", "L"]),
+            "PTS": pl.Int16(),
+            "other": pl.Float64(),
+        }
+    )
+    assert result["team"].to_list() == ["BOS", "LAL"]
@@ -0,0 +1,61 @@
+import datetime as datetime
+import polars as pl
+
+from polars.testing import assert_frame_equal
+from src.games.scope import (
+    prepare_games_scope,
+    build_games_scope,
+    scan_games_scope,
+    get_game_id_season,
+)
+
+
+GAMES_DETAIL = pl.LazyFrame(
+    {
+        "game_id": [1, 2, 3],
+        "season_id": [22023, 22023, 22022],
+        "season_type": ["Regular Season", "Regular Season", "Playoffs"],
+        "game_date": ["2023-10-24", "2024-01-15", "2023-05-02"],
+    }
+)
+
+
+def test_prepare_games_scope() -> None:
+    result = prepare_games_scope(GAMES_DETAIL).collect()
+
+    expected = pl.DataFrame(
+        {
+            "game_id": [1, 2, 3],
+            "season_id": [22023, 22023, 22022],
+            "season_type": ["Regular Season", "Regular Season", "Playoffs"],
+            "game_date": [
+                datetime.datetime(2023, 10, 24),
+                datetime.datetime(2024, 1, 15),
+                datetime.datetime(2023, 5, 2),
+            ],
+            "year": [2023, 2024, 2023],
+            "season": [2024, 2024, 2023],
+        }
+    )
+
+    assert_frame_equal(result, expected, check_dtypes=False)
+
+
+def test_build_games_scope_is_read_once(monkeypatch, tmp_path) -> None:
+    scanned_paths = []
+
+    def mock_scan_parquet(filepath):
+        scanned_paths.append(filepath)
+        return GAMES_DETAIL
+
+    monkeypatch.setattr("config.bucket.nba_bucket.scan_parquet", mock_scan_parquet)
+
+    scope_path = build_games_scope(str(tmp_path / "games_scope.arrow"))
+
+    games_scope = scan_games_scope(scope_path)
+    game_id_season = get_game_id_season(games_scope).collect()
+    full_scope = games_scope.collect()
+
+    assert scanned_paths == ["raw/games_detail.parquet"]
+    assert full_scope.schema["game_date"] == pl.Datetime("us")
+    assert game_id_season.sort("game_id")["season"].to_list() == [2024, 2024, 2023]
@@ -1,3 +1,4 @@
+import datetime as datetime
 import polars as pl
 
 from polars.testing import assert_frame_equal
@@ -41,6 +42,7 @@ class TestPlayerSeasonProcessor:
     def test_compute_season_avg(self):
         mock_metrics = {"points": "PTS", "rebounds": "REB"}
 
+        # Player game facts, already tagged with their season
         players_stats = pl.LazyFrame(
             {
                 "gameId": [1, 2],
@@ -54,16 +56,8 @@ class TestPlayerSeasonProcessor:
             }
         )
 
-        scope_game_ids = pl.LazyFrame(
-            {
-                "game_id": [1, 2],
-                "season_id": [1, 1],
-                "game_date": ["2023-10-01", "2023-10-02"],
-            }
-        )
-
         processor = PlayerSeasonProcessor(metrics=mock_metrics)
-        result = processor.compute_season_avg(players_stats, scope_game_ids).collect()
+        result = processor.compute_season_avg(players_stats).collect()
 
         expected = pl.DataFrame(
             {
@@ -115,7 +109,7 @@ class TestPlayerSeasonProcessor:
             {
                 "game_id": [1, 2, 3, 4],
                 "season_id": [1, 1, 1, 1],
-                "game_date": ["2023-10-01", "2023-01-01", "2023-10-21", "2023-12-01"],
+                "season": [2023, 2023, 2023, 2023],
             }
         )
 
@@ -132,7 +126,9 @@ class TestPlayerSeasonProcessor:
                 "FGA": [9.0, 11.0],
                 "FTA": [2.0, 2.0],
                 "TSA": [9.9, 11.9],
-                "TS%": [1.0, 0.6],
+                # Ratios of the season totals, not averages of the per-game ratios
+                "TS%": [1.012, 0.631],
+                "FTr": [0.222, 0.182],
             }
         )
 
@@ -148,3 +144,169 @@ class TestPlayerSeasonProcessor:
             check_row_order=False,
             check_dtypes=False,
         )
+        assert result.schema["lastName"] == pl.Categorical
+        assert result.schema["GP"] == pl.Int16
+        assert result.schema["PTS"] == pl.Float32
+
+    def test_run_restricted_to_seasons(self):
+        game_stats = pl.LazyFrame(
+            {
+                "gameId": [1, 2],
+                "gameDate": ["2023-01-01", "2024-01-01"],
+                "firstName": ["John", "John"],
+                "lastName": ["Doe", "Doe"],
+                "personId": [101, 101],
+                "gameType": ["Regular", "Regular"],
+                "points": [10, 20],
+                "fieldGoalsAttempted": [10, 12],
+                "freeThrowsAttempted": [2, 2],
+            }
+        )
+        scope_game_ids = pl.LazyFrame(
+            {"game_id": [1, 2], "season_id": [1, 2], "season": [2023, 2024]}
+        )
+
+        processor = PlayerSeasonProcessor(metrics={"points": "PTS"})
+        result = processor.run(game_stats, scope_game_ids, seasons=[2024]).collect()
+
+        assert result["season"].to_list() == [2024]
+        assert result["PTS"].to_list() == [20.0]
+
+    def test_run_first_season_complete(self):
+        # The 2014 season started before the first game date of the 2015 season
+        game_stats = pl.LazyFrame(
+            {
+                "gameId": [1, 2, 3, 4],
+                "gameDate": ["2013-11-01", "2014-03-01", "2014-11-01", "2015-04-01"],
+                "firstName": ["John"] * 4,
+                "lastName": ["Doe"] * 4,
+                "personId": [101] * 4,
+                "gameType": ["Regular"] * 4,
+                "points": [10, 20, 30, 40],
+                "fieldGoalsAttempted": [10, 12, 14, 16],
+                "freeThrowsAttempted": [2, 2, 2, 2],
+            }
+        )
+        scope_game_ids = pl.LazyFrame(
+            {
+                "game_id": [1, 2, 3, 4],
+                "season_id": [1, 1, 2, 2],
+                "season": [2014, 2014, 2015, 2015],
+            }
+        )
+
+        processor = PlayerSeasonProcessor(metrics={"points": "PTS"})
+        result = processor.run(game_stats, scope_game_ids).collect()
+
+        # No truncated 2014 season made of its games dated 2014 only
+        assert result["season"].to_list() == [2015]
+        assert result["GP"].to_list() == [2]
+        assert result["PTS"].to_list() == [35.0]
+
+    def test_filter_and_rename_typed_dates(self):
+        game_stats = pl.LazyFrame(
+            {
+                "gameId": [1, 2],
+                "gameDate": [
+                    datetime.datetime(2013, 4, 1),
+                    datetime.datetime(2015, 1, 1),
+                ],
+                "firstName": ["John", "John"],
+                "lastName": ["Doe", "Doe"],
+                "personId": [101, 101],
+                "gameType": ["Regular", "Regular"],
+                "points": [10, 20],
+                "playerteamCity": ["Boston", "Boston"],
+            }
+        )
+
+        processor = PlayerSeasonProcessor(metrics={"points": "PTS"})
+        result = processor.filter_and_rename(game_stats).collect()
+
+        assert result.columns == [
+            "gameId",
+            "gameDate",
+            "firstName",
+            "lastName",
+            "personId",
+            "gameType",
+            "PTS",
+        ]
+        assert result["gameId"].to_list() == [2]
+
+        # A backfill of older seasons moves the minimum game date back
+        processor = PlayerSeasonProcessor(metrics={"points": "PTS"}, min_season=2013)
+        result = processor.filter_and_rename(game_stats).collect()
+
+        assert result["gameId"].to_list() == [1, 2]
+
+        # A single season backfill leaves the newer games out
+        processor = PlayerSeasonProcessor(
+            metrics={"points": "PTS"}, min_season=2013, max_season=2013
+        )
+        result = processor.filter_and_rename(game_stats).collect()
+
+        assert result["gameId"].to_list() == [1]
+
+    def test_plan_chunks(self):
+        player_facts = pl.LazyFrame(
+            {
+                "season": [2022] * 10 + [2023] * 2,
+                "personId": list(range(12)),
+            }
+        )
+
+        processor = PlayerSeasonProcessor(metrics={})
+
+        assert processor.plan_chunks(player_facts, 10**9) == {2022: 1, 2023: 1}
+        # 32 bytes per row: 320 bytes for 2022 and 64 bytes for 2023
+        assert processor.plan_chunks(player_facts, 100) == {2022: 4, 2023: 1}
+
+    def test_compute_season_avg_out_of_core(self, tmp_path):
+        mock_metrics = {"points": "PTS"}
+
+        player_facts = pl.LazyFrame(
+            {
+                "gameId": [1, 1, 2, 2, 3, 3, 4],
+                "season": [2022, 2022, 2022, 2022, 2023, 2023, 2023],
+                "firstName": ["John", "Jane", "John", "Jane", "John", "Jim", "Jim"],
+                "lastName": ["Doe"] * 7,
+                "personId": [101, 102, 101, 102, 101, 103, 103],
+                "gameType": ["Regular"] * 7,
+                "PTS": [10, 5, 20, 7, 30, 2, 4],
+            }
+        )
+
+        processor = PlayerSeasonProcessor(metrics=mock_metrics)
+        expected = processor.compute_season_avg(player_facts).collect()
+
+        # A ceiling small enough to split every season in personId buckets
+        result = processor.compute_season_avg_out_of_core(
+            player_facts, tmp_path / "spill", memory_limit_bytes=100
+        ).collect()
+
+        assert len(list((tmp_path / "spill" / "stats").glob("*.parquet"))) > 2
+        assert_frame_equal(result, expected, check_row_order=False)
+
+    def test_compute_season_avg_out_of_core_without_facts(self, tmp_path):
+        player_facts = pl.LazyFrame(
+            schema={
+                "gameId": pl.Int64,
+                "season": pl.Int32,
+                "firstName": pl.String,
+                "lastName": pl.String,
+                "personId": pl.Int64,
+                "gameType": pl.String,
+                "PTS": pl.Int64,
+            }
+        )
+
+        processor = PlayerSeasonProcessor(metrics={"points": "PTS"})
+        expected = processor.compute_season_avg(player_facts).collect()
+
+        result = processor.compute_season_avg_out_of_core(
+            player_facts, tmp_path / "spill", memory_limit_bytes=100
+        ).collect()
+
+        assert result.is_empty()
+        assert result.schema == expected.schema
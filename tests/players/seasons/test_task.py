@@ -1,7 +1,15 @@
 import polars as pl
+import pytest
 
+from datetime import datetime
 from polars.testing import assert_frame_equal
-from src.players.seasons.task import get_player_season_stats
+from src.players.seasons.processor import MIN_GAME_DATE
+from src.players.seasons.task import (
+    collect_player_season_stats,
+    get_player_season_stats,
+    player_stats_source_key,
+    scan_player_stats,
+)
 
 
 def test_get_player_season_stats(monkeypatch):
@@ -44,7 +52,9 @@ def test_get_player_season_stats(monkeypatch):
             "FGA": [9.0, 11.0],
             "FTA": [2.0, 2.0],
             "TSA": [9.9, 11.9],
-            "TS%": [1.0, 0.6],
+            # Ratios of the season totals, not averages of the per-game ratios
+            "TS%": [1.012, 0.631],
+            "FTr": [0.222, 0.182],
         }
     )
 
@@ -78,3 +88,73 @@ def test_get_player_season_stats(monkeypatch):
         check_row_order=False,
         check_dtypes=False,
     )
+
+
+@pytest.mark.parametrize("memory_limit_bytes", [None, 100])
+def test_collect_player_season_stats_from_facts(monkeypatch, memory_limit_bytes):
+    player_facts = pl.LazyFrame(
+        {
+            "gameId": [1, 2, 3],
+            "season": [2023, 2023, 2024],
+            "firstName": ["John", "John", "John"],
+            "lastName": ["Doe", "Doe", "Doe"],
+            "personId": [101, 101, 101],
+            "gameType": ["Regular", "Regular", "Regular"],
+            "PTS": [10.0, 20.0, 30.0],
+        }
+    )
+
+    scanned = []
+
+    def mock_scan_partitioned(output_key):
+        scanned.append(output_key)
+        return player_facts
+
+    monkeypatch.setattr(
+        "config.bucket.nba_bucket.scan_partitioned", mock_scan_partitioned
+    )
+    monkeypatch.setattr("src.players.seasons.task.PLAYERS_METRICS", {"points": "PTS"})
+
+    result = collect_player_season_stats.fn("facts/player_games", memory_limit_bytes)
+
+    assert scanned == ["facts/player_games"]
+    assert_frame_equal(
+        result.sort("season"),
+        pl.DataFrame(
+            {
+                "season": [2023, 2024],
+                "firstName": ["John", "John"],
+                "lastName": ["Doe", "Doe"],
+                "personId": [101, 101],
+                "gameType": ["Regular", "Regular"],
+                "GP": [2, 1],
+                "PTS": [15.0, 30.0],
+            }
+        ),
+        check_dtypes=False,
+    )
+
+
+def test_scan_player_stats_from_manifest(monkeypatch):
+    scanned = {}
+
+    def mock_scan_manifest(prefix, bounds):
+        scanned.update(prefix=prefix, bounds=bounds)
+        return pl.LazyFrame({"gameId": [1]})
+
+    monkeypatch.setattr("config.bucket_conf.raw.player_stats", "raw/player_stats")
+    monkeypatch.setattr("config.bucket.nba_bucket.scan_manifest", mock_scan_manifest)
+
+    scan_player_stats()
+
+    assert scanned == {
+        "prefix": "raw/player_stats",
+        "bounds": {"gameDate": (MIN_GAME_DATE, None)},
+    }
+
+    scan_player_stats(datetime(2013, 1, 1), datetime(2015, 1, 1))
+
+    assert scanned["bounds"] == {
+        "gameDate": (datetime(2013, 1, 1), datetime(2015, 1, 1))
+    }
+    assert player_stats_source_key() == "raw/player_stats/_manifest.json"
@@ -0,0 +1,90 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from teams.ratings import compute_head_to_head, compute_team_ratings, solve_ratings
+
+
+def game_rows(games: list[tuple]) -> pl.LazyFrame:
+    """Team facts of games (season, type, home, away, home pts, away pts), a row per
+    team perspective."""
+    rows = []
+    for game_id, (season, season_type, home, away, home_pts, away_pts) in enumerate(
+        games
+    ):
+        for team, opponent, team_pts, opponent_pts in [
+            (home, away, home_pts, away_pts),
+            (away, home, away_pts, home_pts),
+        ]:
+            rows.append(
+                {
+                    "game_id": game_id,
+                    "season": season,
+                    "season_type": season_type,
+                    "team": team,
+                    "team_name": f"Team {team}",
+                    "opponent": opponent,
+                    "win_loss": "W" if team_pts > opponent_pts else "L",
+                    "team_pts": team_pts,
+                    "opponent_pts": opponent_pts,
+                }
+            )
+
+    return pl.LazyFrame(rows)
+
+
+GAMES = game_rows(
+    [
+        (2024, "Regular Season", "A", "B", 110, 100),
+        (2024, "Regular Season", "B", "C", 100, 90),
+        (2024, "Regular Season", "A", "B", 95, 105),
+        (2024, "Playoffs", "C", "A", 120, 80),
+        (2025, "Regular Season", "C", "A", 100, 98),
+    ]
+)
+
+
+def test_solve_ratings():
+    # A beat B by 10, B beat C by 10: a team 10 points better than the next one
+    team = np.array([0, 1, 1, 2])
+    opponent = np.array([1, 0, 2, 1])
+    margin = np.array([10.0, -10.0, 10.0, -10.0])
+
+    games, mov, sos, srs = solve_ratings(team, opponent, margin)
+
+    assert games.tolist() == [1, 2, 1]
+    assert mov.tolist() == [10.0, 0.0, -10.0]
+    assert srs == pytest.approx([10.0, 0.0, -10.0])
+    assert sos == pytest.approx([0.0, 0.0, 0.0])
+
+
+def test_compute_team_ratings():
+    result = compute_team_ratings(GAMES).sort("season", "team").collect()
+
+    assert result["season"].to_list() == [2024, 2024, 2024, 2025, 2025]
+    assert result["team"].cast(pl.String).to_list() == ["A", "B", "C", "A", "C"]
+    assert result["team_name"].to_list()[0] == "Team A"
+    # The playoff game is left out: A and B split their games, B beat C by 10
+    assert result["games"].to_list() == [2, 3, 1, 1, 1]
+    assert result["srs"].to_list()[:3] == pytest.approx(
+        [10 / 3, 10 / 3, -20 / 3], rel=1e-6
+    )
+    assert (
+        result.group_by("season").agg(pl.sum("srs"))["srs"].to_list()
+        == [pytest.approx(0.0, abs=1e-5)] * 2
+    )
+
+
+def test_compute_head_to_head():
+    result = (
+        compute_head_to_head(GAMES)
+        .filter((pl.col("season") == 2024) & (pl.col("team") == "A"))
+        .sort("season_type")
+        .collect()
+    )
+
+    assert result["opponent"].cast(pl.String).to_list() == ["C", "B"]
+    assert result["games"].to_list() == [1, 2]
+    assert result["wins"].to_list() == [0, 1]
+    assert result["losses"].to_list() == [1, 1]
+    assert result["point_diff"].to_list() == [-40.0, 0.0]
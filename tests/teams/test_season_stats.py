@@ -6,12 +6,12 @@ import polars as pl
 from polars.testing import assert_frame_equal
 
 from src.teams.season_stats import (
-    get_transformed_games,
-    create_full_games,
+    get_full_games,
     compute_team_season_stats,
+    collect_team_season_stats,
     get_team_season_stats,
 )
-from src.teams import season_stats
+from src.teams import TEAM_METRICS, season_stats
 
 
 @pytest.fixture
@@ -27,7 +27,15 @@ def mock_team_config_map(monkeypatch):
                 },
                 "team_metrics": {"pts_home": "team_pts"},
                 "opponent_metrics": {"pts_away": "opponent_pts"},
-            }
+            },
+            "away": {
+                "renaming": {
+                    "team_abbreviation_away": "team",
+                    "team_name_away": "team_name",
+                },
+                "team_metrics": {"pts_away": "team_pts"},
+                "opponent_metrics": {"pts_home": "opponent_pts"},
+            },
         },
     )
 
@@ -37,55 +45,82 @@ def mock_team_metrics(monkeypatch):
     monkeypatch.setattr(season_stats, "TEAM_METRICS", value=["pts", "reb"])
 
 
-def test_get_transformed_games_home(mock_team_config_map) -> None:
+def test_get_full_games(mock_team_config_map) -> None:
     games_details = pl.LazyFrame(
         {
             "game_id": [1, 2],
             "season_id": [2023, 2023],
             "season_type": ["Regular Season", "Pre Season"],
-            "game_date": ["2023-01-01", "2023-01-02"],
+            "game_date": [
+                datetime.datetime(2023, 1, 1),
+                datetime.datetime(2023, 1, 2),
+            ],
+            "season": [2023, 2023],
             "team_abbreviation_home": ["TeamA", "TeamB"],
             "team_name_home": ["Team A", "Team B"],
+            "team_abbreviation_away": ["TeamC", "TeamD"],
+            "team_name_away": ["Team C", "Team D"],
             "pts_home": [100, 110],
             "pts_away": [90, 105],
         }
     )
 
-    result = get_transformed_games(games_details, "home").collect()
+    result = get_full_games(games_details).collect()
 
+    # The home then the away perspective of the game, without the pre season
     expected = pl.DataFrame(
         {
-            "game_id": [1],
-            "season_id": [2023],
-            "season_type": ["Regular Season"],
-            "game_date": [datetime.datetime(2023, 1, 1)],
-            "game_location": ["home"],
-            "team": ["TeamA"],
-            "team_name": ["Team A"],
-            "team_pts": [100],
-            "opponent_pts": [90],
+            "game_id": [1, 1],
+            "season_id": [2023, 2023],
+            "season_type": ["Regular Season", "Regular Season"],
+            "game_date": [datetime.datetime(2023, 1, 1)] * 2,
+            "season": [2023, 2023],
+            "game_location": ["home", "away"],
+            "team": ["TeamA", "TeamC"],
+            "team_name": ["Team A", "Team C"],
+            "team_pts": [100, 90],
+            "opponent_pts": [90, 100],
         }
     )
 
     assert_frame_equal(result, expected, check_dtypes=False)
 
 
-def test_create_full_games() -> None:
-    home_games = pl.LazyFrame({"game_id": [1], "season_id": [1], "location": "home"})
-    away_games = pl.LazyFrame({"game_id": [2], "season_id": [2], "location": "away"})
-    games_detail = pl.LazyFrame(
-        {"season_id": [1, 2], "game_date": ["2023-01-01", "2001-01-01"]}
+def test_get_full_games_from_min_season() -> None:
+    games_details = pl.LazyFrame(
+        {
+            "game_id": [1, 2, 3],
+            "season_id": [2023, 2023, 2014],
+            "season_type": ["Regular Season", "Playoffs", "Regular Season"],
+            "game_date": [
+                datetime.datetime(2023, 1, 1),
+                datetime.datetime(2023, 5, 2),
+                datetime.datetime(2014, 1, 2),
+            ],
+            "season": [2023, 2023, 2014],
+            "wl_home": ["W", "L", "L"],
+            "wl_away": ["L", "W", "W"],
+            "team_abbreviation_home": ["A", "A", "B"],
+            "team_name_home": ["Alpha", "Alpha", "Beta"],
+            "team_abbreviation_away": ["B", "B", "A"],
+            "team_name_away": ["Beta", "Beta", "Alpha"],
+            **{
+                f"{metric}_{location}": [10, 20, 30]
+                for metric in TEAM_METRICS
+                for location in ["home", "away"]
+            },
+        }
     )
 
-    expected = pl.DataFrame(
-        {"game_id": [1], "season_id": [1], "location": ["home"], "season": [2023]}
-    )
+    result = get_full_games(games_details).collect()
 
-    result = create_full_games(
-        home_games=home_games, away_games=away_games, games_detail=games_detail
-    )
+    assert result["game_id"].to_list() == [1, 2, 1, 2]
+    assert result["win_loss"].to_list() == ["W", "L", "L", "W"]
+    assert result.schema["team_pts"] == pl.Int16
 
-    assert_frame_equal(result.collect(), expected, check_dtypes=False)
+    result = get_full_games(games_details, min_season=2014).collect()
+
+    assert result["game_id"].to_list() == [1, 2, 3, 1, 2, 3]
 
 
 def test_compute_team_season_stats(mock_team_metrics) -> None:
@@ -198,3 +233,73 @@ def test_get_team_season_stats(monkeypatch):
     df = pl.read_parquet(str(output_path))
     assert "team" in df.columns
     assert "team_pts" in df.columns
+
+
+def test_collect_team_season_stats_from_facts(monkeypatch, mock_team_metrics):
+    team_facts = pl.LazyFrame(
+        {
+            "season_id": [2023, 2023],
+            "team": ["A", "B"],
+            "team_name": ["Alpha", "Beta"],
+            "season": [2023, 2023],
+            "game_id": [1, 1],
+            "win_loss": ["W", "L"],
+            "team_pts": [100.0, 90.0],
+            "team_reb": [50.0, 45.0],
+            "opponent_pts": [90.0, 100.0],
+            "opponent_reb": [45.0, 50.0],
+        }
+    )
+
+    monkeypatch.setattr(
+        "config.bucket.nba_bucket.scan_partitioned",
+        lambda output_key: team_facts if output_key == "facts/team_games" else None,
+    )
+
+    result = collect_team_season_stats.fn("facts/team_games").sort("team")
+
+    assert result["team"].to_list() == ["A", "B"]
+    assert result["wins"].to_list() == [1, 0]
+    assert result["team_pts"].to_list() == [100.0, 90.0]
+
+
+def test_compute_team_season_stats_ratings(monkeypatch) -> None:
+    box_scores = {
+        "fgm": [40, 30],
+        "fga": [80, 100],
+        "fg3m": [10, 10],
+        "fg3a": [30, 30],
+        "ftm": [10, 10],
+        "fta": [25, 25],
+        "oreb": [10, 10],
+        "tov": [10, 10],
+    }
+    full_games = pl.LazyFrame(
+        {
+            "season_id": [2023, 2023],
+            "team": ["A", "A"],
+            "team_name": ["Alpha", "Alpha"],
+            "season": [2023, 2023],
+            "game_id": [1, 2],
+            "win_loss": ["W", "L"],
+            "team_pts": [100, 80],
+            "opponent_pts": [90, 100],
+            **{
+                f"{side}_{metric}": values
+                for side in ["team", "opponent"]
+                for metric, values in box_scores.items()
+            },
+        }
+    )
+
+    monkeypatch.setattr(season_stats, "TEAM_METRICS", ["pts", *box_scores])
+
+    result = compute_team_season_stats(full_games).collect()
+
+    # 70 made of 180 attempted over the season, not the mean of 0.5 and 0.3
+    assert result["team_fg_pct"].item() == pytest.approx(70 / 180, rel=1e-6)
+    # 91 then 111 possessions: 180 points scored and 190 allowed in 202
+    assert result["possessions"].item() == pytest.approx(101, rel=1e-6)
+    assert result["off_rating"].item() == pytest.approx(100 * 180 / 202, rel=1e-6)
+    assert result["def_rating"].item() == pytest.approx(100 * 190 / 202, rel=1e-6)
+    assert result["net_rating"].item() == pytest.approx(-100 * 10 / 202, rel=1e-6)
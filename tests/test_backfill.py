@@ -0,0 +1,111 @@
+import polars as pl
+import pytest
+
+from datetime import datetime
+
+import backfill
+from backfill import backfill_season, merge_fingerprints
+from benchmarks.synthetic import write_synthetic_dataset
+from config import bucket, bucket_conf
+from config.bucket import StorageBackend
+from players.seasons.task import get_player_game_facts
+from teams.season_stats import get_team_game_facts
+
+
+@pytest.fixture
+def synthetic_bucket(monkeypatch, tmp_path):
+    """Local bucket seeded with the raw inputs of the 2014 and 2015 seasons."""
+    monkeypatch.setattr(bucket.nba_bucket, "backend", StorageBackend.LOCAL)
+    monkeypatch.setattr(bucket.nba_bucket, "_bucket_name", str(tmp_path / "bucket"))
+    monkeypatch.setattr(bucket.nba_bucket, "_fs", None)
+    monkeypatch.setattr(bucket.nba_bucket, "_arrow_fs", None)
+
+    inputs = write_synthetic_dataset(
+        str(tmp_path / "synthetic"),
+        n_seasons=2,
+        games_per_season=20,
+        players_per_team=2,
+        last_season=2015,
+    )
+    for input_name, raw_key in [
+        ("games_detail", bucket_conf.raw.games_detail),
+        ("player_stats", bucket_conf.raw.player_stats),
+    ]:
+        raw_path = tmp_path / "bucket" / raw_key
+        raw_path.parent.mkdir(parents=True, exist_ok=True)
+        pl.scan_parquet(inputs[input_name]).sink_parquet(raw_path)
+
+    return bucket.nba_bucket
+
+
+def test_backfill_season_writes_season_partitions(synthetic_bucket):
+    fingerprints = backfill_season.fn(2014)
+
+    facts_keys = [bucket_conf.facts.player_games, bucket_conf.facts.team_games]
+    output_keys = [
+        output.partitioned_key for output in vars(bucket_conf.processed).values()
+    ]
+    assert sorted(fingerprints) == sorted([*facts_keys, *output_keys])
+
+    for output_key in [*facts_keys, *output_keys]:
+        seasons = (
+            synthetic_bucket.scan_partitioned(output_key)
+            .select(pl.col("season").unique())
+            .collect()
+        )
+        # Older than the first season of the regular flow, the other season unread
+        assert seasons["season"].to_list() == [2014]
+        assert list(fingerprints[output_key]) == ["2014"]
+
+
+def test_backfill_season_scans_its_own_games(synthetic_bucket, monkeypatch):
+    scanned = []
+
+    def scan_player_stats(*bounds):
+        scanned.append(bounds)
+        return original_scan(*bounds)
+
+    original_scan = backfill.scan_player_stats
+    monkeypatch.setattr(backfill, "scan_player_stats", scan_player_stats)
+
+    backfill_season.fn(2014)
+
+    # From the end of the 2013 season to the end of the 2014 season, not later
+    assert scanned == [(datetime(2013, 1, 1), datetime(2015, 1, 1))]
+
+
+def season_rows(output_key: str) -> dict[int, int]:
+    rows = (
+        bucket.nba_bucket.scan_partitioned(output_key)
+        .group_by("season")
+        .len()
+        .collect()
+    )
+    return dict(rows.iter_rows())
+
+
+def test_full_run_keeps_backfilled_seasons(synthetic_bucket):
+    facts_keys = [bucket_conf.facts.player_games, bucket_conf.facts.team_games]
+    backfill_season.fn(2014)
+    backfilled = {facts_key: season_rows(facts_key) for facts_key in facts_keys}
+
+    get_player_game_facts.fn()
+    get_team_game_facts.fn()
+
+    for facts_key in facts_keys:
+        rows = season_rows(facts_key)
+        # The regular flow starts at 2015, it leaves the backfilled season as is
+        assert sorted(rows) == [2014, 2015]
+        assert rows[2014] == backfilled[facts_key][2014]
+
+
+def test_merge_fingerprints():
+    season_fingerprints = [
+        {"facts/team_games": {"2012": "a"}, "team_season_stats": {"2012": "b"}},
+        {"facts/team_games": {"2013": "c"}, "team_season_stats": {"2013": "d"}},
+    ]
+
+    assert merge_fingerprints(season_fingerprints) == {
+        "facts/team_games": {"2012": "a", "2013": "c"},
+        "team_season_stats": {"2012": "b", "2013": "d"},
+    }
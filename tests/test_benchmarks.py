@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+
+import polars as pl
+
+from benchmarks.import_time import (
+    REPO_DIR,
+    deferred_imports,
+    import_timings,
+    parse_importtime,
+)
+from benchmarks.run import CASES, compare
+from benchmarks.synthetic import write_synthetic_dataset
+
+
+def test_synthetic_dataset_runs_through_the_processors(tmp_path):
+    inputs = write_synthetic_dataset(
+        str(tmp_path), n_seasons=2, games_per_season=100, players_per_team=3
+    )
+
+    assert inputs["games_rows"] == 200
+    assert inputs["player_rows"] == 200 * 2 * 3
+
+    for builder, _ in CASES.values():
+        run, stages = builder(inputs)
+        season_stats = run().collect()
+
+        assert season_stats.height > 0
+        assert season_stats["season"].unique().sort().to_list() == [2024, 2025]
+
+
+def test_synthetic_raw_dates_are_strings(tmp_path):
+    inputs = write_synthetic_dataset(str(tmp_path), n_seasons=1, games_per_season=10)
+
+    games_detail = pl.read_parquet(inputs["games_detail"])
+
+    assert games_detail.schema["game_date"] == pl.String
+    assert "home" not in games_detail.columns
+
+
+def test_compare_flags_regressions():
+    baseline = {"cases": {"fast": {"seconds": 1.0}, "slow": {"seconds": 1.0}}}
+    results = {"cases": {"fast": {"seconds": 1.05}, "slow": {"seconds": 1.5}}}
+
+    assert compare(results, baseline, tolerance=0.1) == ["slow"]
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   yaml.reader\n"
+        "import time:       300 |        420 | yaml\n"
+    )
+
+    assert parse_importtime(stderr) == {"yaml.reader": (120, 120), "yaml": (300, 420)}
+
+
+def test_flow_import_defers_clients():
+    timings = import_timings("flow")
+
+    assert "flow" in timings
+    assert deferred_imports(timings) == []
+
+
+def test_flow_import_defers_parameters():
+    # Prefect imports yaml itself, so the check is on parameters.yml being parsed
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import flow, config; print(config.load_parameters.cache_info().misses)",
+        ],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(REPO_DIR / "src")},
+        check=True,
+    )
+
+    assert result.stdout.strip() == "0"
@@ -0,0 +1,189 @@
+import threading
+
+import polars as pl
+import pytest
+
+from prefect import task
+
+import flow as flow_module
+
+
+@pytest.fixture
+def mock_flow_tasks(monkeypatch):
+    """Replace the flow tasks with stand-ins recording their exports."""
+    team_started = threading.Event()
+    exported = []
+
+    @task
+    def mock_get_games_scope():
+        return "games_scope.arrow"
+
+    def player_stats():
+        # Only returns if the team task started while this one is running
+        assert team_started.wait(timeout=30)
+        return pl.DataFrame({"personId": [101]})
+
+    def team_stats():
+        team_started.set()
+        return pl.DataFrame({"team": ["BOS"]})
+
+    @task
+    def mock_get_player_game_facts(games_scope_path, incremental):
+        return "facts/player_games"
+
+    @task
+    def mock_get_team_game_facts(games_scope_path, incremental):
+        return "facts/team_games"
+
+    @task
+    def mock_collect_player_season_stats(game_facts_key, memory_limit_bytes):
+        assert game_facts_key == "facts/player_games"
+        return player_stats()
+
+    @task
+    def mock_collect_team_season_stats(game_facts_key):
+        assert game_facts_key == "facts/team_games"
+        return team_stats()
+
+    @task
+    def mock_get_player_season_stats(game_facts_key, incremental, memory_limit_bytes):
+        assert game_facts_key == "facts/player_games"
+        player_stats()
+        return "player_season_stats/**/*.parquet"
+
+    @task
+    def mock_get_team_season_stats(game_facts_key, incremental):
+        assert game_facts_key == "facts/team_games"
+        team_stats()
+        return "team_season_stats/**/*.parquet"
+
+    @task
+    def mock_get_player_rolling_stats(game_facts_key, incremental=False):
+        return "player_rolling_stats/**/*.parquet"
+
+    @task
+    def mock_get_team_rolling_stats(game_facts_key, incremental=False):
+        return "team_rolling_stats/**/*.parquet"
+
+    @task
+    def mock_collect_team_ratings(game_facts_key):
+        return pl.DataFrame({"srs": [1.5]})
+
+    @task
+    def mock_collect_head_to_head(game_facts_key):
+        return pl.DataFrame({"opponent": ["BOS"]})
+
+    @task
+    def mock_get_team_ratings(game_facts_key, incremental):
+        return "team_ratings/**/*.parquet"
+
+    @task
+    def mock_get_head_to_head(game_facts_key, incremental):
+        return "head_to_head/**/*.parquet"
+
+    @task
+    def mock_export_to_duckdb(filepath, table_name):
+        exported.append(("duckdb", table_name, filepath))
+        return table_name
+
+    @task
+    def mock_export_frame_to_duckdb(df, table_name):
+        exported.append(("duckdb", table_name, df.columns[0]))
+        return table_name
+
+    @task
+    def mock_export_frame_to_bucket(df, output):
+        exported.append(("bucket", output.key, df.columns[0]))
+        return output.key
+
+    for name, mock_task in {
+        "get_games_scope": mock_get_games_scope,
+        "get_player_game_facts": mock_get_player_game_facts,
+        "get_team_game_facts": mock_get_team_game_facts,
+        "collect_player_season_stats": mock_collect_player_season_stats,
+        "collect_team_season_stats": mock_collect_team_season_stats,
+        "get_player_season_stats": mock_get_player_season_stats,
+        "get_team_season_stats": mock_get_team_season_stats,
+        "get_player_rolling_stats": mock_get_player_rolling_stats,
+        "get_team_rolling_stats": mock_get_team_rolling_stats,
+        "collect_team_ratings": mock_collect_team_ratings,
+        "collect_head_to_head": mock_collect_head_to_head,
+        "get_team_ratings": mock_get_team_ratings,
+        "get_head_to_head": mock_get_head_to_head,
+        "export_to_duckdb": mock_export_to_duckdb,
+        "export_frame_to_duckdb": mock_export_frame_to_duckdb,
+        "export_frame_to_bucket": mock_export_frame_to_bucket,
+    }.items():
+        monkeypatch.setattr(flow_module, name, mock_task)
+
+    return exported
+
+
+def test_season_stats_exports_frames_concurrently(mock_flow_tasks):
+    flow_module.season_stats(task_runner="thread")
+
+    assert sorted(mock_flow_tasks) == [
+        ("bucket", "head_to_head.parquet", "opponent"),
+        ("bucket", "player_season_stats.parquet", "personId"),
+        ("bucket", "team_ratings.parquet", "srs"),
+        ("bucket", "team_season_stats.parquet", "team"),
+        ("duckdb", "head_to_head", "opponent"),
+        ("duckdb", "player_rolling_stats", "player_rolling_stats/**/*.parquet"),
+        ("duckdb", "player_season_stats", "personId"),
+        ("duckdb", "team_ratings", "srs"),
+        ("duckdb", "team_rolling_stats", "team_rolling_stats/**/*.parquet"),
+        ("duckdb", "team_season_stats", "team"),
+    ]
+
+
+def test_season_stats_incremental(mock_flow_tasks):
+    flow_module.season_stats(incremental=True, task_runner="thread")
+
+    assert sorted(mock_flow_tasks) == [
+        ("duckdb", "head_to_head", "head_to_head/**/*.parquet"),
+        ("duckdb", "player_rolling_stats", "player_rolling_stats/**/*.parquet"),
+        ("duckdb", "player_season_stats", "player_season_stats/**/*.parquet"),
+        ("duckdb", "team_ratings", "team_ratings/**/*.parquet"),
+        ("duckdb", "team_rolling_stats", "team_rolling_stats/**/*.parquet"),
+        ("duckdb", "team_season_stats", "team_season_stats/**/*.parquet"),
+    ]
+
+
+def test_backfill_records_the_seasons_once_written(monkeypatch, mock_flow_tasks):
+    recorded = {}
+
+    @task
+    def mock_backfill_season(season, games_scope_path):
+        assert games_scope_path == "games_scope.arrow"
+        return {"facts/team_games": {str(season): f"fingerprint-{season}"}}
+
+    monkeypatch.setattr(flow_module, "backfill_season", mock_backfill_season)
+    monkeypatch.setattr(flow_module, "record_partitions", recorded.__setitem__)
+    monkeypatch.setattr(
+        flow_module.nba_bucket,
+        "partitioned_path",
+        lambda output_key: f"{output_key}/**/*.parquet",
+    )
+
+    flow_module.backfill(2012, 2014, max_concurrency=2)
+
+    assert recorded == {
+        "facts/team_games": {
+            "2012": "fingerprint-2012",
+            "2013": "fingerprint-2013",
+            "2014": "fingerprint-2014",
+        }
+    }
+    assert sorted(mock_flow_tasks) == [
+        ("duckdb", "head_to_head", "head_to_head/**/*.parquet"),
+        ("duckdb", "player_rolling_stats", "player_rolling_stats/**/*.parquet"),
+        ("duckdb", "player_season_stats", "player_season_stats/**/*.parquet"),
+        ("duckdb", "team_ratings", "team_ratings/**/*.parquet"),
+        ("duckdb", "team_rolling_stats", "team_rolling_stats/**/*.parquet"),
+        ("duckdb", "team_season_stats", "team_season_stats/**/*.parquet"),
+    ]
+
+
+def test_backfill_rejects_an_empty_range(mock_flow_tasks):
+    with pytest.raises(ValueError):
+        flow_module.backfill(2014, 2012)